@@ -13,15 +13,18 @@ from homeassistant.helpers import device_registry as dr, entity_registry as er
 from .const import (
     DAILY,
     DOMAIN,
+    ENERGY_SENSORS,
     HOURLY,
     MANUAL,
     MONTHLY,
+    POWER_SENSORS,
     QUARTERLY,
     REAL_TIME,
     SELECTED_SENSORS,
     WEEKLY,
     YEARLY,
 )
+from .storage import async_remove_entry_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,7 +50,7 @@ def get_selected_sensors(entry: ConfigEntry) -> set[str]:
 
     if selected is None:
         config = get_entry_config(entry)
-        if config.get("power_sensor"):
+        if config.get("power_sensor") or config.get(POWER_SENSORS):
             return {REAL_TIME} | set(INTERVALS)
         return set(INTERVALS)
 
@@ -64,6 +67,21 @@ def get_interval_cost_unique_id(entry_id: str, interval: str) -> str:
     return f"{entry_id}_{interval}_cost"
 
 
+def get_consumer_sources(config: dict[str, Any]) -> list[str]:
+    """Return the power or energy sensors of a multi-consumer entry, if any."""
+    return list(config.get(POWER_SENSORS) or config.get(ENERGY_SENSORS) or [])
+
+
+def get_consumer_realtime_unique_id(entry_id: str, source_id: str) -> str:
+    """Return the realtime sensor unique ID of one consumer of an entry."""
+    return f"{entry_id}_{source_id}_real_time_cost"
+
+
+def get_consumer_cost_unique_id(entry_id: str, source_id: str, interval: str) -> str:
+    """Return the interval sensor unique ID of one consumer of an entry."""
+    return f"{entry_id}_{source_id}_{interval}_cost"
+
+
 def get_power_cost_unique_id(entry_id: str, interval: str) -> str:
     """Return the v2 power cost sensor unique ID."""
     return f"{entry_id}_{interval}_power_cost"
@@ -121,6 +139,24 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     entity_registry = er.async_get(hass)
     selected = get_selected_sensors(entry)
 
+    if sources := get_consumer_sources(config):
+        # Consumers can be removed as well as intervals deselected, so
+        # keep only the entities the new configuration creates
+        expected = {
+            get_consumer_realtime_unique_id(entry.entry_id, source)
+            if key == REAL_TIME
+            else get_consumer_cost_unique_id(entry.entry_id, source, key)
+            for source in sources
+            for key in selected
+        }
+        for registry_entry in er.async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        ):
+            if registry_entry.unique_id not in expected:
+                entity_registry.async_remove(registry_entry.entity_id)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
     # Build sensor_key -> unique_id map for all possible sensors.
     # Always include real_time — it may need cleanup when switching
     # from power to energy path.
@@ -276,6 +312,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored accumulators of a removed entry."""
+    await async_remove_entry_store(hass, entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a Dynamic Energy Cost config entry."""
 
@@ -0,0 +1,210 @@
+"""Aggregate cost of other Dynamic Energy Costs entries.
+
+Interval cost sensors announce themselves in a domain-wide ``MemberIndex``
+by entry and interval.  An aggregate entry watches the intervals of its
+member entries there and adds every cost delta a member reports to its
+own total, so an update costs the same however many members there are.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from functools import partial
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from . import INTERVALS
+from .backfill import missed_boundary
+from .buckets import RateBuckets
+from .const import DOMAIN
+from .runtime import RuntimeCounters
+from .storage import EntryStore, StoredBuckets
+
+if TYPE_CHECKING:
+    from .entity import BaseUtilitySensor
+    from .sensor import AggregateCostSensor
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MEMBER_INDEX = f"{DOMAIN}_member_index"
+
+type MemberWatcher = Callable[[BaseUtilitySensor], CALLBACK_TYPE]
+
+
+class MemberIndex:
+    """Domain-wide index of interval cost sensors by entry and interval.
+
+    A watcher is called with every member of its entry and interval, now
+    and whenever one is added later, and returns a callback detaching it.
+    The detach callback runs when either the member or the watcher goes
+    away, so an aggregate follows its members across entry reloads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._members: dict[tuple[str, str], list[BaseUtilitySensor]] = {}
+        self._watchers: dict[tuple[str, str], dict[object, MemberWatcher]] = {}
+        self._attached: dict[tuple[object, BaseUtilitySensor], CALLBACK_TYPE] = {}
+
+    @callback
+    def async_add_member(
+        self, entry_id: str, interval: str, sensor: BaseUtilitySensor
+    ) -> CALLBACK_TYPE:
+        """Add an interval sensor and return a callback removing it."""
+        key = (entry_id, interval)
+        self._members.setdefault(key, []).append(sensor)
+        for token, watcher in self._watchers.get(key, {}).items():
+            self._attached[token, sensor] = watcher(sensor)
+
+        @callback
+        def _async_remove() -> None:
+            self._members[key].remove(sensor)
+            if not self._members[key]:
+                del self._members[key]
+            for token in self._watchers.get(key, {}):
+                if (detach := self._attached.pop((token, sensor), None)) is not None:
+                    detach()
+
+        return _async_remove
+
+    @callback
+    def async_watch(
+        self, entry_id: str, interval: str, watcher: MemberWatcher
+    ) -> CALLBACK_TYPE:
+        """Attach watcher to the members of an entry's interval."""
+        key = (entry_id, interval)
+        token = object()
+        self._watchers.setdefault(key, {})[token] = watcher
+        for sensor in self._members.get(key, ()):
+            self._attached[token, sensor] = watcher(sensor)
+
+        @callback
+        def _async_unwatch() -> None:
+            del self._watchers[key][token]
+            if not self._watchers[key]:
+                del self._watchers[key]
+            for sensor in self._members.get(key, ()):
+                if (detach := self._attached.pop((token, sensor), None)) is not None:
+                    detach()
+
+        return _async_unwatch
+
+
+@callback
+def async_get_member_index(hass: HomeAssistant) -> MemberIndex:
+    """Return the domain-wide member index, creating it on first use."""
+    if (index := hass.data.get(DATA_MEMBER_INDEX)) is None:
+        index = hass.data[DATA_MEMBER_INDEX] = MemberIndex()
+    return index
+
+
+class AggregateCostEngine:
+    """Sum the cost accrued by the interval sensors of other entries.
+
+    Slot ``i`` holds the aggregate total of ``INTERVALS[i]`` in integer
+    micro-currency and follows the sensors of that interval in every
+    member entry.  A member reports the cost it accrued since its last
+    report; resets and calibrations of a member are not accrued cost, so
+    the aggregate keeps its own reset schedule.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_ids: list[str]) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self.entry_ids = list(entry_ids)
+        self.buckets = RateBuckets(INTERVALS)
+        self.counters = RuntimeCounters()
+        self.statistics = None
+        self.stored: StoredBuckets | None = None
+        self._sensors: dict[int, AggregateCostSensor] = {}
+        self._members: dict[int, list[BaseUtilitySensor]] = {}
+
+    @callback
+    def async_attach_store(self, store: EntryStore) -> None:
+        """Restore the aggregate totals from the entry's store and save them there."""
+        self.stored = StoredBuckets(store, "aggregate", self.buckets, dt_util.utcnow)
+
+    def slot(self, interval: str) -> int:
+        """Return the bucket slot of an interval."""
+        return self.buckets.slot(interval)
+
+    async def async_rebuild_statistics(self, start: datetime) -> None:
+        """Statistics are not imported for aggregates."""
+
+    def members(self, slot: int) -> list[BaseUtilitySensor]:
+        """Return the member sensors a slot currently follows."""
+        return list(self._members.get(slot, ()))
+
+    @callback
+    def async_register(self, sensor: AggregateCostSensor) -> CALLBACK_TYPE:
+        """Register an aggregate sensor and follow its interval in every member."""
+        slot = sensor.bucket_slot
+        interval = self.buckets.intervals[slot]
+        self._sensors[slot] = sensor
+        self._members[slot] = []
+        self.buckets.active[slot] = True
+        if self.stored is not None:
+            self.stored.track(slot)
+            self._reset_missed(slot)
+        index = async_get_member_index(self.hass)
+        unwatch = [
+            index.async_watch(entry_id, interval, partial(self._attach, slot))
+            for entry_id in self.entry_ids
+        ]
+
+        @callback
+        def _async_unregister() -> None:
+            while unwatch:
+                unwatch.pop()()
+            del self._sensors[slot]
+            del self._members[slot]
+            self.buckets.active[slot] = False
+
+        return _async_unregister
+
+    def _reset_missed(self, slot: int) -> None:
+        """Reset a restored slot whose boundary passed while it was not running."""
+        if self.stored.restored_since(slot) is None:
+            return
+        boundary = missed_boundary(
+            self.buckets.intervals[slot],
+            self.buckets.get_last_reset(slot),
+            dt_util.utcnow(),
+        )
+        if boundary is not None:
+            self.buckets.reset(self.buckets.mask(slot), boundary)
+            _LOGGER.debug(
+                "Reset aggregate %s missed at %s", self._sensors[slot].name, boundary
+            )
+
+    @callback
+    def _attach(self, slot: int, member: BaseUtilitySensor) -> CALLBACK_TYPE:
+        """Add the cost a member accrues from now on to a slot."""
+        self._members[slot].append(member)
+        remove_listener = member.async_add_cost_listener(
+            partial(self._async_add_cost, slot)
+        )
+
+        @callback
+        def _async_detach() -> None:
+            remove_listener()
+            self._members[slot].remove(member)
+
+        return _async_detach
+
+    @callback
+    def _async_add_cost(self, slot: int, delta_micros: int) -> None:
+        """Add a member's cost delta to a slot and publish its sensor."""
+        self.counters.count("member_updates")
+        self.buckets.cost[slot] += delta_micros
+        self._sensors[slot].async_publish()
+
+    @callback
+    def async_settle_members(self, slot: int, when: datetime) -> None:
+        """Collect the cost every member of a slot accrued up to ``when``."""
+        for member in self.members(slot):
+            member.async_settle_cost(when)
@@ -0,0 +1,202 @@
+"""Recorder backfill of cost accrued while the integration was not running."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import math
+from typing import Any
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .boundaries import boundary_calendar
+from .core import GapCosts, energy_gap_costs, power_gap_costs
+from .price_hub import normalize_price
+from .units import _power_factor_for_unit, _state_to_float
+
+_LOGGER = logging.getLogger(__name__)
+
+_EMPTY = np.zeros(0)
+
+
+@dataclass(frozen=True, slots=True)
+class GapWindow:
+    """The span a restored slot did not accrue: from ``since`` to ``end``.
+
+    ``end`` is where live accrual of the slot took over.  Energy slots
+    also carry their restored ``baseline`` reading and the ``end_reading``
+    live accrual restarted from.
+    """
+
+    since: datetime
+    end: datetime
+    baseline: float = math.nan
+    end_reading: float = math.nan
+
+
+def _series(states: list[Any], parse: Callable[[Any], float | None], after: float):
+    """Return (times, values) of the parsable states, optionally after a time."""
+    times = []
+    values = []
+    for state in states:
+        value = parse(state)
+        stamp = state.last_updated.timestamp()
+        if value is None or stamp <= after:
+            continue
+        times.append(stamp)
+        values.append(value)
+    return np.asarray(times, dtype=float), np.asarray(values, dtype=float)
+
+
+def _history(
+    hass: HomeAssistant, entity_ids: list[str], start: datetime, end: datetime
+) -> dict[str, list[Any]]:
+    """Read every recorded state of the entities in one query (executor)."""
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder import history
+
+    return history.get_significant_states(
+        hass,
+        start,
+        end,
+        entity_ids,
+        include_start_time_state=True,
+        significant_changes_only=False,
+    )
+
+
+def _power_kw(state) -> float | None:
+    """Return a power state in kW."""
+    value = _state_to_float(state)
+    if value is None:
+        return None
+    return value * _power_factor_for_unit(state.attributes.get("unit_of_measurement"))
+
+
+def compute_energy_gap(
+    hass: HomeAssistant,
+    energy_sensor_id: str,
+    price_sensor_id: str,
+    windows: list[GapWindow],
+    energy_to_kwh: float,
+    total_increasing: bool,
+    fallback_price: float | None,
+) -> list[GapCosts]:
+    """Fetch the history of all windows once and price each one (executor).
+
+    Every window is priced from its own baseline, so slots restored at
+    different times share the read but not the first delta.
+    """
+    start = min(window.since for window in windows)
+    end = max(window.end for window in windows)
+    states = _history(hass, [energy_sensor_id, price_sensor_id], start, end)
+    times, readings = _series(
+        states.get(energy_sensor_id, []), _state_to_float, start.timestamp()
+    )
+    price_times, prices = _series(
+        states.get(price_sensor_id, []), normalize_price, float("-inf")
+    )
+    gaps = []
+    for window in windows:
+        since, until = window.since.timestamp(), window.end.timestamp()
+        selected = (times > since) & (times <= until)
+        gaps.append(
+            energy_gap_costs(
+                np.concatenate(([since], times[selected], [until])),
+                np.concatenate(
+                    ([window.baseline], readings[selected], [window.end_reading])
+                ),
+                price_times,
+                prices,
+                energy_to_kwh=energy_to_kwh,
+                total_increasing=total_increasing,
+                fallback_price=fallback_price,
+            )
+        )
+    return gaps
+
+
+def compute_power_gap(
+    hass: HomeAssistant,
+    power_sensor_id: str,
+    price_sensor_id: str,
+    start: datetime,
+    end: datetime,
+    splits: list[float],
+    fallback_price: float | None,
+) -> GapCosts:
+    """Fetch the gap's history and integrate its power cost (executor)."""
+    states = _history(hass, [power_sensor_id, price_sensor_id], start, end)
+    power_times, power = _series(
+        states.get(power_sensor_id, []), _power_kw, float("-inf")
+    )
+    price_times, prices = _series(
+        states.get(price_sensor_id, []), normalize_price, float("-inf")
+    )
+    return power_gap_costs(
+        power_times,
+        power,
+        price_times,
+        prices,
+        start=start.timestamp(),
+        end=end.timestamp(),
+        splits=splits,
+        fallback_price=fallback_price,
+    )
+
+
+def empty_energy_gap(
+    window: GapWindow,
+    *,
+    energy_to_kwh: float,
+    total_increasing: bool,
+    price: float | None,
+) -> GapCosts:
+    """Return the whole window as one delta at the current price.
+
+    Used when history cannot be read, which matches what the live path
+    would have accrued without a backfill.
+    """
+    return energy_gap_costs(
+        np.array([window.since.timestamp(), window.end.timestamp()]),
+        np.array([window.baseline, window.end_reading]),
+        _EMPTY,
+        _EMPTY,
+        energy_to_kwh=energy_to_kwh,
+        total_increasing=total_increasing,
+        fallback_price=price,
+    )
+
+
+@callback
+def recorder_available(hass: HomeAssistant) -> bool:
+    """Return True when recorder history can be read."""
+    return "recorder" in hass.config.components
+
+
+async def async_run_backfill(hass: HomeAssistant, job: Callable[..., GapCosts], *args):
+    """Run a backfill job on the recorder's executor."""
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder import get_instance
+
+    return await get_instance(hass).async_add_executor_job(job, hass, *args)
+
+
+def missed_boundary(
+    interval: str, last_reset: datetime, end: datetime
+) -> datetime | None:
+    """Return the boundary an interval should have reset at during a gap.
+
+    That is the start of the bucket containing ``end`` when it lies after
+    the slot's last reset; None when no reset was missed.
+    """
+    tz = dt_util.get_default_time_zone()
+    bucket = boundary_calendar(tz).bucket(interval, end.astimezone(tz))
+    if bucket is None or bucket[0] <= last_reset:
+        return None
+    return bucket[0]
@@ -0,0 +1,144 @@
+"""Precomputed reset boundaries for Dynamic Energy Costs intervals."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+
+from .const import DAILY, HOURLY, MONTHLY, QUARTERLY, WEEKLY, YEARLY
+
+# Number of boundaries computed ahead per interval before the calendar is
+# rebuilt; roughly two days of quarter-hours and hours, a few of the rest.
+_HORIZON = {
+    QUARTERLY: 192,
+    HOURLY: 48,
+    DAILY: 32,
+    WEEKLY: 8,
+    MONTHLY: 12,
+    YEARLY: 4,
+}
+
+# Sub-daily intervals are a fixed length of real time, so they are stepped in
+# UTC. Daily and longer intervals follow the local calendar and may be 23 or
+# 25 hours long around DST transitions.
+_FIXED_STEPS = {
+    QUARTERLY: timedelta(minutes=15),
+    HOURLY: timedelta(hours=1),
+}
+
+
+def _floor_local(interval: str, local: datetime) -> datetime:
+    """Return the wall-clock start of the bucket containing a local time."""
+    if interval == QUARTERLY:
+        return local.replace(minute=local.minute // 15 * 15, second=0, microsecond=0)
+    if interval == HOURLY:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return _localize(_floor_date(interval, local.date()), local.tzinfo)
+
+
+def _floor_date(interval: str, day: date) -> date:
+    """Return the first calendar day of the bucket containing a day."""
+    if interval == WEEKLY:
+        return day - timedelta(days=day.weekday())
+    if interval == MONTHLY:
+        return day.replace(day=1)
+    if interval == YEARLY:
+        return day.replace(month=1, day=1)
+    return day
+
+
+def _next_date(interval: str, day: date) -> date:
+    """Return the first calendar day of the bucket after the one starting at day."""
+    if interval == WEEKLY:
+        return day + timedelta(days=7)
+    if interval == MONTHLY:
+        return (day + timedelta(days=32)).replace(day=1)
+    if interval == YEARLY:
+        return day.replace(year=day.year + 1)
+    return day + timedelta(days=1)
+
+
+def _localize(day: date, tz: tzinfo | None) -> datetime:
+    """Return local midnight of a day as an aware datetime.
+
+    A midnight skipped by a DST gap resolves to the first existing instant
+    after it, by round-tripping through UTC.
+    """
+    return datetime.combine(day, time(), tzinfo=tz).astimezone(UTC).astimezone(tz)
+
+
+class BoundaryCalendar:
+    """Reset boundaries of every interval, precomputed for one timezone.
+
+    Boundaries are kept as sorted POSIX timestamps next to the matching local
+    datetimes. Lookups first check the bucket returned last time and the one
+    after it, so the steady state (time moving forward) is O(1); anything
+    else is a bisect, and a lookup outside the precomputed range rebuilds it
+    starting at the requested time.
+    """
+
+    def __init__(self, tz: tzinfo | None) -> None:
+        """Initialize an empty calendar for a timezone."""
+        self.tz = tz
+        self._stamps: dict[str, list[float]] = {}
+        self._boundaries: dict[str, list[datetime]] = {}
+        self._cursor: dict[str, int] = {}
+
+    def bucket(self, interval: str, when: datetime) -> tuple[datetime, datetime] | None:
+        """Return the (start, end) boundaries of the bucket containing when.
+
+        Returns None for intervals without automatic resets.
+        """
+        if interval not in _HORIZON:
+            return None
+        stamp = when.timestamp()
+        stamps = self._stamps.get(interval)
+        if stamps is None or not stamps[0] <= stamp < stamps[-1]:
+            stamps = self._build(interval, when)
+
+        index = self._cursor.get(interval, 0)
+        if not stamps[index] <= stamp < stamps[index + 1]:
+            if stamps[index + 1] <= stamp < stamps[min(index + 2, len(stamps) - 1)]:
+                index += 1
+            else:
+                index = bisect_right(stamps, stamp) - 1
+            self._cursor[interval] = index
+
+        boundaries = self._boundaries[interval]
+        return boundaries[index], boundaries[index + 1]
+
+    def next_boundary(self, interval: str, when: datetime) -> datetime | None:
+        """Return the first boundary strictly after when, or None if manual."""
+        if (bucket := self.bucket(interval, when)) is None:
+            return None
+        return bucket[1]
+
+    def _build(self, interval: str, when: datetime) -> list[float]:
+        """Precompute the boundaries of an interval starting at when."""
+        start = _floor_local(interval, when.astimezone(self.tz))
+        count = _HORIZON[interval] + 1
+
+        if (step := _FIXED_STEPS.get(interval)) is not None:
+            start_utc = start.astimezone(UTC)
+            boundaries = [
+                (start_utc + step * index).astimezone(self.tz) for index in range(count)
+            ]
+        else:
+            day = _floor_date(interval, start.date())
+            boundaries = []
+            for _ in range(count):
+                boundaries.append(_localize(day, self.tz))
+                day = _next_date(interval, day)
+
+        stamps = [boundary.timestamp() for boundary in boundaries]
+        self._boundaries[interval] = boundaries
+        self._stamps[interval] = stamps
+        self._cursor[interval] = 0
+        return stamps
+
+
+@lru_cache(maxsize=8)
+def boundary_calendar(tz: tzinfo | None) -> BoundaryCalendar:
+    """Return the shared boundary calendar of a timezone."""
+    return BoundaryCalendar(tz)
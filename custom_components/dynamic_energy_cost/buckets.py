@@ -0,0 +1,244 @@
+"""Vectorized interval accumulators for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import math
+from typing import Any
+
+import numpy as np
+
+from .money import US_PER_HOUR, integrate_micros
+
+_EPOCH = datetime.fromtimestamp(0, UTC)
+_MICROSECOND = timedelta(microseconds=1)
+# Largest rate whose product with a sub-hour span plus a remainder fits int64
+_MAX_INT64_RATE = (np.iinfo(np.int64).max - US_PER_HOUR) // US_PER_HOUR
+
+
+def _to_timestamp_us(value: datetime | str) -> int:
+    """Return exact microseconds since the epoch for a datetime or ISO string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class _SlotArrays:
+    """Slot bookkeeping shared by the per-interval accumulator arrays.
+
+    Slot ``i`` holds the totals of ``intervals[i]``; the last reset time is
+    stored as int64 microseconds since the epoch.  ``_stored`` names the
+    per-slot arrays saved by ``as_dict``.
+    """
+
+    _stored: tuple[str, ...] = ("last_reset",)
+
+    def __init__(self, intervals: list[str]) -> None:
+        """Initialize the slot index for the given intervals."""
+        self.intervals = list(intervals)
+        self._index = {interval: slot for slot, interval in enumerate(intervals)}
+        size = len(self.intervals)
+        self.last_reset = np.full(size, _to_timestamp_us(datetime.now(UTC)), np.int64)
+        self.active = np.zeros(size, dtype=bool)
+
+    def slot(self, interval: str) -> int:
+        """Return the array index of an interval."""
+        return self._index[interval]
+
+    def mask(self, *slots: int) -> np.ndarray:
+        """Return a boolean mask selecting the given slots."""
+        selected = np.zeros(len(self.intervals), dtype=bool)
+        selected[list(slots)] = True
+        return selected
+
+    def get_last_reset(self, slot: int) -> datetime:
+        """Return the last reset time of a slot as an aware UTC datetime."""
+        return _EPOCH + int(self.last_reset[slot]) * _MICROSECOND
+
+    def set_last_reset(self, slot: int, value: datetime | str) -> None:
+        """Store the last reset time of a slot."""
+        self.last_reset[slot] = _to_timestamp_us(value)
+
+    def as_dict(self, mask: np.ndarray) -> dict[str, list[Any]]:
+        """Return the selected slots as JSON lists keyed by array name.
+
+        Slots are identified by interval name, so a saved state survives a
+        change of slot order; NaN is saved as None.
+        """
+        data: dict[str, list[Any]] = {
+            "intervals": [self.intervals[slot] for slot in np.flatnonzero(mask)]
+        }
+        for name in self._stored:
+            data[name] = [
+                None if isinstance(value, float) and math.isnan(value) else value
+                for value in getattr(self, name)[mask].tolist()
+            ]
+        return data
+
+    def restore(self, data: dict[str, list[Any]]) -> np.ndarray:
+        """Load slots saved by ``as_dict`` and return the mask of restored slots.
+
+        Saved intervals that no longer exist are ignored.
+        """
+        restored = np.zeros(len(self.intervals), dtype=bool)
+        for position, interval in enumerate(data["intervals"]):
+            slot = self._index.get(interval)
+            if slot is None:
+                continue
+            for name in self._stored:
+                value = data[name][position]
+                getattr(self, name)[slot] = math.nan if value is None else value
+            restored[slot] = True
+        return restored
+
+
+class IntervalBuckets(_SlotArrays):
+    """Per-interval accumulator state of one energy config entry.
+
+    Cost, energy and the source baseline are float64 arrays so one event
+    updates every interval with a single masked add; a missing baseline is
+    stored as NaN.
+    """
+
+    _stored = ("last_reset", "cost", "energy", "baseline")
+
+    def __init__(self, intervals: list[str]) -> None:
+        """Initialize zeroed buckets for the given intervals."""
+        super().__init__(intervals)
+        size = len(self.intervals)
+        self.cost = np.zeros(size)
+        self.energy = np.zeros(size)
+        self.baseline = np.full(size, np.nan)
+
+    def apply(
+        self,
+        current_energy: float | np.ndarray,
+        energy_to_kwh: float | np.ndarray,
+        price: float,
+        *,
+        source_was_reset: bool,
+        total_increasing: bool | np.ndarray,
+        mask: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Accrue a source reading and return the mask of slots that changed.
+
+        Slots without a baseline, or whose source reset (explicitly or by a
+        decrement on a ``total_increasing`` sensor), only re-initialise the
+        baseline.  All other selected slots add ``delta * price`` in one
+        masked operation.  ``price`` is in currency/kWh and ``mask``
+        defaults to the active slots.
+
+        The reading, unit factor and ``total_increasing`` may also be
+        per-slot arrays, so slots fed by different sources are priced in
+        the same operation.
+        """
+        selected = self.active if mask is None else mask
+        rebase = np.isnan(self.baseline)
+        if source_was_reset:
+            rebase[:] = True
+        elif np.any(total_increasing):
+            rebase |= total_increasing & (current_energy < self.baseline)
+        accrue = selected & ~rebase
+        self._accrue(accrue, current_energy, energy_to_kwh, price)
+        np.copyto(self.baseline, current_energy, where=selected)
+        return accrue
+
+    def _accrue(
+        self,
+        accrue: np.ndarray,
+        current_energy: float | np.ndarray,
+        energy_to_kwh: float | np.ndarray,
+        price: float,
+    ) -> None:
+        """Add the energy delta and its cost to the selected slots."""
+        if not accrue.any():
+            return
+        delta_kwh = (current_energy - self.baseline) * energy_to_kwh
+        np.add(self.energy, delta_kwh, out=self.energy, where=accrue)
+        np.add(self.cost, delta_kwh * price, out=self.cost, where=accrue)
+
+    def reset(
+        self,
+        mask: np.ndarray,
+        when: datetime,
+        baseline: float | np.ndarray | None = None,
+    ) -> None:
+        """Zero the selected slots and restart them from ``baseline``.
+
+        An array ``baseline`` holds one value per selected slot.
+        """
+        self.cost[mask] = 0.0
+        self.energy[mask] = 0.0
+        self.baseline[mask] = np.nan if baseline is None else baseline
+        self.last_reset[mask] = _to_timestamp_us(when)
+
+
+class RateBuckets(_SlotArrays):
+    """Per-interval integer micro-currency accumulators of one power entry.
+
+    ``cost`` holds whole micro-currency and ``remainder`` the sub-micro
+    fraction (in micro-currency-microseconds per hour) carried into the
+    next integration step, so integration is exact for any sample rate.
+    """
+
+    _stored = ("last_reset", "cost", "remainder")
+
+    def __init__(self, intervals: list[str]) -> None:
+        """Initialize zeroed buckets for the given intervals."""
+        super().__init__(intervals)
+        size = len(self.intervals)
+        self.cost = np.zeros(size, np.int64)
+        self.remainder = np.zeros(size, np.int64)
+
+    def integrate(
+        self, rate_micros: int, elapsed: int, mask: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Accrue a micro-currency/h rate over ``elapsed`` microseconds.
+
+        The rate and span are the same for every slot, so the whole part is
+        computed once with exact Python integers; only the carried
+        remainder differs per slot.  Returns the mask of slots whose cost
+        changed.  ``mask`` defaults to the active slots.
+        """
+        selected = self.active if mask is None else mask
+        whole, rest = integrate_micros(rate_micros, elapsed, 0)
+        carried = self.remainder + rest
+        carry = carried >= US_PER_HOUR
+        accrued = whole + carry
+        changed = selected & (accrued != 0)
+        np.add(self.cost, accrued, out=self.cost, where=selected)
+        np.copyto(self.remainder, carried - carry * US_PER_HOUR, where=selected)
+        return changed
+
+    def integrate_rates(
+        self, rates_micros: np.ndarray, elapsed: int, mask: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Accrue a per-slot micro-currency/h rate over ``elapsed`` microseconds.
+
+        Whole hours are integrated apart from the rest of the span, so the
+        int64 products stay exact for any span at rates below about
+        2500 currency/h; faster rates are integrated with Python integers.
+        Returns the mask of slots whose cost changed.
+        """
+        selected = self.active if mask is None else mask
+        hours, rest = divmod(elapsed, US_PER_HOUR)
+        if rest and np.abs(rates_micros).max(initial=0) > _MAX_INT64_RATE:
+            rates_micros = rates_micros.astype(object)
+        carried = rates_micros * rest + self.remainder
+        accrued = np.asarray(
+            rates_micros * hours + carried // US_PER_HOUR, dtype=np.int64
+        )
+        changed = selected & (accrued != 0)
+        np.add(self.cost, accrued, out=self.cost, where=selected)
+        np.copyto(
+            self.remainder,
+            np.asarray(carried % US_PER_HOUR, dtype=np.int64),
+            where=selected,
+        )
+        return changed
+
+    def reset(self, mask: np.ndarray, when: datetime) -> None:
+        """Zero the selected slots."""
+        self.cost[mask] = 0
+        self.remainder[mask] = 0
+        self.last_reset[mask] = _to_timestamp_us(when)
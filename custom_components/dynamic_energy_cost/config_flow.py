@@ -9,6 +9,7 @@ from homeassistant import config_entries
 from homeassistant.components.input_number import DOMAIN as INPUT_NUMBER_DOMAIN
 from homeassistant.components.number import DOMAIN as NUMBER_DOMAIN
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers import selector
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.schema_config_entry_flow import SchemaFlowError
@@ -16,36 +17,57 @@ from homeassistant.helpers.schema_config_entry_flow import SchemaFlowError
 import voluptuous as vol
 
 from .const import (
+    AGGREGATE_ENTRIES,
+    CRASH_JOURNAL,
+    DEFAULT_MAX_PUBLISH_STALENESS,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
     DOMAIN,
     ELECTRICITY_PRICE_SENSOR,
     ENERGY_SENSOR,
+    ENERGY_SENSORS,
+    IMPORT_STATISTICS,
+    MAX_PUBLISH_STALENESS,
+    MIN_PUBLISH_INTERVAL,
     POWER_SENSOR,
+    POWER_SENSORS,
     REAL_TIME,
     SELECTED_SENSORS,
     SENSOR_LABELS,
 )
-from . import get_selected_sensors, INTERVALS
+from . import get_entry_config, get_selected_sensors, INTERVALS
 
 
 _LOGGER = logging.getLogger(__name__)
 
+# Source sensor keys and their device class; exactly one may be set
+_SOURCE_KEYS = (
+    (POWER_SENSOR, "power", False),
+    (ENERGY_SENSOR, "energy", False),
+    (POWER_SENSORS, "power", True),
+    (ENERGY_SENSORS, "energy", True),
+)
+# An aggregate entry sums other entries instead of tracking a source
+_SOURCES = (*(key for key, _, _ in _SOURCE_KEYS), AGGREGATE_ENTRIES)
+
 
-def _entity_selector(*, domains: list[str]):
-    """Create an entity selector for a single entity."""
+def _entity_selector(*, domains: list[str], multiple: bool = False):
+    """Create an entity selector for a single entity, or a list of them."""
     return selector.EntitySelector(
         selector.EntitySelectorConfig(
             domain=domains,
-            multiple=False,
+            multiple=multiple,
         )
     )
 
 
-def _filtered_entity_selector(*, domains: list[str], device_class: str):
+def _filtered_entity_selector(
+    *, domains: list[str], device_class: str, multiple: bool = False
+):
     """Create an entity selector that uses the modern filter syntax."""
     return selector.EntitySelector(
         selector.EntitySelectorConfig(
             domain=domains,
-            multiple=False,
+            multiple=multiple,
             filter=[{"domain": domains, "device_class": [device_class]}],
         )
     )
@@ -58,11 +80,24 @@ def _clean_optional_value(value: Any) -> Any:
     return value
 
 
+def _clean_optional_list(value: Any) -> list[str] | None:
+    """Normalize an empty multiple selector value and drop duplicates."""
+    if not value:
+        return None
+    return list(dict.fromkeys(value))
+
+
 def _normalize_user_input(user_input: dict[str, Any]) -> dict[str, Any]:
     """Normalize selector payloads for validation and storage."""
     cleaned = dict(user_input)
     cleaned[POWER_SENSOR] = _clean_optional_value(cleaned.get(POWER_SENSOR))
     cleaned[ENERGY_SENSOR] = _clean_optional_value(cleaned.get(ENERGY_SENSOR))
+    cleaned[POWER_SENSORS] = _clean_optional_list(cleaned.get(POWER_SENSORS))
+    cleaned[ENERGY_SENSORS] = _clean_optional_list(cleaned.get(ENERGY_SENSORS))
+    cleaned[AGGREGATE_ENTRIES] = _clean_optional_list(cleaned.get(AGGREGATE_ENTRIES))
+    cleaned[ELECTRICITY_PRICE_SENSOR] = _clean_optional_value(
+        cleaned.get(ELECTRICITY_PRICE_SENSOR)
+    )
     cleaned["integration_description"] = cleaned.get(
         "integration_description", "Unnamed"
     )
@@ -73,7 +108,11 @@ def _validate_config(user_input: dict[str, Any]) -> dict[str, Any]:
     """Validate config flow input and return normalized config data."""
     config = _normalize_user_input(user_input)
 
-    cv.entity_id(config[ELECTRICITY_PRICE_SENSOR])
+    # Aggregate entries price nothing themselves
+    if not config.get(AGGREGATE_ENTRIES):
+        if not config.get(ELECTRICITY_PRICE_SENSOR):
+            raise SchemaFlowError("missing_price_sensor")
+        cv.entity_id(config[ELECTRICITY_PRICE_SENSOR])
 
     if config.get(POWER_SENSOR):
         cv.entity_id(config[POWER_SENSOR])
@@ -81,23 +120,60 @@ def _validate_config(user_input: dict[str, Any]) -> dict[str, Any]:
     if config.get(ENERGY_SENSOR):
         cv.entity_id(config[ENERGY_SENSOR])
 
-    if not config.get(POWER_SENSOR) and not config.get(ENERGY_SENSOR):
+    for key in (POWER_SENSORS, ENERGY_SENSORS):
+        if config.get(key):
+            cv.entity_ids(config[key])
+
+    sources = [key for key in _SOURCES if config.get(key)]
+    if not sources:
         raise SchemaFlowError("missing_sensor")
 
-    if config.get(POWER_SENSOR) and config.get(ENERGY_SENSOR):
+    if len(sources) > 1:
         raise SchemaFlowError("invalid_config")
 
     return config
 
 
+def _imports_statistics(config: dict[str, Any]) -> bool:
+    """Return True when an entry can import statistics: it has a single source."""
+    return bool(config.get(POWER_SENSOR) or config.get(ENERGY_SENSOR))
+
+
+def _is_power(config: dict[str, Any]) -> bool:
+    """Return True when an entry tracks one or more power sensors."""
+    return bool(config.get(POWER_SENSOR) or config.get(POWER_SENSORS))
+
+
+def _aggregate_options(
+    hass: HomeAssistant, exclude: str | None = None
+) -> list[selector.SelectOptionDict]:
+    """Return the entries an aggregate entry can sum.
+
+    Aggregate entries are left out, so aggregates never nest.
+    """
+    return [
+        selector.SelectOptionDict(value=entry.entry_id, label=entry.title)
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id != exclude
+        and not get_entry_config(entry).get(AGGREGATE_ENTRIES)
+    ]
+
+
 def _schema(
     defaults: dict[str, Any] | None = None,
     *,
     use_defaults: bool = True,
     use_filtered_optional_selectors: bool = True,
+    aggregate_options: list[selector.SelectOptionDict] | None = None,
 ) -> vol.Schema:
-    """Build the shared config and options schema."""
+    """Build the shared config and options schema.
+
+    The aggregate field is only shown when there are entries to sum.
+    """
     defaults = defaults or {}
+    price_default = _clean_optional_value(
+        defaults.get(ELECTRICITY_PRICE_SENSOR, vol.UNDEFINED)
+    )
     schema_dict = {
         vol.Required(
             "integration_description",
@@ -105,17 +181,17 @@ def _schema(
             if use_defaults
             else vol.UNDEFINED,
         ): selector.TextSelector(),
-        vol.Required(
+        vol.Optional(
             ELECTRICITY_PRICE_SENSOR,
-            default=defaults.get(ELECTRICITY_PRICE_SENSOR)
-            if use_defaults
+            default=price_default
+            if use_defaults and price_default is not None
             else vol.UNDEFINED,
         ): _entity_selector(
             domains=[SENSOR_DOMAIN, NUMBER_DOMAIN, INPUT_NUMBER_DOMAIN]
         ),
     }
 
-    for key, device_class in ((POWER_SENSOR, "power"), (ENERGY_SENSOR, "energy")):
+    for key, device_class, multiple in _SOURCE_KEYS:
         default = _clean_optional_value(defaults.get(key, vol.UNDEFINED))
         marker = vol.Optional(
             key,
@@ -126,10 +202,29 @@ def _schema(
         schema_dict[marker] = vol.Any(
             None,
             _filtered_entity_selector(
-                domains=[SENSOR_DOMAIN], device_class=device_class
+                domains=[SENSOR_DOMAIN], device_class=device_class, multiple=multiple
             )
             if use_filtered_optional_selectors
-            else _entity_selector(domains=[SENSOR_DOMAIN]),
+            else _entity_selector(domains=[SENSOR_DOMAIN], multiple=multiple),
+        )
+
+    if aggregate_options:
+        default = _clean_optional_value(defaults.get(AGGREGATE_ENTRIES, vol.UNDEFINED))
+        marker = vol.Optional(
+            AGGREGATE_ENTRIES,
+            default=default
+            if use_defaults and default is not vol.UNDEFINED
+            else vol.UNDEFINED,
+        )
+        schema_dict[marker] = vol.Any(
+            None,
+            selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=aggregate_options,
+                    multiple=True,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
         )
 
     return vol.Schema(schema_dict)
@@ -147,13 +242,28 @@ def _sensor_options(is_power: bool) -> list[selector.SelectOptionDict]:
     ]
 
 
+def _seconds_selector() -> selector.NumberSelector:
+    """Create a number selector for a duration in seconds."""
+    return selector.NumberSelector(
+        selector.NumberSelectorConfig(
+            min=0,
+            max=3600,
+            step=1,
+            unit_of_measurement="s",
+            mode=selector.NumberSelectorMode.BOX,
+        )
+    )
+
+
 def _sensor_selection_schema(
     is_power: bool,
     defaults: list[str] | None = None,
+    config: dict[str, Any] | None = None,
 ) -> vol.Schema:
     """Build the sensor selection schema."""
     options = _sensor_options(is_power)
     all_values = [opt["value"] for opt in options]
+    config = config or {}
     # Filter out real_time from defaults — it's not a selectable option
     if defaults is not None:
         defaults = [d for d in defaults if d != REAL_TIME]
@@ -168,11 +278,43 @@ def _sensor_selection_schema(
                     multiple=True,
                     mode=selector.SelectSelectorMode.LIST,
                 )
-            )
+            ),
+            vol.Optional(
+                MIN_PUBLISH_INTERVAL,
+                default=config.get(MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL),
+            ): _seconds_selector(),
+            vol.Optional(
+                MAX_PUBLISH_STALENESS,
+                default=config.get(
+                    MAX_PUBLISH_STALENESS, DEFAULT_MAX_PUBLISH_STALENESS
+                ),
+            ): _seconds_selector(),
+            vol.Optional(
+                IMPORT_STATISTICS,
+                default=config.get(IMPORT_STATISTICS, False),
+            ): selector.BooleanSelector(),
+            vol.Optional(
+                CRASH_JOURNAL,
+                default=config.get(CRASH_JOURNAL, False),
+            ): selector.BooleanSelector(),
         }
     )
 
 
+def _publish_settings(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Return the publish, statistics and journal settings from the sensors step."""
+    return {
+        IMPORT_STATISTICS: user_input.get(IMPORT_STATISTICS, False),
+        CRASH_JOURNAL: user_input.get(CRASH_JOURNAL, False),
+        MIN_PUBLISH_INTERVAL: user_input.get(
+            MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL
+        ),
+        MAX_PUBLISH_STALENESS: user_input.get(
+            MAX_PUBLISH_STALENESS, DEFAULT_MAX_PUBLISH_STALENESS
+        ),
+    }
+
+
 def _normalize_sensor_selection(selected: list[str], is_power: bool) -> list[str]:
     """Normalize sensor selection.
 
@@ -215,7 +357,9 @@ class DynamicEnergyCostConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="user",
-            data_schema=self.add_suggested_values_to_schema(_schema(), user_input),
+            data_schema=self.add_suggested_values_to_schema(
+                _schema(aggregate_options=_aggregate_options(self.hass)), user_input
+            ),
             errors=errors,
             last_step=False,
             description_placeholders={
@@ -229,16 +373,21 @@ class DynamicEnergyCostConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_sensors(self, user_input=None):
         """Handle the sensor selection step."""
         assert self._user_input is not None
-        is_power = bool(self._user_input.get(POWER_SENSOR))
+        is_power = _is_power(self._user_input)
         errors = {}
 
         if user_input is not None:
             selected = user_input.get(SELECTED_SENSORS, [])
             if not selected:
                 errors["base"] = "no_sensors_selected"
+            elif user_input.get(IMPORT_STATISTICS) and not _imports_statistics(
+                self._user_input
+            ):
+                errors["base"] = "statistics_single_source"
             else:
                 normalized = _normalize_sensor_selection(selected, is_power)
                 self._user_input[SELECTED_SENSORS] = normalized
+                self._user_input.update(_publish_settings(user_input))
                 _LOGGER.info("Config entry created successfully")
                 return self.async_create_entry(
                     title=f"Dynamic Energy Cost - {self._user_input['integration_description']}",
@@ -290,7 +439,13 @@ class DynamicEnergyCostOptionsFlow(config_entries.OptionsFlow):
         return self.async_show_form(
             step_id="user",
             data_schema=self.add_suggested_values_to_schema(
-                _schema(current_values, use_defaults=False),
+                _schema(
+                    current_values,
+                    use_defaults=False,
+                    aggregate_options=_aggregate_options(
+                        self.hass, self._config_entry.entry_id
+                    ),
+                ),
                 user_input or current_values,
             ),
             errors=errors,
@@ -300,21 +455,30 @@ class DynamicEnergyCostOptionsFlow(config_entries.OptionsFlow):
     async def async_step_sensors(self, user_input=None):
         """Handle the sensor selection step."""
         assert self._user_input is not None
-        is_power = bool(self._user_input.get(POWER_SENSOR))
+        is_power = _is_power(self._user_input)
         errors = {}
 
         if user_input is not None:
             selected = user_input.get(SELECTED_SENSORS, [])
             if not selected:
                 errors["base"] = "no_sensors_selected"
+            elif user_input.get(IMPORT_STATISTICS) and not _imports_statistics(
+                self._user_input
+            ):
+                errors["base"] = "statistics_single_source"
             else:
                 normalized = _normalize_sensor_selection(selected, is_power)
                 self._user_input[SELECTED_SENSORS] = normalized
+                self._user_input.update(_publish_settings(user_input))
                 return self.async_create_entry(title="", data=self._user_input)
 
         current_selected = list(get_selected_sensors(self._config_entry))
         return self.async_show_form(
             step_id="sensors",
-            data_schema=_sensor_selection_schema(is_power, defaults=current_selected),
+            data_schema=_sensor_selection_schema(
+                is_power,
+                defaults=current_selected,
+                config={**self._config_entry.data, **self._config_entry.options},
+            ),
             errors=errors,
         )
@@ -4,8 +4,14 @@ DOMAIN = "dynamic_energy_cost"
 ELECTRICITY_PRICE_SENSOR = "electricity_price_sensor"
 POWER_SENSOR = "power_sensor"
 ENERGY_SENSOR = "energy_sensor"
+# Multi-consumer entries: several sources sharing one price sensor
+POWER_SENSORS = "power_sensors"
+ENERGY_SENSORS = "energy_sensors"
+# Aggregate entries: the summed cost of other entries
+AGGREGATE_ENTRIES = "aggregate_entries"
 SERVICE_RESET_COST = "reset_cost"
 SERVICE_CALIBRATE = "calibrate"
+SERVICE_REBUILD_STATISTICS = "rebuild_statistics"
 
 QUARTERLY = "quarterly"
 HOURLY = "hourly"
@@ -28,3 +34,11 @@ SENSOR_LABELS = {
     YEARLY: "Yearly Cost",
     MANUAL: "Manual Cost (no automatic reset)",
 }
+
+MIN_PUBLISH_INTERVAL = "min_publish_interval"
+MAX_PUBLISH_STALENESS = "max_publish_staleness"
+DEFAULT_MIN_PUBLISH_INTERVAL = 0
+DEFAULT_MAX_PUBLISH_STALENESS = 300
+
+IMPORT_STATISTICS = "import_statistics"
+CRASH_JOURNAL = "crash_journal"
@@ -0,0 +1,666 @@
+"""Multi-consumer engines for Dynamic Energy Costs.
+
+A multi-consumer entry tracks many power or energy sensors against one
+shared price sensor.  One engine holds the interval totals of every
+consumer in a single bucket array, with a slot named
+``"<source entity_id>:<interval>"``, so a price change or an interval
+reset updates all consumers in one vectorized step.  The entry subscribes
+to its sources and to the price feed once, and arms one reset action per
+interval instead of one per sensor.
+
+Each consumer's cost sensors are bound to a ``ConsumerSource`` view, which
+offers them the interface of a single-source engine.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime
+from functools import partial
+import logging
+import math
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from . import INTERVALS
+from .boundaries import boundary_calendar
+from .core import EnergyAccumulator, EnergyReading, PowerRatesAccumulator
+from .engine import (
+    _is_total_increasing,
+    _last_reset_changed,
+    _record_lag,
+    _state_time,
+)
+from .event_filter import unchanged_reason
+from .price_hub import PriceFeed, async_get_price_hub
+from .reset_scheduler import async_get_reset_scheduler
+from .runtime import RuntimeCounters
+from .storage import EntryStore, StoredBuckets
+from .units import (
+    UnitFactorCache,
+    _energy_factor_for_unit,
+    _power_factor_for_unit,
+    _state_to_float,
+)
+
+if TYPE_CHECKING:
+    from .sensor import EnergyCostSensor, PowerCostSensor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _slot_name(source_id: str, interval: str) -> str:
+    return f"{source_id}:{interval}"
+
+
+class _ConsumerEngine(ABC):
+    """Slots, subscriptions and interval resets shared by every consumer.
+
+    Slots are laid out consumer by consumer, each with one slot per
+    interval.  Statistics import and recorder backfill are per-source
+    features and stay with single-source entries: a restored energy
+    consumer accrues the consumption of a downtime at the first reading
+    after it, a restored power consumer starts integrating again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        source_ids: list[str],
+        price_sensor_id: str,
+        accumulator: EnergyAccumulator | PowerRatesAccumulator,
+    ) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self.source_ids = list(source_ids)
+        self._price_sensor_id = price_sensor_id
+        self._price_hub = async_get_price_hub(hass)
+        self.accumulator = accumulator
+        self.buckets = accumulator.buckets
+        self.counters = RuntimeCounters()
+        self.statistics = None
+        self.stored: StoredBuckets | None = None
+        self._source_index = {source: index for index, source in enumerate(source_ids)}
+        self._slot_source = np.repeat(np.arange(len(self.source_ids)), len(INTERVALS))
+        self._slot_interval = np.tile(np.array(INTERVALS), len(self.source_ids))
+        self._sensors: list[list[EnergyCostSensor | PowerCostSensor]] = [
+            [] for _ in self.source_ids
+        ]
+        self._registered = 0
+        self._resets: dict[str, CALLBACK_TYPE] = {}
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @staticmethod
+    def slot_names(source_ids: list[str]) -> list[str]:
+        """Return the bucket slot names of the given consumers."""
+        return [
+            _slot_name(source, interval)
+            for source in source_ids
+            for interval in INTERVALS
+        ]
+
+    def source_mask(self, index: int) -> np.ndarray:
+        """Return the mask of a consumer's slots."""
+        return self._slot_source == index
+
+    @callback
+    def async_register(
+        self, index: int, sensor: EnergyCostSensor | PowerCostSensor
+    ) -> CALLBACK_TYPE:
+        """Register a consumer's interval sensor; returns an unregister callback."""
+        interval = str(self._slot_interval[sensor.bucket_slot])
+        self._sensors[index].append(sensor)
+        self.buckets.active[sensor.bucket_slot] = True
+        if self.stored is not None:
+            self.stored.track(sensor.bucket_slot)
+        self._async_schedule_reset(interval)
+        self._async_registered()
+
+        @callback
+        def _async_unregister() -> None:
+            self._sensors[index].remove(sensor)
+            self.buckets.active[sensor.bucket_slot] = False
+            if not self.buckets.active[self._slot_interval == interval].any():
+                if (unsub := self._resets.pop(interval, None)) is not None:
+                    unsub()
+            self._async_unregistered()
+
+        return _async_unregister
+
+    @callback
+    def _async_registered(self) -> None:
+        """Subscribe to the sources when the first sensor or listener registers."""
+        self._registered += 1
+        if self._registered == 1:
+            self._async_subscribe()
+
+    @callback
+    def _async_unregistered(self) -> None:
+        """Unsubscribe from the sources when the last one leaves."""
+        self._registered -= 1
+        if not self._registered:
+            while self._unsubs:
+                self._unsubs.pop()()
+
+    @callback
+    def _async_subscribe(self) -> None:
+        """Track every source with one listener and the shared price feed."""
+        self._async_resolve_sources()
+        self._unsubs = [
+            async_track_state_change_event(
+                self.hass, self.source_ids, self._async_handle_source_event
+            ),
+            self._price_hub.async_subscribe(
+                self._price_sensor_id, self._async_handle_price_update
+            ),
+        ]
+        _LOGGER.debug(
+            "Engine subscribed to %s consumers and %s",
+            len(self.source_ids),
+            self._price_sensor_id,
+        )
+
+    @callback
+    def _async_schedule_reset(self, interval: str) -> None:
+        """Reset an interval of every consumer at its next boundary."""
+        if interval in self._resets:
+            return
+        current_time = dt_util.now()
+        next_reset = boundary_calendar(current_time.tzinfo).next_boundary(
+            interval, current_time
+        )
+        if next_reset is None:
+            return
+        self._resets[interval] = async_get_reset_scheduler(self.hass).async_schedule(
+            next_reset, partial(self._async_reset_interval, interval)
+        )
+
+    @callback
+    def _async_reset_interval(self, interval: str, _fired_at: datetime) -> None:
+        """Reset an interval of every consumer at once and publish the sensors."""
+        self._resets.pop(interval, None)
+        reset_time = dt_util.now()
+        mask = self.buckets.active & (self._slot_interval == interval)
+        # Aggregates collect what the sensors accrued before the boundary
+        for sensors in self._sensors:
+            for sensor in sensors:
+                if mask[sensor.bucket_slot]:
+                    sensor.async_settle_cost(reset_time)
+        self._reset(mask, reset_time)
+        self.counters.count("resets")
+        for sensors in self._sensors:
+            for sensor in sensors:
+                if mask[sensor.bucket_slot]:
+                    sensor.async_publish_reset(reset_time)
+        self._async_mark_changed()
+        self._async_schedule_reset(interval)
+
+    @callback
+    def _async_mark_changed(self) -> None:
+        """Have the entry's journal record a change of the buckets."""
+        if self.stored is not None:
+            self.stored.async_mark_changed()
+
+    @abstractmethod
+    def _async_resolve_sources(self) -> None:
+        """Read the unit of every source sensor that has a state."""
+
+    @abstractmethod
+    def _reset(self, mask: np.ndarray, when: datetime) -> None:
+        """Reset the slots selected by mask at when."""
+
+    @callback
+    @abstractmethod
+    def _async_handle_source_event(self, event: Event) -> None:
+        """Handle a state change of one of the source sensors."""
+
+    @callback
+    @abstractmethod
+    def _async_handle_price_update(self, feed: PriceFeed) -> None:
+        """Handle a price change of the shared price feed."""
+
+
+class MultiEnergyCostEngine(_ConsumerEngine):
+    """Price the readings of many energy sensors against one price sensor.
+
+    A reading only updates its own consumer's slots.  A price change reads
+    every consumer once and finalizes all of them at the outgoing price in
+    a single masked operation over per-slot reading arrays.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        energy_sensor_ids: list[str],
+        price_sensor_id: str,
+    ) -> None:
+        """Initialize the engine."""
+        super().__init__(
+            hass,
+            energy_sensor_ids,
+            price_sensor_id,
+            EnergyAccumulator(self.slot_names(energy_sensor_ids)),
+        )
+        self._units = [
+            UnitFactorCache(_energy_factor_for_unit, 1.0) for _ in self.source_ids
+        ]
+
+    @callback
+    def async_attach_store(self, store: EntryStore) -> None:
+        """Restore the totals of every consumer and save them in the entry store."""
+        self.stored = StoredBuckets(store, "energy", self.buckets, dt_util.utcnow)
+
+    def source(self, source_id: str) -> EnergyConsumer:
+        """Return the view of one consumer, for its cost sensors."""
+        return EnergyConsumer(self, self._source_index[source_id])
+
+    @callback
+    def energy_to_kwh(self, index: int) -> float:
+        """Return the factor converting a consumer's unit to kWh."""
+        return self._units[index].factor
+
+    def set_energy_to_kwh(self, index: int, value: float) -> None:
+        """Set the factor converting a consumer's unit to kWh."""
+        self._units[index].factor = value
+
+    def _async_resolve_sources(self) -> None:
+        """Resolve the energy unit of every consumer."""
+        for unit, source in zip(self._units, self.source_ids, strict=True):
+            unit.resolve(self.hass.states.get(source))
+
+    def energy_reading(self, index: int, event: Event) -> EnergyReading | None:
+        """Resolve a consumer's energy event, or None when a source is unusable."""
+        new_state = event.data.get("new_state")
+        old_state = event.data.get("old_state")
+        _record_lag(self.counters, _state_time(new_state))
+        current_energy = _state_to_float(new_state)
+        price = self._price_hub.price(
+            self._price_sensor_id,
+            new_state.last_updated if new_state is not None else None,
+        )
+
+        if current_energy is None or price is None:
+            return None
+
+        return EnergyReading(
+            current_energy=current_energy,
+            price=price,
+            energy_to_kwh=self._units[index].resolve(new_state),
+            total_increasing=_is_total_increasing(new_state),
+            source_was_reset=(
+                current_energy == 0 or _last_reset_changed(old_state, new_state)
+            ),
+        )
+
+    def slot_readings(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return every slot's current reading, kWh factor and total_increasing.
+
+        An unusable source reads NaN.
+        """
+        readings = []
+        factors = []
+        total_increasing = []
+        for unit, source in zip(self._units, self.source_ids, strict=True):
+            state = self.hass.states.get(source)
+            reading = _state_to_float(state)
+            readings.append(math.nan if reading is None else reading)
+            factors.append(unit.resolve(state))
+            total_increasing.append(_is_total_increasing(state))
+        count = len(INTERVALS)
+        return (
+            np.repeat(np.array(readings, dtype=float), count),
+            np.repeat(np.array(factors, dtype=float), count),
+            np.repeat(np.array(total_increasing, dtype=bool), count),
+        )
+
+    def _reset(self, mask: np.ndarray, when: datetime) -> None:
+        """Zero the selected slots and restart them from the current readings."""
+        readings, _, _ = self.slot_readings()
+        self.buckets.reset(mask, when, readings[mask])
+
+    @callback
+    def _async_handle_source_event(self, event: Event) -> None:
+        """Apply an energy reading to the intervals of its consumer."""
+        started = perf_counter_ns()
+        self.counters.count("energy_events")
+        try:
+            if (reason := unchanged_reason(event)) is not None:
+                self.counters.skip(reason)
+                return
+            index = self._source_index[event.data["entity_id"]]
+            reading = self.energy_reading(index, event)
+            if reading is None:
+                _LOGGER.debug("One or more sensors are unavailable. Skipping update.")
+                self.counters.skip("unavailable")
+                return
+            accrued = self.accumulator.apply(
+                reading, self.buckets.active & self.source_mask(index)
+            )
+            self._async_mark_changed()
+            for sensor in self._sensors[index]:
+                if accrued[sensor.bucket_slot]:
+                    sensor.async_publish()
+        except Exception as e:
+            _LOGGER.error("Failed to update energy costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+    @callback
+    def _async_handle_price_update(self, feed: PriceFeed) -> None:
+        """Finalize every consumer's accrued cost at the old price."""
+        started = perf_counter_ns()
+        self.counters.count("price_events")
+        try:
+            if feed.previous_price is None:
+                _LOGGER.debug("One or more sensors are unavailable. Skipping update.")
+                self.counters.skip("unavailable")
+                return
+            readings, factors, total_increasing = self.slot_readings()
+            usable = np.isfinite(readings)
+            self.accumulator.apply(
+                EnergyReading(readings, feed.previous_price, factors, total_increasing),
+                self.buckets.active & usable,
+            )
+            self._async_mark_changed()
+            for sensors in self._sensors:
+                for sensor in sensors:
+                    if usable[sensor.bucket_slot]:
+                        sensor.async_publish()
+        except Exception as e:
+            _LOGGER.error("Failed to update energy costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+
+class MultiPowerCostEngine(_ConsumerEngine):
+    """Integrate the cost rates of many power sensors against one price sensor.
+
+    Every rate is settled up to each power or price event in one
+    vectorized step, then the consumer's new rate is taken.  A power event
+    only publishes its own consumer's sensors; the others publish on their
+    own events.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        power_sensor_ids: list[str],
+        price_sensor_id: str,
+    ) -> None:
+        """Initialize the engine."""
+        super().__init__(
+            hass,
+            power_sensor_ids,
+            price_sensor_id,
+            PowerRatesAccumulator(self.slot_names(power_sensor_ids)),
+        )
+        self._units = [
+            UnitFactorCache(_power_factor_for_unit, 0.001) for _ in self.source_ids
+        ]
+        # Last good power reading of each consumer in kW, NaN until known
+        self.power_kw = np.full(len(self.source_ids), np.nan)
+        self._rate_listeners: list[list[Callable[[], None]]] = [
+            [] for _ in self.source_ids
+        ]
+
+    @callback
+    def async_attach_store(self, store: EntryStore) -> None:
+        """Restore the totals of every consumer and save them in the entry store.
+
+        The rates are settled up to now for every snapshot, and the journal
+        records it on every tick while a rate accrues.
+        """
+        self.stored = StoredBuckets(
+            store, "power", self.buckets, self._settled_until, self._accruing
+        )
+
+    def _accruing(self) -> bool:
+        """Return True while a non-zero rate accrues into a registered slot."""
+        return bool(self.accumulator.rates[self.buckets.active].any())
+
+    def _settled_until(self) -> datetime:
+        """Integrate the rates up to now and return the time they are settled to."""
+        self.settle()
+        return self.accumulator.last_update or dt_util.utcnow()
+
+    def source(self, source_id: str) -> PowerConsumer:
+        """Return the view of one consumer, for its cost sensors."""
+        return PowerConsumer(self, self._source_index[source_id])
+
+    @callback
+    def async_register(
+        self, index: int, sensor: EnergyCostSensor | PowerCostSensor
+    ) -> CALLBACK_TYPE:
+        """Register a consumer's interval sensor; returns an unregister callback."""
+        unregister = super().async_register(index, sensor)
+
+        @callback
+        def _async_unregister() -> None:
+            # Integrate up to now while the slot still accrues
+            self.settle()
+            unregister()
+
+        return _async_unregister
+
+    def rate_micros(self, index: int) -> int | None:
+        """Return a consumer's rate in micro-currency/h, or None if unknown."""
+        if math.isnan(self.power_kw[index]):
+            return None
+        return int(self.accumulator.rates[index * len(INTERVALS)])
+
+    @callback
+    def async_add_rate_listener(
+        self, index: int, listener: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever a consumer's rate is recomputed."""
+        self._rate_listeners[index].append(listener)
+        self._async_registered()
+
+        @callback
+        def _async_remove() -> None:
+            self._rate_listeners[index].remove(listener)
+            self._async_unregistered()
+
+        return _async_remove
+
+    @callback
+    def _async_resolve_sources(self) -> None:
+        """Read every consumer's power once and take the starting rates."""
+        self.accumulator.last_update = dt_util.utcnow()
+        for index, source in enumerate(self.source_ids):
+            self._update_power(index, self.hass.states.get(source))
+        self._update_rates()
+
+    def settle(self, when: datetime | None = None) -> np.ndarray:
+        """Integrate every rate up to ``when`` and return changed slots."""
+        current_time = dt_util.utcnow()
+        changed = self.accumulator.settle(
+            current_time if when is None else when, current_time
+        )
+        if changed.any():
+            self._async_mark_changed()
+        return changed
+
+    def _update_power(self, index: int, power_state) -> bool:
+        """Cache a consumer's power reading; False when it is unusable."""
+        power_usage = _state_to_float(power_state)
+        if power_usage is None or not math.isfinite(power_usage):
+            _LOGGER.warning(
+                "State of %s is not a number, skipping update",
+                self.source_ids[index],
+            )
+            return False
+        self.power_kw[index] = power_usage * self._units[index].resolve(power_state)
+        return True
+
+    def _update_rates(self) -> bool:
+        """Recompute every rate from the current price and cached power."""
+        electricity_price = self._price_hub.price(self._price_sensor_id)
+        if electricity_price is None:
+            _LOGGER.warning("Electricity price is unavailable, skipping update")
+            return False
+        self.accumulator.set_rates(
+            electricity_price, np.repeat(self.power_kw, len(INTERVALS))
+        )
+        self._async_mark_changed()
+        return True
+
+    def _reset(self, mask: np.ndarray, when: datetime) -> None:
+        """Settle every rate up to the boundary and zero the selected slots."""
+        self.settle(when)
+        self.buckets.reset(mask, when)
+
+    @callback
+    def _async_publish(self, index: int, changed: np.ndarray) -> None:
+        """Publish a consumer's sensors that accrued and notify its rate listeners."""
+        for sensor in self._sensors[index]:
+            if changed[sensor.bucket_slot]:
+                sensor.async_publish()
+        for listener in self._rate_listeners[index]:
+            listener()
+
+    @callback
+    def _async_handle_source_event(self, event: Event) -> None:
+        """Settle every rate up to a power change and re-rate its consumer."""
+        started = perf_counter_ns()
+        self.counters.count("power_events")
+        try:
+            entity_id = event.data["entity_id"]
+            new_state = event.data.get("new_state")
+            if new_state is None:
+                _LOGGER.warning("State of %s is missing, skipping update", entity_id)
+                self.counters.skip("missing_state")
+                return
+            _record_lag(self.counters, _state_time(new_state))
+            if (reason := unchanged_reason(event)) is not None:
+                self.counters.skip(reason)
+                return
+            if new_state.state in ("unknown", "unavailable"):
+                _LOGGER.warning(
+                    "State of %s is '%s', skipping update", entity_id, new_state.state
+                )
+                self.counters.skip("unavailable")
+                return
+            index = self._source_index[entity_id]
+            changed = self.settle(_state_time(new_state))
+            if self._update_power(index, new_state):
+                self._update_rates()
+            self._async_publish(index, changed)
+        except Exception as e:
+            _LOGGER.error("Failed to update power costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+    @callback
+    def _async_handle_price_update(self, feed: PriceFeed) -> None:
+        """Settle every rate up to the price change, then re-rate all consumers."""
+        started = perf_counter_ns()
+        self.counters.count("price_events")
+        try:
+            if feed.price is None:
+                _LOGGER.warning(
+                    "State of %s is unavailable, skipping update", feed.entity_id
+                )
+                self.counters.skip("unavailable")
+                return
+            changed = self.settle(feed.last_updated)
+            self._update_rates()
+            for index in range(len(self.source_ids)):
+                self._async_publish(index, changed)
+        except Exception as e:
+            _LOGGER.error("Failed to update power costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+
+class ConsumerSource:
+    """One consumer of a multi-consumer engine, seen as a single-source engine.
+
+    The consumer's cost sensors are bound to this view, so they use the
+    shared buckets with their own slots; readings, price changes and
+    interval resets are handled by the engine.
+    """
+
+    def __init__(
+        self, engine: MultiEnergyCostEngine | MultiPowerCostEngine, index: int
+    ) -> None:
+        """Initialize the view of consumer index."""
+        self.engine = engine
+        self.index = index
+        self.source_id = engine.source_ids[index]
+        self.buckets = engine.buckets
+        self.statistics = None
+
+    @property
+    def stored(self) -> StoredBuckets | None:
+        """Return the engine's stored buckets."""
+        return self.engine.stored
+
+    def slot(self, interval: str) -> int:
+        """Return the bucket slot of an interval of this consumer."""
+        return self.buckets.slot(_slot_name(self.source_id, interval))
+
+    @callback
+    def async_register(
+        self, sensor: EnergyCostSensor | PowerCostSensor
+    ) -> CALLBACK_TYPE:
+        """Register an interval sensor and return a callback to unregister it."""
+        return self.engine.async_register(self.index, sensor)
+
+    async def async_rebuild_statistics(self, start: datetime) -> None:
+        """Statistics are not imported for consumers; see ``_ConsumerEngine``."""
+
+    @callback
+    def async_backfill(self, slot: int, since: datetime) -> None:
+        """Backfill is not done for consumers; see ``_ConsumerEngine``."""
+        _LOGGER.debug(
+            "Not backfilling %s since %s: consumers accrue from their next reading",
+            self.source_id,
+            since,
+        )
+
+
+class EnergyConsumer(ConsumerSource):
+    """View of one energy sensor of a multi-consumer entry."""
+
+    engine: MultiEnergyCostEngine
+
+    @property
+    def energy_to_kwh(self) -> float:
+        """Return the factor converting this consumer's unit to kWh."""
+        return self.engine.energy_to_kwh(self.index)
+
+    @energy_to_kwh.setter
+    def energy_to_kwh(self, value: float) -> None:
+        self.engine.set_energy_to_kwh(self.index, value)
+
+
+class PowerConsumer(ConsumerSource):
+    """View of one power sensor of a multi-consumer entry."""
+
+    engine: MultiPowerCostEngine
+
+    @property
+    def rate_micros(self) -> int | None:
+        """Return this consumer's rate in micro-currency/h."""
+        return self.engine.rate_micros(self.index)
+
+    def settle(self, when: datetime | None = None) -> np.ndarray:
+        """Integrate every rate of the engine up to ``when``."""
+        return self.engine.settle(when)
+
+    @callback
+    def async_add_rate_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever this consumer's rate is recomputed."""
+        return self.engine.async_add_rate_listener(self.index, listener)
@@ -0,0 +1,298 @@
+"""Home Assistant independent cost accumulation for Dynamic Energy Costs.
+
+The engines resolve source states into plain numbers and hand them to the
+accumulators here; nothing in this module touches ``hass``, states or
+entities.  The same code is driven by the offline replay script and can be
+tested and benchmarked without a Home Assistant instance.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from .buckets import IntervalBuckets, RateBuckets
+from .money import MICROS_PER_UNIT, elapsed_us, from_micros, to_micros
+
+
+@dataclass(slots=True)
+class EnergyReading:
+    """Source readings resolved once per event and shared by all intervals.
+
+    A reading of several sources holds per-slot arrays instead of scalars.
+    """
+
+    current_energy: float | np.ndarray
+    price: float  # currency/kWh
+    energy_to_kwh: float | np.ndarray
+    total_increasing: bool | np.ndarray
+    source_was_reset: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class GapCosts:
+    """Cost and energy accrued during a gap, attributed to points in time.
+
+    ``times`` are POSIX timestamps: the reading time for energy deltas and
+    the end of each constant-rate segment for power.  A slot only takes the
+    entries after its own cutoff.
+    """
+
+    times: np.ndarray
+    costs: np.ndarray
+    energy: np.ndarray
+
+    def total_after(self, cutoff: float) -> tuple[float, float]:
+        """Return the (cost, kWh) accrued after a cutoff timestamp."""
+        selected = self.times > cutoff
+        return float(self.costs[selected].sum()), float(self.energy[selected].sum())
+
+    def until(self, end: float) -> GapCosts:
+        """Return the entries attributed up to an ``end`` timestamp."""
+        selected = self.times <= end
+        return GapCosts(
+            self.times[selected], self.costs[selected], self.energy[selected]
+        )
+
+    def hourly(self, start: float, hours: int) -> np.ndarray:
+        """Return the cost of each hour from ``start``, by attribution time.
+
+        An entry exactly on an hour boundary belongs to the hour it ends.
+        """
+        index = np.ceil((self.times - start) / 3600).astype(np.int64) - 1
+        selected = (index >= 0) & (index < hours)
+        return np.bincount(
+            index[selected], weights=self.costs[selected], minlength=hours
+        )
+
+
+def _step_at(
+    times: np.ndarray, values: np.ndarray, at: np.ndarray, fallback: float
+) -> np.ndarray:
+    """Sample a step function, held from each sample time, at the given times."""
+    index = np.searchsorted(times, at, side="right") - 1
+    sampled = np.full(len(at), fallback, dtype=float)
+    known = index >= 0
+    sampled[known] = values[index[known]]
+    return sampled
+
+
+def energy_gap_costs(
+    reading_times: np.ndarray,
+    readings: np.ndarray,
+    price_times: np.ndarray,
+    prices: np.ndarray,
+    *,
+    energy_to_kwh: float,
+    total_increasing: bool,
+    fallback_price: float | None,
+) -> GapCosts:
+    """Price every energy delta of a gap at the price in effect when it was read.
+
+    ``readings[0]`` is the restored baseline.  A reading of zero, or a
+    decrease of a ``total_increasing`` source, is a source reset and only
+    rebases, like the live path.
+    """
+    deltas = np.diff(readings)
+    rebase = readings[1:] == 0
+    if total_increasing:
+        rebase |= deltas < 0
+    energy = np.where(rebase, 0.0, deltas) * energy_to_kwh
+    fallback = np.nan if fallback_price is None else fallback_price
+    price = _step_at(price_times, prices, reading_times[1:], fallback)
+    costs = np.nan_to_num(energy * price)
+    return GapCosts(reading_times[1:], costs, energy)
+
+
+def power_gap_costs(
+    power_times: np.ndarray,
+    power_kw: np.ndarray,
+    price_times: np.ndarray,
+    prices: np.ndarray,
+    *,
+    start: float,
+    end: float,
+    splits: list[float],
+    fallback_price: float | None,
+) -> GapCosts:
+    """Integrate the power rate over a gap as piecewise-constant segments.
+
+    Segments change wherever the power or price changes and are split at
+    ``splits`` (missed interval boundaries), so each one can be attributed
+    to the interval bucket it belongs to.  Time before the first known
+    power sample accrues nothing.
+    """
+    grid = np.unique(np.concatenate(([start, end], power_times, price_times, splits)))
+    grid = grid[(grid >= start) & (grid <= end)]
+    segment_start = grid[:-1]
+    hours = np.diff(grid) / 3600
+    fallback = np.nan if fallback_price is None else fallback_price
+    power = np.nan_to_num(_step_at(power_times, power_kw, segment_start, np.nan))
+    price = _step_at(price_times, prices, segment_start, fallback)
+    energy = power * hours
+    costs = np.nan_to_num(energy * price)
+    return GapCosts(grid[1:], costs, energy)
+
+
+class EnergyAccumulator:
+    """Interval totals of an energy source, fed with resolved readings."""
+
+    __slots__ = ("buckets",)
+
+    def __init__(self, intervals: list[str]) -> None:
+        """Initialize zeroed totals for the given intervals."""
+        self.buckets = IntervalBuckets(intervals)
+
+    def apply(
+        self, reading: EnergyReading, mask: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Apply a reading to the buckets and return the slots that accrued."""
+        return self.buckets.apply(
+            reading.current_energy,
+            reading.energy_to_kwh,
+            reading.price,
+            source_was_reset=reading.source_was_reset,
+            total_increasing=reading.total_increasing,
+            mask=mask,
+        )
+
+    def restart(self, slot: int, when: datetime) -> None:
+        """Zero the totals of a slot from ``when``, keeping its baseline."""
+        self.buckets.reset(
+            self.buckets.mask(slot), when, baseline=float(self.buckets.baseline[slot])
+        )
+
+    def close(self, slot: int, when: datetime) -> float:
+        """Return the cost of a slot and restart it, keeping its baseline."""
+        cost = float(self.buckets.cost[slot])
+        self.restart(slot, when)
+        return cost
+
+    def add_gap(
+        self,
+        slot: int,
+        gap: GapCosts,
+        since: datetime,
+        boundary: datetime | None = None,
+    ) -> None:
+        """Add the part of a gap after ``since`` to a slot.
+
+        A slot whose reset ``boundary`` fell inside the gap is closed there
+        first and only takes what was accrued after it.
+        """
+        cutoff = since
+        if boundary is not None:
+            self.restart(slot, boundary)
+            cutoff = max(cutoff, boundary)
+        cost, energy = gap.total_after(cutoff.timestamp())
+        self.buckets.cost[slot] += cost
+        self.buckets.energy[slot] += energy
+
+
+class PowerAccumulator:
+    """Interval totals of a piecewise-constant cost rate.
+
+    ``rate_micros`` is the current rate in micro-currency/h and
+    ``last_update`` the time up to which it has been integrated.
+    """
+
+    __slots__ = ("buckets", "last_update", "rate_micros")
+
+    def __init__(self, intervals: list[str]) -> None:
+        """Initialize zeroed totals for the given intervals."""
+        self.buckets = RateBuckets(intervals)
+        self.rate_micros: int | None = None
+        self.last_update: datetime | None = None
+
+    def settle(self, when: datetime, current_time: datetime) -> np.ndarray:
+        """Integrate the current rate up to ``when`` and return changed slots.
+
+        Integration only moves forward: a time at or before the last settled
+        one accrues nothing and a time after ``current_time`` is clamped.
+        """
+        when = min(when, current_time)
+        last_update = self.last_update
+        if last_update is not None and when <= last_update:
+            return np.zeros(len(self.buckets.intervals), dtype=bool)
+        self.last_update = when
+        if self.rate_micros is None or last_update is None:
+            return np.zeros(len(self.buckets.intervals), dtype=bool)
+        return self.buckets.integrate(self.rate_micros, elapsed_us(when - last_update))
+
+    def set_rate(self, price: float, power_kw: float) -> None:
+        """Set the rate from a price in currency/kWh and a power draw in kW.
+
+        Raises OverflowError or ValueError for non-finite inputs.
+        """
+        self.rate_micros = to_micros(price * power_kw)
+
+    def restart(self, slot: int, when: datetime) -> None:
+        """Zero the totals of a slot from ``when``."""
+        self.buckets.reset(self.buckets.mask(slot), when)
+
+    def close(self, slot: int, when: datetime) -> float:
+        """Return the cost of a slot, settled up to when, and restart it."""
+        self.settle(when, when)
+        cost = from_micros(int(self.buckets.cost[slot]))
+        self.restart(slot, when)
+        return cost
+
+    def add_gap(
+        self,
+        slot: int,
+        gap: GapCosts,
+        since: datetime,
+        boundary: datetime | None = None,
+    ) -> None:
+        """Add the part of a gap after ``since`` to a slot.
+
+        A slot whose reset ``boundary`` fell inside the gap is restarted
+        there first and only takes what was accrued after it.
+        """
+        cutoff = since
+        if boundary is not None:
+            self.restart(slot, boundary)
+            cutoff = max(cutoff, boundary)
+        cost, _ = gap.total_after(cutoff.timestamp())
+        self.buckets.cost[slot] += to_micros(cost)
+
+
+class PowerRatesAccumulator(PowerAccumulator):
+    """Interval totals of several piecewise-constant cost rates.
+
+    Each slot integrates its own rate, held in ``rates`` as micro-currency/h;
+    every rate is settled up to the same ``last_update``.  A slot whose
+    power is unknown has a zero rate.
+    """
+
+    __slots__ = ("rates",)
+
+    def __init__(self, intervals: list[str]) -> None:
+        """Initialize zeroed totals and rates for the given slots."""
+        super().__init__(intervals)
+        self.rates = np.zeros(len(self.buckets.intervals), np.int64)
+
+    def settle(self, when: datetime, current_time: datetime) -> np.ndarray:
+        """Integrate every rate up to ``when`` and return changed slots.
+
+        Integration only moves forward, as for a single rate.
+        """
+        when = min(when, current_time)
+        last_update = self.last_update
+        if last_update is not None and when <= last_update:
+            return np.zeros(len(self.buckets.intervals), dtype=bool)
+        self.last_update = when
+        if last_update is None:
+            return np.zeros(len(self.buckets.intervals), dtype=bool)
+        return self.buckets.integrate_rates(self.rates, elapsed_us(when - last_update))
+
+    def set_rates(self, price: float, power_kw: np.ndarray) -> None:
+        """Set every rate from a price in currency/kWh and per-slot power in kW.
+
+        Rounds like ``to_micros``; a slot with an unknown (NaN) power gets
+        a zero rate.
+        """
+        rates = np.rint(price * power_kw * MICROS_PER_UNIT)
+        self.rates = np.where(np.isfinite(rates), rates, 0).astype(np.int64)
@@ -0,0 +1,37 @@
+"""Diagnostics support for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import get_entry_config
+from .const import ELECTRICITY_PRICE_SENSOR
+from .price_hub import async_get_price_hub
+from .runtime import EntryRuntime
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the configuration and runtime counters of a config entry.
+
+    The price feed is shared by every entry using the same price sensor.
+    """
+    runtime: EntryRuntime = getattr(entry, "runtime_data", None) or EntryRuntime()
+    config = get_entry_config(entry)
+    feed = async_get_price_hub(hass).feed(config.get(ELECTRICITY_PRICE_SENSOR))
+    return {
+        "config": config,
+        "price_feed": feed.counters.as_dict() if feed is not None else None,
+        "engines": [
+            {"engine": type(engine).__name__, **engine.counters.as_dict()}
+            for engine in runtime.engines
+        ],
+        "sensors": {
+            sensor.entity_id or sensor.name: sensor.counters.as_dict()
+            for sensor in runtime.sensors
+        },
+    }
@@ -0,0 +1,808 @@
+"""Shared per-entry accumulation engine for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Sequence
+from datetime import datetime
+import logging
+import math
+from time import perf_counter_ns, time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from . import INTERVALS
+from .backfill import (
+    GapWindow,
+    async_run_backfill,
+    compute_energy_gap,
+    compute_power_gap,
+    empty_energy_gap,
+    missed_boundary,
+    recorder_available,
+)
+from .core import EnergyAccumulator, EnergyReading, GapCosts, PowerAccumulator
+from .event_filter import unchanged_reason
+from .price_hub import PriceFeed, async_get_price_hub
+from .runtime import RuntimeCounters
+from .statistics import (
+    STATISTICS_SLOT,
+    CostStatistics,
+    compute_energy_hours,
+    compute_power_hours,
+)
+from .storage import EntryStore, StoredBuckets
+from .units import (
+    UnitFactorCache,
+    _energy_factor_for_unit,
+    _power_factor_for_unit,
+    _state_to_float,
+)
+
+if TYPE_CHECKING:
+    from .sensor import EnergyCostSensor, PowerCostSensor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _last_reset_changed(old_state, new_state) -> bool:
+    """Detect a source-sensor reset via the ``last_reset`` attribute.
+
+    Canonical signal for ``state_class=total`` resetting sensors (e.g. HA's
+    ``utility_meter`` helper). Returns True when ``new_state.last_reset`` is
+    set and differs from ``old_state.last_reset``.
+    """
+    if old_state is None or new_state is None:
+        return False
+    old_lr = old_state.attributes.get("last_reset")
+    new_lr = new_state.attributes.get("last_reset")
+    return new_lr is not None and old_lr != new_lr
+
+
+def _is_total_increasing(state) -> bool:
+    """Return True for ``total_increasing`` sources, where a decrease is a reset.
+
+    Per HA convention any decrease on a ``total_increasing`` sensor is a reset.
+    Covers ESPHome ``total_daily_energy`` and most polling integrations that
+    skip the explicit ``0`` reading (e.g. Deye Modbus).
+    """
+    return (
+        state is not None and state.attributes.get("state_class") == "total_increasing"
+    )
+
+
+def _state_time(state) -> datetime | None:
+    """Return when a source state was written, or None if it carries no time.
+
+    ``last_updated`` is stamped when the state is set, so integrating over it
+    does not depend on how long the event waited in the event loop.
+    """
+    last_updated = getattr(state, "last_updated", None)
+    return last_updated if isinstance(last_updated, datetime) else None
+
+
+def _record_lag(counters: RuntimeCounters, when: datetime | None) -> None:
+    """Record the time between a state being written and being processed."""
+    if when is not None:
+        counters.record_lag(time() - when.timestamp())
+
+
+@callback
+def _async_apply_gap(
+    accumulator: EnergyAccumulator | PowerAccumulator,
+    sensors: Sequence[EnergyCostSensor | PowerCostSensor],
+    slot: int,
+    gap: GapCosts,
+    since: datetime,
+    boundary: datetime | None,
+) -> None:
+    """Add a backfilled gap to a slot and publish the slot's sensor.
+
+    A slot that missed its reset ``boundary`` is restarted there first.
+    Like at a scheduled reset, its sensor reports the cost accrued before
+    the boundary and measures later cost from the restarted total, so an
+    aggregate only receives the part of the gap after the boundary.
+    """
+    sensor = next((sensor for sensor in sensors if sensor.bucket_slot == slot), None)
+    if boundary is not None:
+        if sensor is not None:
+            sensor.async_settle_cost(boundary)
+        accumulator.restart(slot, boundary)
+        if sensor is not None:
+            sensor.async_publish_reset(boundary)
+        since = max(since, boundary)
+    accumulator.add_gap(slot, gap, since)
+    if sensor is not None:
+        sensor.async_publish()
+
+
+class EnergyCostEngine:
+    """Subscribe once per source sensor and fan readings out to interval sensors.
+
+    Every selected interval of a config entry shares the same energy and
+    price sensors.  The engine owns the state-change subscriptions, parses
+    the source states and unit factors once per event and applies the
+    reading to an ``EnergyAccumulator``, which updates every interval in
+    one vectorized step.  Registered ``EnergyCostSensor`` entities only publish the
+    totals of their own slot.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        energy_sensor_id: str,
+        price_sensor_id: str,
+    ) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self._energy_sensor_id = energy_sensor_id
+        self._price_sensor_id = price_sensor_id
+        self._price_hub = async_get_price_hub(hass)
+        self._sensors: list[EnergyCostSensor] = []
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self.accumulator = EnergyAccumulator([*INTERVALS, STATISTICS_SLOT])
+        self.buckets = self.accumulator.buckets
+        self.counters = RuntimeCounters()
+        self._energy_unit = UnitFactorCache(_energy_factor_for_unit, 1.0)
+        self.statistics: CostStatistics | None = None
+        self.stored: StoredBuckets | None = None
+        self._backfill_windows: dict[int, GapWindow] = {}
+        self._backfill_task: asyncio.Task | None = None
+
+    @property
+    def energy_to_kwh(self) -> float:
+        """Return the factor converting the energy sensor's unit to kWh."""
+        return self._energy_unit.factor
+
+    @energy_to_kwh.setter
+    def energy_to_kwh(self, value: float) -> None:
+        self._energy_unit.factor = value
+
+    @callback
+    def async_attach_store(self, store: EntryStore) -> None:
+        """Restore the interval totals from the entry's store and save them there.
+
+        Energy totals are accurate up to the moment they are saved.
+        """
+        self.stored = StoredBuckets(store, "energy", self.buckets, dt_util.utcnow)
+
+    @callback
+    def _async_mark_changed(self) -> None:
+        """Have the entry's journal record a change of the buckets."""
+        if self.stored is not None:
+            self.stored.async_mark_changed()
+
+    def slot(self, interval: str) -> int:
+        """Return the bucket slot of an interval."""
+        return self.buckets.slot(interval)
+
+    @callback
+    def async_register(self, sensor: EnergyCostSensor) -> CALLBACK_TYPE:
+        """Register an interval sensor and return a callback to unregister it."""
+        self._sensors.append(sensor)
+        self.buckets.active[sensor.bucket_slot] = True
+        if self.stored is not None:
+            self.stored.track(sensor.bucket_slot)
+        if len(self._sensors) == 1:
+            self._async_subscribe()
+
+        @callback
+        def _async_unregister() -> None:
+            self._sensors.remove(sensor)
+            self.buckets.active[sensor.bucket_slot] = False
+            if not self._sensors:
+                self._async_unsubscribe()
+
+        return _async_unregister
+
+    @callback
+    def _async_subscribe(self) -> None:
+        """Resolve the energy unit and track both source sensors."""
+        self._energy_unit.resolve(self.hass.states.get(self._energy_sensor_id))
+        self._unsubs = [
+            async_track_state_change_event(
+                self.hass, self._energy_sensor_id, self._async_handle_energy_event
+            ),
+            # track also the price sensor changes for more accuracy
+            self._price_hub.async_subscribe(
+                self._price_sensor_id, self._async_handle_price_update
+            ),
+        ]
+        _LOGGER.debug(
+            "Engine subscribed to %s and %s",
+            self._energy_sensor_id,
+            self._price_sensor_id,
+        )
+
+    @callback
+    def _async_unsubscribe(self) -> None:
+        """Stop tracking the source sensors."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def async_enable_statistics(self, statistics: CostStatistics) -> CALLBACK_TYPE:
+        """Accumulate hourly cost for imported statistics; returns a stop callback."""
+        self.statistics = statistics
+        slot = self.buckets.slot(STATISTICS_SLOT)
+        self.buckets.active[slot] = True
+
+        @callback
+        def _async_close_hour(boundary: datetime) -> float:
+            return self.accumulator.close(slot, boundary)
+
+        return statistics.async_track_hours(_async_close_hour)
+
+    async def async_rebuild_statistics(self, start: datetime) -> None:
+        """Recompute the imported hourly statistics since start from history."""
+        if self.statistics is None:
+            return
+        await self.statistics.async_rebuild(
+            start,
+            compute_energy_hours,
+            self._energy_sensor_id,
+            self._price_sensor_id,
+            self.energy_to_kwh,
+            _is_total_increasing(self.hass.states.get(self._energy_sensor_id)),
+        )
+
+    @callback
+    def async_backfill(self, slot: int, since: datetime) -> None:
+        """Price the consumption between a restored state and now from history.
+
+        Live accrual of the slot restarts at the current reading; the energy
+        read between ``since`` and now is priced from recorder history on
+        the executor.  Slots restored together share one history read.
+        """
+        if not recorder_available(self.hass):
+            return
+        baseline = float(self.buckets.baseline[slot])
+        energy_state = self.hass.states.get(self._energy_sensor_id)
+        end_reading = _state_to_float(energy_state)
+        if np.isnan(baseline) or end_reading is None:
+            return
+
+        self._backfill_windows[slot] = GapWindow(
+            since, dt_util.utcnow(), baseline, end_reading
+        )
+        self.buckets.baseline[slot] = end_reading
+        if self._backfill_task is None:
+            self._energy_unit.resolve(energy_state)
+            self._backfill_task = self.hass.async_create_background_task(
+                self._async_backfill(),
+                f"dynamic_energy_cost backfill {self._energy_sensor_id}",
+            )
+
+    async def _async_backfill(self) -> None:
+        """Apply the gap history to the restored slots, one read per pass.
+
+        Slots restored while a pass reads history are left for the next one.
+        """
+        try:
+            while self._backfill_windows:
+                windows, self._backfill_windows = self._backfill_windows, {}
+                await self._async_backfill_pass(windows)
+        finally:
+            self._backfill_task = None
+
+    async def _async_backfill_pass(self, windows: dict[int, GapWindow]) -> None:
+        """Price one history read for every window from its own baseline."""
+        price = self._price_hub.price(self._price_sensor_id)
+        total_increasing = _is_total_increasing(
+            self.hass.states.get(self._energy_sensor_id)
+        )
+        try:
+            gaps = await async_run_backfill(
+                self.hass,
+                compute_energy_gap,
+                self._energy_sensor_id,
+                self._price_sensor_id,
+                list(windows.values()),
+                self.energy_to_kwh,
+                total_increasing,
+                price,
+            )
+        except Exception as e:
+            _LOGGER.error(
+                "Failed to backfill %s from recorder history: %s",
+                self._energy_sensor_id,
+                str(e),
+            )
+            gaps = [
+                empty_energy_gap(
+                    window,
+                    energy_to_kwh=self.energy_to_kwh,
+                    total_increasing=total_increasing,
+                    price=price,
+                )
+                for window in windows.values()
+            ]
+
+        for (slot, window), gap in zip(windows.items(), gaps, strict=True):
+            _async_apply_gap(
+                self.accumulator,
+                self._sensors,
+                slot,
+                gap,
+                window.since,
+                missed_boundary(
+                    self.buckets.intervals[slot],
+                    self.buckets.get_last_reset(slot),
+                    window.end,
+                ),
+            )
+
+    def energy_reading(self, event: Event) -> EnergyReading | None:
+        """Resolve an energy sensor event, or None when a source is unusable."""
+        new_state = event.data.get("new_state")
+        old_state = event.data.get("old_state")
+        _record_lag(self.counters, _state_time(new_state))
+        current_energy = _state_to_float(new_state)
+        # Price the delta at the time it was measured, so a late price event
+        # does not apply the previous slot's price to the new slot
+        price = self._price_hub.price(
+            self._price_sensor_id,
+            new_state.last_updated if new_state is not None else None,
+        )
+
+        if current_energy is None or price is None:
+            return None
+
+        return EnergyReading(
+            current_energy=current_energy,
+            price=price,
+            # Only recomputed when the unit string changes, which also covers
+            # a sensor that was unavailable at startup
+            energy_to_kwh=self._energy_unit.resolve(new_state),
+            total_increasing=_is_total_increasing(new_state),
+            source_was_reset=(
+                current_energy == 0 or _last_reset_changed(old_state, new_state)
+            ),
+        )
+
+    def price_reading(self, previous_price: float | None) -> EnergyReading | None:
+        """Resolve a price change, priced at the outgoing (previous) price."""
+        energy_state = self.hass.states.get(self._energy_sensor_id)
+        current_energy = _state_to_float(energy_state)
+
+        if current_energy is None or previous_price is None:
+            return None
+
+        return EnergyReading(
+            current_energy=current_energy,
+            price=previous_price,
+            energy_to_kwh=self._energy_unit.resolve(energy_state),
+            total_increasing=_is_total_increasing(energy_state),
+        )
+
+    def apply_reading(
+        self, reading: EnergyReading, mask: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Apply a reading to the buckets and return the slots that accrued."""
+        accrued = self.accumulator.apply(reading, mask)
+        self._async_mark_changed()
+        return accrued
+
+    @callback
+    def _async_handle_energy_event(self, event: Event) -> None:
+        """Compute the energy reading once and apply it to every interval."""
+        started = perf_counter_ns()
+        self.counters.count("energy_events")
+        try:
+            if (reason := unchanged_reason(event)) is not None:
+                self.counters.skip(reason)
+                return
+            reading = self.energy_reading(event)
+            if reading is None:
+                _LOGGER.debug("One or more sensors are unavailable. Skipping update.")
+                self.counters.skip("unavailable")
+                return
+            accrued = self.apply_reading(reading)
+            for sensor in self._sensors:
+                if accrued[sensor.bucket_slot]:
+                    sensor.async_publish()
+        except Exception as e:
+            _LOGGER.error("Failed to update energy costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+    @callback
+    def _async_handle_price_update(self, feed: PriceFeed) -> None:
+        """Finalize accrued cost at the old price for every interval."""
+        started = perf_counter_ns()
+        self.counters.count("price_events")
+        try:
+            reading = self.price_reading(feed.previous_price)
+            if reading is None:
+                _LOGGER.debug("One or more sensors are unavailable. Skipping update.")
+                self.counters.skip("unavailable")
+                return
+            self.apply_reading(reading)
+            for sensor in self._sensors:
+                sensor.async_publish()
+        except Exception as e:
+            _LOGGER.error("Failed to update energy costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+
+class PowerCostEngine:
+    """Integrate the cost rate of a power sensor directly into interval buckets.
+
+    The engine tracks the power sensor and the shared price feed once per
+    config entry and, on every change, has a ``PowerAccumulator``
+    integrate the outgoing rate over the elapsed time and take the new
+    one.  Interval sensors no longer listen to the Real
+    Time Cost entity; that entity is an optional output that publishes
+    ``rate_micros`` when notified.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        power_sensor_id: str,
+        price_sensor_id: str,
+    ) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self._power_sensor_id = power_sensor_id
+        self._price_sensor_id = price_sensor_id
+        self._price_hub = async_get_price_hub(hass)
+        self._power_unit = UnitFactorCache(_power_factor_for_unit, 0.001)
+        # Last good power reading in kW, updated from power event payloads
+        self.power_kw: float | None = None
+        self._sensors: list[PowerCostSensor] = []
+        self._rate_listeners: list[Callable[[], None]] = []
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self.accumulator = PowerAccumulator([*INTERVALS, STATISTICS_SLOT])
+        self.buckets = self.accumulator.buckets
+        self.counters = RuntimeCounters()
+        self.statistics: CostStatistics | None = None
+        self.stored: StoredBuckets | None = None
+        self._backfill_windows: dict[int, GapWindow] = {}
+        self._backfill_task: asyncio.Task | None = None
+
+    @property
+    def rate_micros(self) -> int | None:
+        """Return the current rate in micro-currency/h."""
+        return self.accumulator.rate_micros
+
+    @rate_micros.setter
+    def rate_micros(self, value: int | None) -> None:
+        self.accumulator.rate_micros = value
+
+    @callback
+    def async_attach_store(self, store: EntryStore) -> None:
+        """Restore the interval totals from the entry's store and save them there.
+
+        The rate is settled up to now for every snapshot, so a saved or
+        journaled total includes the time since the last power event, and
+        the journal records it on every tick while the rate accrues.
+        """
+        self.stored = StoredBuckets(
+            store, "power", self.buckets, self._settled_until, self._accruing
+        )
+
+    def _accruing(self) -> bool:
+        """Return True while a non-zero rate accrues into a registered slot."""
+        return bool(self.accumulator.rate_micros) and bool(self.buckets.active.any())
+
+    @callback
+    def _async_mark_changed(self) -> None:
+        """Have the entry's journal record a change of the buckets."""
+        if self.stored is not None:
+            self.stored.async_mark_changed()
+
+    def _settled_until(self) -> datetime:
+        """Integrate the rate up to now and return the time it is settled to."""
+        self.settle()
+        return self.accumulator.last_update or dt_util.utcnow()
+
+    def slot(self, interval: str) -> int:
+        """Return the bucket slot of an interval."""
+        return self.buckets.slot(interval)
+
+    @callback
+    def async_register(self, sensor: PowerCostSensor) -> CALLBACK_TYPE:
+        """Register an interval sensor and return a callback to unregister it."""
+        self._sensors.append(sensor)
+        self.buckets.active[sensor.bucket_slot] = True
+        if self.stored is not None:
+            self.stored.track(sensor.bucket_slot)
+        self._async_consumer_added()
+
+        @callback
+        def _async_unregister() -> None:
+            # Integrate up to now while the slot still accrues, so the saved
+            # total is accurate to the time it is saved with
+            self.settle()
+            self._sensors.remove(sensor)
+            self.buckets.active[sensor.bucket_slot] = False
+            self._async_consumer_removed()
+
+        return _async_unregister
+
+    @callback
+    def async_add_rate_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever the rate is recomputed."""
+        self._rate_listeners.append(listener)
+        self._async_consumer_added()
+
+        @callback
+        def _async_remove() -> None:
+            self._rate_listeners.remove(listener)
+            self._async_consumer_removed()
+
+        return _async_remove
+
+    @callback
+    def _async_consumer_added(self) -> None:
+        """Subscribe to the sources when the first consumer registers."""
+        if len(self._sensors) + len(self._rate_listeners) == 1:
+            self._async_subscribe()
+
+    @callback
+    def _async_consumer_removed(self) -> None:
+        """Unsubscribe from the sources when the last consumer leaves."""
+        if not self._sensors and not self._rate_listeners:
+            self._async_unsubscribe()
+
+    @callback
+    def _async_subscribe(self) -> None:
+        """Resolve the starting rate and track both source sensors."""
+        self.accumulator.last_update = dt_util.utcnow()
+        # The only state machine read; events then update the cached reading
+        self.update_rate(self.hass.states.get(self._power_sensor_id))
+        self._unsubs = [
+            async_track_state_change_event(
+                self.hass, self._power_sensor_id, self._async_handle_power_event
+            ),
+            self._price_hub.async_subscribe(
+                self._price_sensor_id, self._async_handle_price_update
+            ),
+        ]
+        _LOGGER.debug(
+            "Power engine subscribed to %s and %s",
+            self._power_sensor_id,
+            self._price_sensor_id,
+        )
+
+    @callback
+    def _async_unsubscribe(self) -> None:
+        """Stop tracking the source sensors."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def async_enable_statistics(self, statistics: CostStatistics) -> CALLBACK_TYPE:
+        """Accumulate hourly cost for imported statistics; returns a stop callback."""
+        self.statistics = statistics
+        slot = self.buckets.slot(STATISTICS_SLOT)
+        self.buckets.active[slot] = True
+
+        @callback
+        def _async_close_hour(boundary: datetime) -> float:
+            return self.accumulator.close(slot, boundary)
+
+        return statistics.async_track_hours(_async_close_hour)
+
+    async def async_rebuild_statistics(self, start: datetime) -> None:
+        """Recompute the imported hourly statistics since start from history."""
+        if self.statistics is None:
+            return
+        await self.statistics.async_rebuild(
+            start,
+            compute_power_hours,
+            self._power_sensor_id,
+            self._price_sensor_id,
+        )
+
+    @callback
+    def async_backfill(self, slot: int, since: datetime) -> None:
+        """Integrate the cost between a restored state and now from history.
+
+        Live integration of the slot takes over from the time the rate is
+        settled to; the span before it is integrated from recorder history
+        on the executor.  Slots restored together share one history read.
+        """
+        if not recorder_available(self.hass):
+            return
+        self._backfill_windows[slot] = GapWindow(
+            since, self.accumulator.last_update or dt_util.utcnow()
+        )
+        if self._backfill_task is None:
+            self._backfill_task = self.hass.async_create_background_task(
+                self._async_backfill(),
+                f"dynamic_energy_cost backfill {self._power_sensor_id}",
+            )
+
+    async def _async_backfill(self) -> None:
+        """Apply the gap history to the restored slots, one read per pass.
+
+        Slots restored while a pass reads history are left for the next one.
+        """
+        try:
+            while self._backfill_windows:
+                windows, self._backfill_windows = self._backfill_windows, {}
+                await self._async_backfill_pass(windows)
+        finally:
+            self._backfill_task = None
+
+    async def _async_backfill_pass(self, windows: dict[int, GapWindow]) -> None:
+        """Integrate one history read, split where any slot starts or stops."""
+        boundaries = {
+            slot: missed_boundary(
+                self.buckets.intervals[slot],
+                self.buckets.get_last_reset(slot),
+                window.end,
+            )
+            for slot, window in windows.items()
+        }
+        splits = {
+            when.timestamp()
+            for slot, window in windows.items()
+            for when in (window.since, window.end, boundaries[slot])
+            if when is not None
+        }
+        try:
+            gap: GapCosts = await async_run_backfill(
+                self.hass,
+                compute_power_gap,
+                self._power_sensor_id,
+                self._price_sensor_id,
+                min(window.since for window in windows.values()),
+                max(window.end for window in windows.values()),
+                sorted(splits),
+                self._price_hub.price(self._price_sensor_id),
+            )
+        except Exception as e:
+            _LOGGER.error(
+                "Failed to backfill %s from recorder history: %s",
+                self._power_sensor_id,
+                str(e),
+            )
+            return
+
+        for slot, window in windows.items():
+            _async_apply_gap(
+                self.accumulator,
+                self._sensors,
+                slot,
+                gap.until(window.end.timestamp()),
+                window.since,
+                boundaries[slot],
+            )
+
+    def settle(self, when: datetime | None = None) -> np.ndarray:
+        """Integrate the current rate up to ``when`` and return changed slots.
+
+        ``when`` is normally the source state's timestamp.  Integration only
+        moves forward: a time at or before the last settled one (an event
+        queued behind a reset, say) accrues nothing and a time in the future
+        is clamped to now.
+        """
+        current_time = dt_util.utcnow()
+        changed = self.accumulator.settle(
+            current_time if when is None else when, current_time
+        )
+        if changed.any():
+            self._async_mark_changed()
+        return changed
+
+    def update_rate(self, power_state=None) -> bool:
+        """Recompute the rate from the current price and the last good power.
+
+        ``power_state`` is the state carried by a power event; a usable one
+        replaces the cached ``power_kw`` reading.  A price change reuses the
+        cached reading, and the price itself comes from the shared feed, so
+        no event reads the state machine.  Returns False, keeping the
+        previous rate, when a source is unusable.
+        """
+        if power_state is not None:
+            power_usage = _state_to_float(power_state)
+            if power_usage is None or not math.isfinite(power_usage):
+                _LOGGER.warning(
+                    "State of %s is not a number, skipping update",
+                    self._power_sensor_id,
+                )
+                return False
+            self.power_kw = power_usage * self._power_unit.resolve(power_state)
+
+        electricity_price = self._price_hub.price(self._price_sensor_id)
+        if electricity_price is None or self.power_kw is None:
+            _LOGGER.warning(
+                "One or more sensor values are unavailable, skipping update"
+            )
+            return False
+
+        try:
+            self.accumulator.set_rate(electricity_price, self.power_kw)
+        except (OverflowError, ValueError) as e:
+            _LOGGER.error("Error converting sensor data to float: %s", e)
+            return False
+        self._async_mark_changed()
+        return True
+
+    def apply_power_event(self, event: Event) -> np.ndarray | None:
+        """Settle the outgoing rate and pick up a new power reading.
+
+        Returns the slots whose cost changed, or None when the event carries
+        no usable state or does not change the power reading.
+        """
+        entity_id = event.data["entity_id"]
+        new_state = event.data.get("new_state")
+
+        if new_state is None:
+            _LOGGER.warning("State of %s is missing, skipping update", entity_id)
+            self.counters.skip("missing_state")
+            return None
+
+        _record_lag(self.counters, _state_time(new_state))
+
+        # The rate only changes with the power value, or its unit
+        if (reason := unchanged_reason(event)) is not None:
+            self.counters.skip(reason)
+            return None
+
+        if new_state.state in ("unknown", "unavailable"):
+            _LOGGER.warning(
+                "State of %s is '%s', skipping update", entity_id, new_state.state
+            )
+            self.counters.skip("unavailable")
+            return None
+
+        changed = self.settle(_state_time(new_state))
+        self.update_rate(new_state)
+        return changed
+
+    @callback
+    def _async_publish(self, changed: np.ndarray) -> None:
+        """Publish the interval sensors that accrued and notify rate listeners."""
+        for sensor in self._sensors:
+            if changed[sensor.bucket_slot]:
+                sensor.async_publish()
+        for listener in self._rate_listeners:
+            listener()
+
+    @callback
+    def _async_handle_power_event(self, event: Event) -> None:
+        """Integrate up to the power change and publish every output."""
+        started = perf_counter_ns()
+        self.counters.count("power_events")
+        try:
+            changed = self.apply_power_event(event)
+            if changed is not None:
+                self._async_publish(changed)
+        except Exception as e:
+            _LOGGER.error("Failed to update power costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
+
+    @callback
+    def _async_handle_price_update(self, feed: PriceFeed) -> None:
+        """Integrate up to the price change at the old rate, then re-rate."""
+        started = perf_counter_ns()
+        self.counters.count("price_events")
+        try:
+            if feed.price is None:
+                _LOGGER.warning(
+                    "State of %s is unavailable, skipping update", feed.entity_id
+                )
+                self.counters.skip("unavailable")
+                return
+            changed = self.settle(feed.last_updated)
+            self.update_rate()
+            self._async_publish(changed)
+        except Exception as e:
+            _LOGGER.error("Failed to update power costs due to an error: %s", str(e))
+            self.counters.skip("error")
+        finally:
+            self.counters.record(started)
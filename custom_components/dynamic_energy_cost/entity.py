@@ -1,92 +1,104 @@
 """Class representing a Dynamic Energy Costs entity."""
 
-from datetime import timedelta
+from __future__ import annotations
+
+from abc import abstractmethod
+from collections.abc import Callable
+from datetime import datetime
 from decimal import Decimal
 import logging
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
-from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.util import dt as dt_util
 from homeassistant.util.dt import now
 
-from .const import QUARTERLY, HOURLY, DAILY, MANUAL, MONTHLY, WEEKLY, YEARLY
+from .aggregate import async_get_member_index
+from .boundaries import boundary_calendar
+from .const import MANUAL
+from .money import to_micros
+from .publish import PublishPolicy, StatePublisher
+from .reset_scheduler import async_get_reset_scheduler
+from .runtime import RuntimeCounters
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .statistics import CostStatistics
+    from .storage import StoredBuckets
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class CostEngine(Protocol):
+    """The part of an entry's engine its interval cost sensors use."""
+
+    @property
+    def statistics(self) -> CostStatistics | None:
+        """Return the entry's statistics import, or None when it is off."""
+
+    @property
+    def stored(self) -> StoredBuckets | None:
+        """Return the entry's stored buckets, or None before they attach."""
+
+    def async_register(self, sensor: BaseUtilitySensor) -> CALLBACK_TYPE:
+        """Register an interval sensor and return a callback to unregister it."""
+
+    async def async_rebuild_statistics(self, start: datetime) -> None:
+        """Recompute the imported hourly statistics since start."""
+
+
+@runtime_checkable
+class RateEngine(Protocol):
+    """An engine that integrates a rate between source events."""
+
+    def settle(self, when: datetime | None = None) -> np.ndarray:
+        """Integrate every rate up to ``when`` and return changed slots."""
+
+
 class BaseUtilitySensor(SensorEntity):
     """Base sensor for handling energy cost data."""
 
-    def __init__(self, hass: HomeAssistant, interval: str) -> None:
+    _engine: CostEngine
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        interval: str,
+        publish_policy: PublishPolicy | None = None,
+    ) -> None:
         """Initialize the sensor."""
         super().__init__()
         self.hass = hass
-        self._state = Decimal("0.00")
+        self.counters = RuntimeCounters()
+        self._publisher = StatePublisher(hass, self._async_write_state, publish_policy)
+        self._init_totals()
         self._unit_of_measurement = None
         self._interval = interval
         self.event_unsub: CALLBACK_TYPE | None = None
         self._last_update = now()
-        self._last_reset = now()
         self._name = None
+        self._cost_listeners: list[Callable[[int], None]] = []
+        self._reported_micros = 0
+
+    def _init_totals(self) -> None:
+        """Start the totals at zero from now."""
+        self._state = Decimal("0.00")
+        self._last_reset = now()
+
+    def _calibrate_totals(self, value: float) -> None:
+        """Set the cost total to a calibrated value."""
+        self._state = value
 
     def calculate_next_reset_time(self):
         """Determine the exact datetime for the next reset based on the interval."""
         current_time = now()
-
-        if self._interval == QUARTERLY:
-            current_time = current_time.replace(second=0, microsecond=0)
-
-            next_quarter = ((current_time.minute // 15) + 1) * 15
-            if next_quarter >= 60:
-                return current_time.replace(minute=0) + timedelta(hours=1)
-            return current_time.replace(minute=next_quarter)
-
-        if self._interval == HOURLY:
-            # Only activate for testing purpose:
-            # return current_time + timedelta(seconds=30)
-
-            return current_time.replace(minute=0, second=0, microsecond=0) + timedelta(
-                hours=1
-            )
-
-        if self._interval == DAILY:
-            # Only activate for testing purpose:
-            # return current_time + timedelta(seconds=30)
-
-            return current_time.replace(
-                hour=0, minute=0, second=0, microsecond=0
-            ) + timedelta(days=1)
-
-        if self._interval == WEEKLY:
-            # Calculate the date of the next Monday
-            days_until_monday = (7 - current_time.weekday()) % 7
-            next_monday = (current_time + timedelta(days=days_until_monday)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            # If today is Monday, set to next Monday
-            if days_until_monday == 0:
-                next_monday += timedelta(days=7)
-            return next_monday
-
-        if self._interval == MONTHLY:
-            next_month = (current_time.replace(day=1) + timedelta(days=32)).replace(
-                day=1
-            )
-            return next_month.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        if self._interval == YEARLY:
-            return current_time.replace(
-                year=current_time.year + 1,
-                month=1,
-                day=1,
-                hour=0,
-                minute=0,
-                second=0,
-                microsecond=0,
-            )
-
-        return None
+        return boundary_calendar(current_time.tzinfo).next_boundary(
+            self._interval, current_time
+        )
 
     def schedule_next_reset(self):
         """Schedule the next reset based on the interval, cancelling any previous schedules."""
@@ -99,9 +111,11 @@ class BaseUtilitySensor(SensorEntity):
         # Log the scheduling of the next reset
         _LOGGER.debug("Scheduling next reset for %s at %s", self.name, next_reset)
 
-        # Schedule the next reset
-        self.event_unsub = async_track_point_in_time(
-            self.hass, self._async_reset_meter, next_reset
+        # Sensors resetting at the same boundary share one domain-wide timer
+        if self.event_unsub:
+            self.event_unsub()
+        self.event_unsub = async_get_reset_scheduler(self.hass).async_schedule(
+            next_reset, self._async_reset_meter
         )
         _LOGGER.debug("Next reset scheduled successfully")
 
@@ -112,35 +126,141 @@ class BaseUtilitySensor(SensorEntity):
         self.schedule_next_reset()
 
     @callback
-    def async_reset(self, *args):
-        """Reset the energy cost and cumulative energy kWh."""
-        self._state = Decimal(0) if type(self._state) is Decimal else 0
-
-        if hasattr(self, "_cumulative_energy"):
-            self._cumulative_energy = 0  # pylint: disable=attribute-defined-outside-init
-        if hasattr(self, "_cumulative_cost"):
-            self._cumulative_cost = 0  # pylint: disable=attribute-defined-outside-init
-
-        if hasattr(self, "_last_energy_reading"):
-            self._last_energy_reading = None  # pylint: disable=attribute-defined-outside-init
-        if hasattr(self, "_last_cost_rate"):
-            self._last_cost_rate = None  # pylint: disable=attribute-defined-outside-init
-        self._last_update = now()
-        self._last_reset = now()
-        self.async_write_ha_state()
-        _LOGGER.debug("Meter reset for %s", self._name)
+    @abstractmethod
+    def async_reset(self, *args) -> None:
+        """Zero the interval's totals now and publish them."""
+
+    @callback
+    def async_publish_reset(self, when) -> None:
+        """Publish totals that the entry's engine reset at ``when``."""
+        self._last_update = when
+        self._async_rebase_cost()
+        self.counters.count("resets")
+        self._publisher.async_publish_now()
 
     @callback
     def async_calibrate(self, value):
         """Calibrate the state with a given value."""
         _LOGGER.debug("Calibrate %s = %s type(%s)", self._name, value, type(value))
-        self._cumulative_cost = float(str(value))
-        self._state = self._cumulative_cost
+        self._calibrate_totals(float(str(value)))
         self._last_update = now()
+        self._async_rebase_cost()
+        self.counters.count("calibrations")
+        self._publisher.async_publish_now()
+
+    async def async_rebuild_statistics(self, start):
+        """Recompute the entry's imported hourly cost statistics since start."""
+        if self._engine.statistics is None:
+            raise ServiceValidationError(
+                f"Statistics import is not enabled for {self.entity_id}"
+            )
+        await self._engine.async_rebuild_statistics(start)
+
+    @callback
+    def async_publish(self) -> None:
+        """Write the state, coalesced according to the entry's publish policy."""
+        self.counters.count("updates")
+        self._async_report_cost()
+        self._publisher.async_request()
+
+    @callback
+    def _async_register_member(self) -> CALLBACK_TYPE:
+        """Register with the engine and as a member of aggregate entries.
+
+        Returns one callback undoing both.  Call it after the totals are
+        restored, so aggregates only receive cost accrued from then on.
+        """
+        unregister = self._engine.async_register(self)
+        remove_member = async_get_member_index(self.hass).async_add_member(
+            self._config_entry.entry_id, self._interval, self
+        )
+
+        @callback
+        def _async_unregister() -> None:
+            remove_member()
+            unregister()
+
+        return _async_unregister
+
+    @property
+    def _cost_total_micros(self) -> int:
+        """Return the accumulated cost in micro-currency."""
+        return to_micros(float(self._state))
+
+    @callback
+    def async_add_cost_listener(self, listener: Callable[[int], None]) -> CALLBACK_TYPE:
+        """Call listener with the cost accrued from now on, in micro-currency.
+
+        Resets and calibrations are not accrued cost; they only move the
+        total that later deltas are measured from.
+        """
+        if self._cost_listeners:
+            self._async_report_cost()
+        else:
+            self._reported_micros = self._cost_total_micros
+        self._cost_listeners.append(listener)
+
+        @callback
+        def _async_remove() -> None:
+            self._cost_listeners.remove(listener)
+
+        return _async_remove
+
+    @callback
+    def async_settle_cost(self, when: datetime) -> None:
+        """Report the cost accrued up to ``when`` to the cost listeners.
+
+        An engine integrating a rate is settled up to ``when`` first, so the
+        cost since its last source event is reported too.
+        """
+        if not self._cost_listeners:
+            return
+        if isinstance(self._engine, RateEngine):
+            self._engine.settle(when)
+        self._async_report_cost()
+
+    @callback
+    def _async_report_cost(self) -> None:
+        """Pass the cost accrued since the last report to the cost listeners."""
+        if not self._cost_listeners:
+            return
+        total = self._cost_total_micros
+        if delta := total - self._reported_micros:
+            self._reported_micros = total
+            for listener in self._cost_listeners:
+                listener(delta)
+
+    @callback
+    def _async_rebase_cost(self) -> None:
+        """Measure later cost deltas from the current total."""
+        self._reported_micros = self._cost_total_micros
+
+    @callback
+    def _async_write_state(self) -> None:
+        """Write the state to Home Assistant and save the accumulators soon."""
+        self.counters.count("writes")
         self.async_write_ha_state()
+        if self._engine.stored is not None:
+            self._engine.stored.async_schedule_save()
+
+    async def async_added_to_hass(self):
+        """Write held changes before Home Assistant saves states on stop."""
+        await super().async_added_to_hass()
+        if self._publisher.policy.min_interval > 0:
+            self.async_on_remove(
+                self.hass.bus.async_listen(
+                    EVENT_HOMEASSISTANT_STOP, self._publisher.async_flush
+                )
+            )
+
+    async def async_internal_will_remove_from_hass(self) -> None:
+        """Write held changes so the restored state includes them."""
+        self._publisher.async_flush()
+        await super().async_internal_will_remove_from_hass()
 
     async def async_will_remove_from_hass(self):
         """Remove the reset event from the schedule."""
+        self._publisher.async_cancel()
         if self.event_unsub:
             event_unsub = self.event_unsub
             self.event_unsub = None
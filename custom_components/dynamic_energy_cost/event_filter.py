@@ -0,0 +1,36 @@
+"""Early filtering of source state changes that cannot change a cost."""
+
+from __future__ import annotations
+
+from homeassistant.core import Event
+
+# Attributes that change what a state means even when its value is unchanged
+WATCHED_ATTRIBUTES = ("last_reset", "unit_of_measurement")
+
+UNCHANGED = "unchanged"
+ATTRIBUTES_ONLY = "attributes_only"
+
+
+def unchanged_reason(
+    event: Event, watched: tuple[str, ...] = WATCHED_ATTRIBUTES
+) -> str | None:
+    """Return why a state changed event can be dropped, or None to process it.
+
+    An event is dropped when the source's state string is unchanged and none
+    of the ``watched`` attributes changed: ``UNCHANGED`` when the attributes
+    are the same object (Home Assistant reuses them when they are equal, so
+    this needs no comparison) and ``ATTRIBUTES_ONLY`` otherwise, such as a
+    price sensor rewriting its forecast.
+    """
+    old_state = event.data.get("old_state")
+    new_state = event.data.get("new_state")
+    if old_state is None or new_state is None or old_state.state != new_state.state:
+        return None
+    old_attributes = old_state.attributes
+    new_attributes = new_state.attributes
+    if old_attributes is new_attributes:
+        return UNCHANGED
+    for name in watched:
+        if old_attributes.get(name) != new_attributes.get(name):
+            return None
+    return ATTRIBUTES_ONLY
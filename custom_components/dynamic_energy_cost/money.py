@@ -0,0 +1,48 @@
+"""Fixed-point micro-currency arithmetic for Dynamic Energy Costs.
+
+The power path runs once per power sample, so rates and accumulators are
+kept as integer micro-currency (1e-6 of the currency unit) instead of
+``Decimal``.  Integer arithmetic is exact and deterministic, and values
+are only converted to float when a state is published.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+MICROS_PER_UNIT = 1_000_000
+US_PER_HOUR = 3_600_000_000
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(value: float) -> int:
+    """Return a currency amount as integer micro-currency."""
+    return round(value * MICROS_PER_UNIT)
+
+
+def from_micros(micros: int) -> float:
+    """Return integer micro-currency as a currency amount."""
+    return micros / MICROS_PER_UNIT
+
+
+def quantize_micros(micros: int, step: int) -> int:
+    """Round micro-currency to a multiple of ``step`` (round half to even)."""
+    quotient, remainder = divmod(micros, step)
+    if 2 * remainder > step or (2 * remainder == step and quotient % 2):
+        quotient += 1
+    return quotient * step
+
+
+def elapsed_us(elapsed: timedelta) -> int:
+    """Return a time span as whole microseconds."""
+    return elapsed // _MICROSECOND
+
+
+def integrate_micros(rate_micros: int, elapsed: int, remainder: int) -> tuple[int, int]:
+    """Integrate a micro-currency/h rate over ``elapsed`` microseconds.
+
+    Returns the whole micro-currency accrued and the sub-micro remainder to
+    carry into the next call, so repeated short steps lose nothing to
+    truncation.
+    """
+    return divmod(rate_micros * elapsed + remainder, US_PER_HOUR)
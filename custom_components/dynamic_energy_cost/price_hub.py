@@ -0,0 +1,177 @@
+"""Shared price sensor subscriptions for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DOMAIN
+from .event_filter import ATTRIBUTES_ONLY, unchanged_reason
+from .price_schedule import PriceSchedule
+from .runtime import RuntimeCounters
+from .units import (
+    UnitFactorCache,
+    _price_factor_for_unit,
+    _price_unit_conversion_factor,
+    _state_to_float,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PRICE_HUB = f"{DOMAIN}_price_hub"
+
+type PriceListener = Callable[[PriceFeed], None]
+
+
+def normalize_price(state) -> float | None:
+    """Return a price state in currency/kWh, or None when unusable."""
+    price = _state_to_float(state)
+    if price is None:
+        return None
+    return price * _price_unit_conversion_factor(state)
+
+
+class PriceFeed:
+    """One price sensor subscription fanned out to every interested entry.
+
+    ``price`` is the current price normalized to currency/kWh and
+    ``previous_price`` the value it replaced, which the energy path uses to
+    finalize consumption accrued before a price change.  ``last_updated`` is
+    the time the latest price state was written.  ``schedule`` is
+    rebuilt from the sensor's forecast attributes on every update, when it
+    publishes any.
+
+    Updates that leave the price unchanged are not pushed to listeners; an
+    attribute-only update (a forecast rewrite, say) only rebuilds the
+    schedule.  ``counters`` records what was dropped.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_id: str) -> None:
+        """Initialize the feed from the current price state."""
+        self.hass = hass
+        self.entity_id = entity_id
+        self._unit = UnitFactorCache(_price_factor_for_unit, 1.0)
+        self.schedule: PriceSchedule | None = None
+        self.last_updated: datetime | None = None
+        self.price = self._update(hass.states.get(entity_id))
+        self.previous_price: float | None = self.price
+        self._listeners: list[PriceListener] = []
+        self._unsub: CALLBACK_TYPE | None = None
+        self.counters = RuntimeCounters()
+
+    @property
+    def has_listeners(self) -> bool:
+        """Return True while at least one listener is subscribed."""
+        return bool(self._listeners)
+
+    @callback
+    def async_add_listener(self, listener: PriceListener) -> CALLBACK_TYPE:
+        """Add a listener, subscribing to the price sensor on first use."""
+        self._listeners.append(listener)
+        if self._unsub is None:
+            self._unsub = async_track_state_change_event(
+                self.hass, self.entity_id, self._async_handle_event
+            )
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(listener)
+            if not self._listeners and self._unsub is not None:
+                self._unsub()
+                self._unsub = None
+
+        return _async_remove
+
+    def _update(self, state) -> float | None:
+        """Normalize a price state and index its forecast attributes."""
+        price = _state_to_float(state)
+        if price is None:
+            self.schedule = None
+            return None
+        factor = self._unit.resolve(state)
+        self.schedule = PriceSchedule.from_state(state, factor)
+        return price * factor
+
+    def price_at(self, when: datetime) -> float | None:
+        """Return the scheduled price at a time, falling back to the current one."""
+        if self.schedule is not None:
+            scheduled = self.schedule.price_at(when)
+            if scheduled is not None:
+                return scheduled
+        return self.price
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        """Normalize the new price once and push it to every listener."""
+        new_state = event.data.get("new_state")
+        self.counters.count("price_events")
+        if (reason := unchanged_reason(event, ("unit_of_measurement",))) is not None:
+            self.counters.skip(reason)
+            if reason == ATTRIBUTES_ONLY:
+                self._update(new_state)
+            return
+        self.previous_price = self.price
+        self.price = self._update(new_state)
+        last_updated = getattr(new_state, "last_updated", None)
+        self.last_updated = last_updated if isinstance(last_updated, datetime) else None
+        for listener in list(self._listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                _LOGGER.error(
+                    "Failed to process price update for %s: %s", self.entity_id, e
+                )
+
+
+class PriceHub:
+    """Domain-wide registry of price feeds keyed by price entity_id."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty hub."""
+        self.hass = hass
+        self._feeds: dict[str, PriceFeed] = {}
+
+    def price(self, entity_id: str, when: datetime | None = None) -> float | None:
+        """Return the normalized price of a price sensor.
+
+        Subscribed sensors are served from the feed, priced at ``when`` from
+        its forecast schedule when one is given and covered; otherwise the
+        state machine is read directly.
+        """
+        if (feed := self._feeds.get(entity_id)) is not None:
+            if when is not None:
+                return feed.price_at(when)
+            return feed.price
+        return normalize_price(self.hass.states.get(entity_id))
+
+    def feed(self, entity_id: str) -> PriceFeed | None:
+        """Return the feed of a subscribed price sensor, or None."""
+        return self._feeds.get(entity_id)
+
+    @callback
+    def async_subscribe(self, entity_id: str, listener: PriceListener) -> CALLBACK_TYPE:
+        """Subscribe to normalized price updates of a price sensor."""
+        feed = self._feeds.get(entity_id)
+        if feed is None:
+            feed = self._feeds[entity_id] = PriceFeed(self.hass, entity_id)
+        remove_listener = feed.async_add_listener(listener)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            remove_listener()
+            if not feed.has_listeners:
+                self._feeds.pop(entity_id, None)
+
+        return _async_unsubscribe
+
+
+@callback
+def async_get_price_hub(hass: HomeAssistant) -> PriceHub:
+    """Return the domain-wide price hub, creating it on first use."""
+    if (hub := hass.data.get(DATA_PRICE_HUB)) is None:
+        hub = hass.data[DATA_PRICE_HUB] = PriceHub(hass)
+    return hub
@@ -0,0 +1,144 @@
+"""Time-indexed price schedules built from price forecast attributes."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from datetime import datetime
+import logging
+import math
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Attributes holding today's, tomorrow's or upcoming prices, as published by
+# Nord Pool and Energi Data Service (raw_*), ENTSO-E (prices*) and Amber
+# (forecasts).
+FORECAST_ATTRIBUTES = (
+    "raw_today",
+    "raw_tomorrow",
+    "prices_today",
+    "prices_tomorrow",
+    "prices",
+    "forecasts",
+)
+_START_KEYS = ("start", "start_time", "startsAt", "time", "hour")
+_END_KEYS = ("end", "end_time")
+_VALUE_KEYS = ("value", "price", "per_kwh", "total")
+
+
+def _parse_time(value) -> datetime | None:
+    """Return an aware datetime from a datetime or ISO string attribute."""
+    if isinstance(value, str):
+        value = dt_util.parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+    return value
+
+
+def _first(entry: dict, keys: tuple[str, ...]):
+    """Return the value of the first key present in a forecast entry."""
+    for key in keys:
+        if entry.get(key) is not None:
+            return entry[key]
+    return None
+
+
+def _parse_entries(entries: Iterable) -> list[tuple[float, float | None, float]]:
+    """Return (start, end, price) tuples for every usable forecast entry."""
+    slots = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        start = _parse_time(_first(entry, _START_KEYS))
+        end = _parse_time(_first(entry, _END_KEYS))
+        try:
+            price = float(_first(entry, _VALUE_KEYS))
+        except (TypeError, ValueError):
+            continue
+        if start is None or not math.isfinite(price):
+            continue
+        slots.append(
+            (start.timestamp(), end.timestamp() if end is not None else None, price)
+        )
+    return slots
+
+
+class PriceSchedule:
+    """Sorted price slots answering "price at time t" with a binary search.
+
+    ``starts`` and ``ends`` are POSIX timestamps; a slot without an explicit
+    end lasts until the next slot starts, and the last one as long as the one
+    before it.  Times outside every slot, including gaps, have no price.
+    """
+
+    __slots__ = ("ends", "prices", "starts")
+
+    def __init__(self, slots: Iterable[tuple[float, float | None, float]]) -> None:
+        """Build the index from (start, end, price) tuples in any order."""
+        ordered = sorted(dict((slot[0], slot) for slot in slots).values())
+        self.starts = [start for start, _, _ in ordered]
+        self.prices = [price for _, _, price in ordered]
+        self.ends = []
+        for index, (start, end, _) in enumerate(ordered):
+            if end is None:
+                if index + 1 < len(ordered):
+                    end = ordered[index + 1][0]
+                elif index > 0:
+                    end = start + (start - ordered[index - 1][0])
+                else:
+                    end = start
+            self.ends.append(end)
+
+    def __len__(self) -> int:
+        """Return the number of price slots."""
+        return len(self.starts)
+
+    def price_at(self, when: datetime) -> float | None:
+        """Return the price of the slot containing when, or None."""
+        stamp = when.timestamp()
+        index = bisect_right(self.starts, stamp) - 1
+        if index < 0 or stamp >= self.ends[index]:
+            return None
+        return self.prices[index]
+
+    @classmethod
+    def from_state(cls, state, factor: float = 1.0) -> PriceSchedule | None:
+        """Build a schedule from a price state's forecast attributes.
+
+        Prices are scaled by the unit factor of the state.  The schedule is
+        only trusted when it agrees with the state itself at the time the
+        state was last updated; attributes in another unit or without the
+        surcharges of the state would otherwise price energy differently
+        from the current price.
+        """
+        if state is None:
+            return None
+        slots = []
+        for attribute in FORECAST_ATTRIBUTES:
+            entries = state.attributes.get(attribute)
+            if isinstance(entries, (list, tuple)):
+                slots.extend(_parse_entries(entries))
+        if not slots:
+            return None
+
+        schedule = cls((start, end, price * factor) for start, end, price in slots)
+        try:
+            current = float(state.state) * factor
+        except (TypeError, ValueError):
+            return schedule
+        scheduled = schedule.price_at(state.last_updated)
+        if scheduled is None or not math.isclose(
+            scheduled, current, rel_tol=1e-6, abs_tol=1e-9
+        ):
+            _LOGGER.debug(
+                "Ignoring price forecast of %s: %s does not match state %s",
+                state.entity_id,
+                scheduled,
+                current,
+            )
+            return None
+        return schedule
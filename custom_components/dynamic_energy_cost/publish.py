@@ -0,0 +1,114 @@
+"""State publishing policy for Dynamic Energy Costs cost sensors."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DEFAULT_MAX_PUBLISH_STALENESS,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
+    MAX_PUBLISH_STALENESS,
+    MIN_PUBLISH_INTERVAL,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PublishPolicy:
+    """How often a cost sensor writes its state to Home Assistant.
+
+    ``min_interval`` is the minimum number of seconds between two
+    event-driven writes; ``0`` writes on every change.  A change that
+    arrives sooner is held and written once ``max_staleness`` seconds have
+    passed since the last write, unless a later change is allowed through
+    first.  Resets and calibrations always write immediately.
+    """
+
+    min_interval: float = DEFAULT_MIN_PUBLISH_INTERVAL
+    max_staleness: float = DEFAULT_MAX_PUBLISH_STALENESS
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> PublishPolicy:
+        """Build the policy from merged config entry data and options."""
+        min_interval = max(
+            float(config.get(MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL)), 0.0
+        )
+        max_staleness = float(
+            config.get(MAX_PUBLISH_STALENESS, DEFAULT_MAX_PUBLISH_STALENESS)
+        )
+        return cls(min_interval, max(max_staleness, min_interval))
+
+
+class StatePublisher:
+    """Coalesce state writes of one sensor according to a ``PublishPolicy``.
+
+    The accumulators are always updated immediately; only the write to the
+    state machine, and therefore the recorder row, is deferred.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        write: Callable[[], None],
+        policy: PublishPolicy | None = None,
+    ) -> None:
+        """Initialize the publisher."""
+        self.hass = hass
+        self.policy = policy or PublishPolicy()
+        self._write = write
+        self._last_publish: float | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @property
+    def pending(self) -> bool:
+        """Return True while a held change waits to be written."""
+        return self._unsub_flush is not None
+
+    @callback
+    def async_request(self) -> None:
+        """Write the state now, or hold it until the policy allows a write."""
+        if self.policy.min_interval <= 0:
+            self.async_publish_now()
+            return
+
+        now = self.hass.loop.time()
+        if (
+            self._last_publish is None
+            or now - self._last_publish >= self.policy.min_interval
+        ):
+            self.async_publish_now()
+        elif self._unsub_flush is None:
+            delay = self._last_publish + self.policy.max_staleness - now
+            self._unsub_flush = async_call_later(
+                self.hass, max(delay, 0), self._async_flush_timer
+            )
+
+    @callback
+    def async_publish_now(self) -> None:
+        """Write the state immediately, dropping any held change."""
+        self.async_cancel()
+        self._last_publish = self.hass.loop.time()
+        self._write()
+
+    @callback
+    def async_flush(self, *_: Any) -> None:
+        """Write a held change, if any."""
+        if self.pending:
+            self.async_publish_now()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop a held change without writing it."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def _async_flush_timer(self, _now) -> None:
+        """Write the held change once it reaches the maximum staleness."""
+        self._unsub_flush = None
+        self.async_publish_now()
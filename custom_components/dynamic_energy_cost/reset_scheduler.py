@@ -0,0 +1,103 @@
+"""Shared interval reset timers for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_RESET_SCHEDULER = f"{DOMAIN}_reset_scheduler"
+
+type ResetAction = Callable[[datetime], None]
+
+
+class _Boundary:
+    """One armed timer and the reset actions waiting on it."""
+
+    __slots__ = ("actions", "unsub")
+
+    def __init__(self) -> None:
+        self.actions: dict[object, ResetAction] = {}
+        self.unsub: CALLBACK_TYPE | None = None
+
+
+class ResetScheduler:
+    """Domain-wide reset timers, one per distinct boundary.
+
+    Every interval sensor that resets at the same moment (for example all
+    daily sensors at local midnight) shares a single timer. When it fires,
+    all waiting actions run in one batch; each action is expected to
+    schedule its own next boundary again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize a scheduler without armed timers."""
+        self.hass = hass
+        self._boundaries: dict[datetime, _Boundary] = {}
+
+    @property
+    def timer_count(self) -> int:
+        """Return the number of armed timers."""
+        return len(self._boundaries)
+
+    @callback
+    def async_schedule(self, when: datetime, action: ResetAction) -> CALLBACK_TYPE:
+        """Run an action at a boundary and return a callback cancelling it."""
+        boundary = self._boundaries.get(when)
+        if boundary is None:
+            boundary = self._boundaries[when] = _Boundary()
+            boundary.unsub = async_track_point_in_time(
+                self.hass, self._async_fire_factory(when), when
+            )
+            _LOGGER.debug("Armed shared reset timer for %s", when)
+
+        token = object()
+        boundary.actions[token] = action
+
+        @callback
+        def _async_cancel() -> None:
+            if self._boundaries.get(when) is not boundary:
+                return
+            boundary.actions.pop(token, None)
+            if not boundary.actions:
+                del self._boundaries[when]
+                if boundary.unsub is not None:
+                    boundary.unsub()
+                    boundary.unsub = None
+
+        return _async_cancel
+
+    def _async_fire_factory(self, when: datetime) -> Callable[[datetime], None]:
+        """Return the timer callback for one boundary."""
+
+        @callback
+        def _async_fire(fired_at: datetime) -> None:
+            boundary = self._boundaries.pop(when, None)
+            if boundary is None:
+                return
+            boundary.unsub = None
+            _LOGGER.debug(
+                "Resetting %s accumulators at %s", len(boundary.actions), when
+            )
+            for action in list(boundary.actions.values()):
+                try:
+                    action(fired_at)
+                except Exception as e:
+                    _LOGGER.error("Failed to reset at %s: %s", when, str(e))
+
+        return _async_fire
+
+
+@callback
+def async_get_reset_scheduler(hass: HomeAssistant) -> ResetScheduler:
+    """Return the domain-wide reset scheduler, creating it on first use."""
+    if (scheduler := hass.data.get(DATA_RESET_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_RESET_SCHEDULER] = ResetScheduler(hass)
+    return scheduler
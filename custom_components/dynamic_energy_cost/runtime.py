@@ -0,0 +1,121 @@
+"""Runtime counters of Dynamic Energy Costs entries, reported by diagnostics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import math
+from time import perf_counter_ns
+from typing import Any
+
+# Number of recent handler calls kept for the timing percentiles and the
+# event lag histogram
+TIMING_WINDOW = 1024
+# Upper edges, in seconds, of the event lag histogram buckets
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+_LAG_LABELS = (
+    *(f"<={edge:g}s" for edge in LAG_BUCKETS),
+    f">{LAG_BUCKETS[-1]:g}s",
+)
+
+
+class RuntimeCounters:
+    """Event counters and handler timing of one engine or sensor.
+
+    Counting is a dict increment and timing a ``perf_counter_ns`` pair plus
+    a list store, so the counters stay enabled in production.  Durations
+    are kept for the last ``TIMING_WINDOW`` handler calls only; percentiles
+    are computed when diagnostics are requested.
+
+    The event lag, from a source state's ``last_updated`` to the moment it
+    is processed, is kept as a rolling histogram over the same window: the
+    bucket of the event leaving the window is decremented as a new one is
+    added.
+    """
+
+    __slots__ = (
+        "_durations",
+        "_lag_counts",
+        "_lag_ring",
+        "_lagged",
+        "_last_lag",
+        "_max_lag",
+        "_timed",
+        "_total_ns",
+        "counts",
+        "skipped",
+    )
+
+    def __init__(self) -> None:
+        """Initialize zeroed counters."""
+        self.counts: dict[str, int] = {}
+        self.skipped: dict[str, int] = {}
+        self._durations = [0] * TIMING_WINDOW
+        self._timed = 0
+        self._total_ns = 0
+        self._lag_ring = [0] * TIMING_WINDOW
+        self._lag_counts = [0] * len(_LAG_LABELS)
+        self._lagged = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    def count(self, name: str) -> None:
+        """Count an occurrence of name."""
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def skip(self, reason: str) -> None:
+        """Count an event that was skipped for reason."""
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def record(self, started_ns: int) -> None:
+        """Record a handler call that started at a ``perf_counter_ns`` time."""
+        elapsed = perf_counter_ns() - started_ns
+        self._durations[self._timed % TIMING_WINDOW] = elapsed
+        self._timed += 1
+        self._total_ns += elapsed
+
+    def record_lag(self, lag: float) -> None:
+        """Record how many seconds an event waited before it was processed."""
+        lag = max(lag, 0.0)
+        bucket = bisect_left(LAG_BUCKETS, lag)
+        position = self._lagged % TIMING_WINDOW
+        if self._lagged >= TIMING_WINDOW:
+            self._lag_counts[self._lag_ring[position]] -= 1
+        self._lag_ring[position] = bucket
+        self._lag_counts[bucket] += 1
+        self._lagged += 1
+        self._last_lag = lag
+        self._max_lag = max(self._max_lag, lag)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and handler timing in milliseconds."""
+        data: dict[str, Any] = {**self.counts, "skipped": dict(self.skipped)}
+        if self._timed:
+            recent = sorted(self._durations[: min(self._timed, TIMING_WINDOW)])
+            data["handler"] = {
+                "calls": self._timed,
+                "total_ms": self._total_ns / 1e6,
+                "p50_ms": _percentile(recent, 0.5) / 1e6,
+                "p99_ms": _percentile(recent, 0.99) / 1e6,
+            }
+        if self._lagged:
+            data["lag"] = {
+                "events": self._lagged,
+                "last_s": self._last_lag,
+                "max_s": self._max_lag,
+                "histogram": dict(zip(_LAG_LABELS, self._lag_counts, strict=True)),
+            }
+        return data
+
+
+def _percentile(ordered: list[int], fraction: float) -> int:
+    """Return the nearest-rank percentile of a sorted, non-empty list."""
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+@dataclass(slots=True)
+class EntryRuntime:
+    """Engines and sensors of a loaded config entry, for diagnostics."""
+
+    engines: list[Any] = field(default_factory=list)
+    sensors: list[Any] = field(default_factory=list)
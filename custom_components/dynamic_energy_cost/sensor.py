@@ -1,20 +1,24 @@
 """Class representing a Dynamic Energy Costs sensors."""
 
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 import logging
 import math
 import voluptuous as vol
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import (
+    config_validation as cv,
     device_registry as dr,
     entity_platform,
     entity_registry as er,
 )
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util.dt import now
 
@@ -24,32 +28,62 @@ except ImportError:
     async_entity_id_to_device = None
 
 from .const import (
+    AGGREGATE_ENTRIES,
+    CRASH_JOURNAL,
     QUARTERLY,
     HOURLY,
     DAILY,
     DOMAIN,
     ELECTRICITY_PRICE_SENSOR,
     ENERGY_SENSOR,
+    ENERGY_SENSORS,
+    IMPORT_STATISTICS,
     MANUAL,
     MONTHLY,
     POWER_SENSOR,
+    POWER_SENSORS,
+    REAL_TIME,
     SERVICE_RESET_COST,
     SERVICE_CALIBRATE,
+    SERVICE_REBUILD_STATISTICS,
     WEEKLY,
     YEARLY,
 )
 from . import (
+    get_consumer_cost_unique_id,
+    get_consumer_realtime_unique_id,
+    get_consumer_sources,
     get_entry_config,
     get_interval_cost_unique_id,
     get_realtime_unique_id,
     get_selected_sensors,
 )
+from .aggregate import AggregateCostEngine
+from .backfill import recorder_available
+from .consumers import (
+    EnergyConsumer,
+    MultiEnergyCostEngine,
+    MultiPowerCostEngine,
+    PowerConsumer,
+)
+from .engine import EnergyCostEngine, PowerCostEngine
 from .entity import BaseUtilitySensor
+from .money import (
+    from_micros,
+    quantize_micros,
+    to_micros,
+)
+from .publish import PublishPolicy
+from .runtime import EntryRuntime, RuntimeCounters
+from .statistics import CostStatistics
+from .storage import EntryStore
+from .units import _state_to_float
 
 INTERVALS = [QUARTERLY, HOURLY, DAILY, WEEKLY, MONTHLY, YEARLY, MANUAL]
 
 _LOGGER = logging.getLogger(__name__)
-REALTIME_COST_PRECISION = Decimal("0.0001")
+# Published cost values are rounded to 0.0001 currency (100 micro-currency)
+COST_PRECISION_MICROS = 100
 
 
 def _resolve_source_device(hass: HomeAssistant, source_entity_id: str):
@@ -82,6 +116,29 @@ def _fallback_device_info(config_entry, device_name, device_entry):
     }
 
 
+def _consumer_device_info(config_entry, source_id, device_name, device_entry):
+    """Return fallback device info of one consumer of a multi-consumer entry."""
+    if device_entry is not None:
+        return None
+    return {
+        "identifiers": {(DOMAIN, f"{config_entry.entry_id}_{source_id}")},
+        "name": device_name,
+        "manufacturer": "Custom Integration",
+    }
+
+
+def _power_friendly_name(power_sensor_id: str) -> str:
+    """Return a friendly name from a power sensor entity ID.
+
+    ``sensor.heat_pump_power`` becomes ``Heat Pump``.
+    """
+    base_part = power_sensor_id.split(".")[-1]
+    friendly_name_parts = [
+        word for word in base_part.replace("_", " ").split() if word.lower() != "power"
+    ]
+    return " ".join(friendly_name_parts).title()
+
+
 def interval_display_name(interval: str) -> str:
     """Return a user-facing label for an interval."""
     if interval == QUARTERLY:
@@ -111,111 +168,6 @@ def validate_is_number(value):
     raise vol.Invalid("Value is not a number")
 
 
-_ENERGY_UNIT_TO_KWH: dict[str, float] = {
-    "Wh": 0.001,
-    "kWh": 1.0,
-    "MWh": 1000.0,
-}
-
-
-def _energy_unit_conversion_factor(state) -> float:
-    """Return the factor to convert the energy sensor's unit to kWh.
-
-    Defaults to 1.0 (kWh) when the unit is missing or unrecognised.
-    """
-    if state is None:
-        return 1.0
-    unit = state.attributes.get("unit_of_measurement", "kWh")
-    return _ENERGY_UNIT_TO_KWH.get(unit, 1.0)
-
-
-_POWER_UNIT_TO_KW: dict[str, float] = {
-    "W": 0.001,
-    "kW": 1.0,
-    "MW": 1000.0,
-}
-
-
-def _power_unit_conversion_factor(state) -> float:
-    """Return the factor to convert the power sensor's unit to kW.
-
-    Defaults to 0.001 (W → kW) when the unit is missing or unrecognised,
-    matching the historical behaviour where W was assumed.
-    """
-    if state is None:
-        return 0.001
-    unit = state.attributes.get("unit_of_measurement", "W")
-    return _POWER_UNIT_TO_KW.get(unit, 0.001)
-
-
-_PRICE_UNIT_TO_PER_KWH: dict[str, float] = {
-    "wh": 1000.0,
-    "kwh": 1.0,
-    "mwh": 0.001,
-}
-
-
-def _price_unit_conversion_factor(state) -> float:
-    """Return the factor to convert a price sensor's value to currency/kWh.
-
-    Parses unit_of_measurement (e.g. ``EUR/MWh``) and extracts the energy
-    denominator after the last ``/``.  Supports Wh, kWh and MWh in any
-    case.  Defaults to 1.0 when the unit is missing, has no slash, or
-    the energy part is unrecognised.
-    """
-    if state is None:
-        return 1.0
-    unit = state.attributes.get("unit_of_measurement", "")
-    if "/" not in unit:
-        return 1.0
-    energy_part = unit.rsplit("/", 1)[-1].strip().lower()
-    return _PRICE_UNIT_TO_PER_KWH.get(energy_part, 1.0)
-
-
-def _state_to_float(state) -> float | None:
-    """Convert a Home Assistant state object to float if usable."""
-    if state is None or state.state in (None, "unknown", "unavailable"):
-        return None
-
-    try:
-        return float(state.state)
-    except (TypeError, ValueError):
-        return None
-
-
-def _last_reset_changed(old_state, new_state) -> bool:
-    """Detect a source-sensor reset via the ``last_reset`` attribute.
-
-    Canonical signal for ``state_class=total`` resetting sensors (e.g. HA's
-    ``utility_meter`` helper). Returns True when ``new_state.last_reset`` is
-    set and differs from ``old_state.last_reset``.
-    """
-    if old_state is None or new_state is None:
-        return False
-    old_lr = old_state.attributes.get("last_reset")
-    new_lr = new_state.attributes.get("last_reset")
-    return new_lr is not None and old_lr != new_lr
-
-
-def _source_decremented_total_increasing(
-    current_state, last_known: float | None
-) -> bool:
-    """Detect a source-sensor reset via decrement on a ``total_increasing`` sensor.
-
-    Per HA convention any decrease on a ``total_increasing`` sensor is a reset.
-    Covers ESPHome ``total_daily_energy`` and most polling integrations that
-    skip the explicit ``0`` reading (e.g. Deye Modbus).
-    """
-    if current_state is None or last_known is None:
-        return False
-    if current_state.attributes.get("state_class") != "total_increasing":
-        return False
-    try:
-        return float(current_state.state) < last_known
-    except (TypeError, ValueError):
-        return False
-
-
 async def register_entity_services():
     """Register custom services for energy cost sensors."""
     platform = entity_platform.async_get_current_platform()
@@ -232,6 +184,31 @@ async def register_entity_services():
         "async_calibrate",
     )
 
+    platform.async_register_entity_service(
+        SERVICE_REBUILD_STATISTICS,
+        {vol.Required("start"): cv.datetime},
+        "async_rebuild_statistics",
+    )
+
+
+def _enable_statistics(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    engine: EnergyCostEngine | PowerCostEngine,
+) -> None:
+    """Import the entry's hourly cost as an external statistic."""
+    if not recorder_available(hass):
+        _LOGGER.warning(
+            "Statistics import needs the recorder; using state-derived statistics"
+        )
+        return
+    statistics = CostStatistics(hass, config_entry.entry_id, config_entry.title)
+    config_entry.async_on_unload(engine.async_enable_statistics(statistics))
+    config_entry.async_on_unload(statistics.async_flush)
+    config_entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, statistics.async_flush)
+    )
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -240,33 +217,119 @@ async def async_setup_entry(
 ) -> None:
     """Sensor platform setup based on user configuration."""
     data = get_entry_config(config_entry)
-    electricity_price_sensor = data[ELECTRICITY_PRICE_SENSOR]
+    electricity_price_sensor = data.get(ELECTRICITY_PRICE_SENSOR)
     selected = get_selected_sensors(config_entry)
+    publish_policy = PublishPolicy.from_config(data)
     sensors = []
+    runtime = config_entry.runtime_data = EntryRuntime(sensors=sensors)
+    # All accumulators of the entry are restored from one storage file
+    store = EntryStore(hass, config_entry.entry_id, data.get(CRASH_JOURNAL, False))
+    await store.async_load()
+    config_entry.async_on_unload(store.async_save)
+    config_entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_FINAL_WRITE, store.async_save)
+    )
+    if data.get(CRASH_JOURNAL):
+        config_entry.async_on_unload(store.async_start_journal())
 
     if data.get(POWER_SENSOR):
-        # Setup power-based sensors
+        # Setup power-based sensors sharing one engine per entry
         power_sensor = data[POWER_SENSOR]
-        real_time_cost_sensor = RealTimeCostSensor(
-            hass,
-            config_entry,
-            electricity_price_sensor,
-            power_sensor,
-        )
-        # Always add RealTimeCostSensor — normalization ensures it's in
-        # selected whenever any power interval is selected.
-        sensors.append(real_time_cost_sensor)
+        engine = PowerCostEngine(hass, power_sensor, electricity_price_sensor)
+        engine.async_attach_store(store)
+        runtime.engines.append(engine)
+        if data.get(IMPORT_STATISTICS):
+            _enable_statistics(hass, config_entry, engine)
+        # The Real Time Cost entity only publishes the engine's rate;
+        # normalization adds it whenever any power interval is selected.
+        if REAL_TIME in selected:
+            sensors.append(
+                RealTimeCostSensor(
+                    hass,
+                    config_entry,
+                    electricity_price_sensor,
+                    power_sensor,
+                    engine,
+                )
+            )
 
         selected_intervals = [i for i in INTERVALS if i in selected]
         utility_sensors = [
-            PowerCostSensor(hass, real_time_cost_sensor, interval)
+            PowerCostSensor(
+                hass,
+                config_entry,
+                power_sensor,
+                electricity_price_sensor,
+                interval,
+                engine,
+                publish_policy,
+            )
             for interval in selected_intervals
         ]
         sensors.extend(utility_sensors)
 
+    consumers = get_consumer_sources(data)
+    if consumers and data.get(IMPORT_STATISTICS):
+        _LOGGER.warning(
+            "Statistics import is not available for multi-consumer entries; "
+            "using state-derived statistics"
+        )
+
+    if data.get(POWER_SENSORS):
+        # One engine integrates every consumer's power; each consumer keeps
+        # its own Real Time and interval cost sensors
+        engine = MultiPowerCostEngine(hass, consumers, electricity_price_sensor)
+        engine.async_attach_store(store)
+        runtime.engines.append(engine)
+        selected_intervals = [i for i in INTERVALS if i in selected]
+        for power_sensor in consumers:
+            consumer = engine.source(power_sensor)
+            if REAL_TIME in selected:
+                sensors.append(
+                    ConsumerRealTimeCostSensor(
+                        hass, config_entry, electricity_price_sensor, consumer
+                    )
+                )
+            sensors.extend(
+                ConsumerPowerCostSensor(
+                    hass,
+                    config_entry,
+                    consumer,
+                    electricity_price_sensor,
+                    interval,
+                    publish_policy,
+                )
+                for interval in selected_intervals
+            )
+
+    if data.get(ENERGY_SENSORS):
+        # One engine prices every consumer's readings
+        engine = MultiEnergyCostEngine(hass, consumers, electricity_price_sensor)
+        engine.async_attach_store(store)
+        runtime.engines.append(engine)
+        selected_intervals = [i for i in INTERVALS if i in selected]
+        for energy_sensor in consumers:
+            consumer = engine.source(energy_sensor)
+            sensors.extend(
+                ConsumerEnergyCostSensor(
+                    hass,
+                    config_entry,
+                    consumer,
+                    electricity_price_sensor,
+                    interval,
+                    publish_policy,
+                )
+                for interval in selected_intervals
+            )
+
     if data.get(ENERGY_SENSOR):
-        # Setup energy-based sensors
+        # Setup energy-based sensors sharing one engine per entry
         energy_sensor = data[ENERGY_SENSOR]
+        engine = EnergyCostEngine(hass, energy_sensor, electricity_price_sensor)
+        engine.async_attach_store(store)
+        runtime.engines.append(engine)
+        if data.get(IMPORT_STATISTICS):
+            _enable_statistics(hass, config_entry, engine)
         selected_intervals = [i for i in INTERVALS if i in selected]
         utility_sensors = [
             EnergyCostSensor(
@@ -275,11 +338,29 @@ async def async_setup_entry(
                 energy_sensor,
                 electricity_price_sensor,
                 interval,
+                engine,
+                publish_policy,
             )
             for interval in selected_intervals
         ]
         sensors.extend(utility_sensors)
 
+    if data.get(AGGREGATE_ENTRIES):
+        # Sum the cost other entries accrue, one sensor per interval
+        if data.get(IMPORT_STATISTICS):
+            _LOGGER.warning(
+                "Statistics import is not available for aggregate entries; "
+                "using state-derived statistics"
+            )
+        engine = AggregateCostEngine(hass, data[AGGREGATE_ENTRIES])
+        engine.async_attach_store(store)
+        runtime.engines.append(engine)
+        sensors.extend(
+            AggregateCostSensor(hass, config_entry, interval, engine, publish_policy)
+            for interval in INTERVALS
+            if interval in selected
+        )
+
     if sensors:
         async_add_entities(sensors, False)
     else:
@@ -308,14 +389,20 @@ class RealTimeCostSensor(SensorEntity):
         config_entry: ConfigEntry,
         electricity_price_sensor_id: SensorEntity,
         power_sensor_id: SensorEntity,
+        engine: PowerCostEngine | None = None,
     ) -> None:
         """Initialize the sensor."""
         self.hass = hass
         self._config_entry = config_entry
         self._electricity_price_sensor_id = electricity_price_sensor_id
         self._power_sensor_id = power_sensor_id
-        self._state = Decimal(0)
+        # The engine computes the rate; this entity only publishes it
+        self._engine = engine or PowerCostEngine(
+            hass, power_sensor_id, electricity_price_sensor_id
+        )
+        self._state = 0.0
         self._unit_of_measurement = None
+        self.counters = RuntimeCounters()
 
         _LOGGER.debug(
             "Initialized Real Time Cost Sensor with price sensor: %s and power sensor: %s",
@@ -323,15 +410,7 @@ class RealTimeCostSensor(SensorEntity):
             power_sensor_id,
         )
 
-        # Extract a friendly name from the power sensor's entity ID
-        base_part = power_sensor_id.split(".")[
-            -1
-        ]  # Assuming entity_id format like 'sensor.heat_pump_power'
-        friendly_name_parts = base_part.replace("_", " ").split()  # Split into words
-        friendly_name_parts = [
-            word for word in friendly_name_parts if word.lower() != "power"
-        ]  # Remove the word "Power"
-        friendly_name = " ".join(friendly_name_parts).title()  # Rejoin and title-case
+        friendly_name = _power_friendly_name(power_sensor_id)
         self._base_name = friendly_name + " Real Time Energy Cost"
 
         # Prepare a device name using the friendly base part
@@ -360,7 +439,7 @@ class RealTimeCostSensor(SensorEntity):
     @property
     def state(self):
         """Return the current state of the sensor."""
-        return float(self._state)
+        return self._state
 
     @property
     def unit_of_measurement(self):
@@ -372,60 +451,28 @@ class RealTimeCostSensor(SensorEntity):
         """Handle reset, dummy to accept reset on device level."""
 
     @callback
-    def handle_state_change(self, event: Event):
-        """Handle changes to the electricity price or power usage."""
-        entity_id = event.data["entity_id"]
-        new_state = event.data.get("new_state")
-
-        if new_state is None:
-            _LOGGER.warning("State of %s is missing, skipping update", entity_id)
+    def _async_publish_rate(self) -> None:
+        """Publish the engine's rate rounded to the published precision."""
+        if self._engine.rate_micros is None:
             return
 
-        if new_state.state in ["unknown", "unavailable"]:
-            _LOGGER.warning(
-                "State of %s is '%s', skipping update", entity_id, new_state.state
-            )
-            return
-
-        price_state = self.hass.states.get(self._electricity_price_sensor_id)
-        electricity_price = _state_to_float(price_state)
-        power_usage = _state_to_float(self.hass.states.get(self._power_sensor_id))
-
-        if electricity_price is None or power_usage is None:
-            _LOGGER.warning(
-                "One or more sensor values are unavailable, skipping update"
-            )
-            return
-
-        price_to_kwh = _price_unit_conversion_factor(price_state)
-        power_state = self.hass.states.get(self._power_sensor_id)
-        power_to_kw = _power_unit_conversion_factor(power_state)
-        try:
-            calculated_cost = (
-                Decimal(str(electricity_price))
-                * Decimal(str(price_to_kwh))
-                * Decimal(str(power_usage))
-                * Decimal(str(power_to_kw))
-            ).quantize(REALTIME_COST_PRECISION)
-            if calculated_cost != self._state:
-                self._state = calculated_cost
-                self.async_write_ha_state()
-                _LOGGER.debug(
-                    "Updated Real Time Energy Cost: %s EUR/h", calculated_cost
-                )
-        except ValueError as e:
-            _LOGGER.error("Error converting sensor data to float: %s", e)
+        self.counters.count("updates")
+        calculated_cost = from_micros(
+            quantize_micros(self._engine.rate_micros, COST_PRECISION_MICROS)
+        )
+        if calculated_cost != self._state:
+            self._state = calculated_cost
+            self.counters.count("writes")
+            self.async_write_ha_state()
+            _LOGGER.debug("Updated Real Time Energy Cost: %s EUR/h", calculated_cost)
 
     async def async_added_to_hass(self):
         """Register callbacks when added to hass."""
         self._unit_of_measurement = f"{get_currency(self.hass)}/h"
         self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                [self._electricity_price_sensor_id, self._power_sensor_id],
-                self.handle_state_change,
-            )
+            self._engine.async_add_rate_listener(self._async_publish_rate)
         )
+        self._async_publish_rate()
         _LOGGER.info(
             "Callbacks registered for %s and %s",
             self._electricity_price_sensor_id,
@@ -433,7 +480,6 @@ class RealTimeCostSensor(SensorEntity):
         )
 
 
-# -----------------------------------------------------------------------------------------------
 # -----------------------------------------------------------------------------------------------
 class EnergyCostSensor(RestoreEntity, BaseUtilitySensor):
     """Base sensor for handling energy cost data."""
@@ -445,18 +491,23 @@ class EnergyCostSensor(RestoreEntity, BaseUtilitySensor):
         energy_sensor_id: SensorEntity,
         price_sensor_id: SensorEntity,
         interval: str,
+        engine: EnergyCostEngine | None = None,
+        publish_policy: PublishPolicy | None = None,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(hass, interval)
+        # Interval sensors of one entry share an engine; a standalone sensor
+        # gets its own so it keeps working outside async_setup_entry.  The
+        # accumulators live in the engine's buckets.
+        self._engine = engine or EnergyCostEngine(
+            hass, energy_sensor_id, price_sensor_id
+        )
+        self._buckets = self._engine.buckets
+        self.bucket_slot = self._engine.slot(interval)
+        self._slot_mask = self._buckets.mask(self.bucket_slot)
+        super().__init__(hass, interval, publish_policy)
         self._config_entry = config_entry
         self._energy_sensor_id = energy_sensor_id
         self._price_sensor_id = price_sensor_id
-        self._last_energy_reading = None
-        self._cumulative_energy = 0.0
-        self._cumulative_cost = None  # updated on price change events and used for more precise cost calculations
-        self._energy_to_kwh = (
-            1.0  # resolved in async_added_to_hass from unit_of_measurement
-        )
 
         _LOGGER.debug(
             "Sensor initialized with energy sensor ID %s and price sensor ID %s",
@@ -498,7 +549,13 @@ class EnergyCostSensor(RestoreEntity, BaseUtilitySensor):
 
     @property
     def state_class(self):
-        """Return the state class of this device, from SensorStateClass."""
+        """Return the state class of this device, from SensorStateClass.
+
+        None when the entry imports its cost statistics, so the recorder
+        does not also derive statistics from every state write.
+        """
+        if self._engine.statistics is not None:
+            return None
         return SensorStateClass.TOTAL
 
     @property
@@ -506,8 +563,6 @@ class EnergyCostSensor(RestoreEntity, BaseUtilitySensor):
         """Return the state attributes of the device."""
         attrs = super().extra_state_attributes or {}  # Ensure it's a dict
         attrs["cumulative_energy"] = self._cumulative_energy
-        attrs["last_energy_reading"] = self._last_energy_reading
-        attrs["cumulative_cost"] = self._cumulative_cost
         attrs["average_energy_cost"] = (
             self._state / self._cumulative_energy if self._cumulative_energy else 0.0
         )
@@ -519,9 +574,16 @@ class EnergyCostSensor(RestoreEntity, BaseUtilitySensor):
         await super().async_added_to_hass()
         # Restore state if available
         self._unit_of_measurement = get_currency(self.hass)
-        last_state = await self.async_get_last_state()
-
-        if last_state and last_state.state not in ["unknown", "unavailable", None]:
+        stored = self._engine.stored
+        if stored is not None and (since := stored.restored_since(self.bucket_slot)):
+            self._state = self._cumulative_cost
+            # Price what was consumed while the integration was not running
+            self._engine.async_backfill(self.bucket_slot, since)
+        elif (
+            last_state := await self.async_get_last_state()
+        ) and last_state.state not in ["unknown", "unavailable", None]:
+            # Entities saved before the entry store kept their totals in
+            # state attributes
             self._state = float(last_state.state)
             if last_state.attributes.get("last_reset") is not None:
                 self._last_reset = last_state.attributes.get("last_reset")
@@ -540,154 +602,112 @@ class EnergyCostSensor(RestoreEntity, BaseUtilitySensor):
             else:
                 # For backwards compatibility
                 self._cumulative_cost = float(last_state.state)
+            # Price what was consumed while the integration was not running
+            self._engine.async_backfill(self.bucket_slot, last_state.last_updated)
 
-        # Resolve unit conversion factor from the source energy sensor
-        self._energy_to_kwh = _energy_unit_conversion_factor(
-            self.hass.states.get(self._energy_sensor_id)
-        )
-
-        self.async_write_ha_state()
-        # track energy sensor changes
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, self._energy_sensor_id, self._async_update_energy_event
-            )
-        )
-        # track also the price sensor changes for more accuracy
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, self._price_sensor_id, self._async_update_price_event
-            )
-        )
+        self._async_write_state()
+        # The engine tracks the energy and price sensors once for all intervals
+        self.async_on_remove(self._async_register_member())
         self.schedule_next_reset()
 
-    # -----------------------------------------------------------------------------------------------
-    # when there is a price change we recalculate the _cumulative_cost and sync the state to this clibrated value
-    async def _async_update_price_event(self, event):
-        """Handle price sensor state changes."""
-        try:
-            old_price_state = event.data.get("old_state")
-            energy_state = self.hass.states.get(self._energy_sensor_id)
-            current_energy = _state_to_float(energy_state)
-            price = _state_to_float(old_price_state)
-
-            if current_energy is None or price is None:
-                _LOGGER.debug("One or more sensors are unavailable. Skipping update.")
-                return
-
-            if self._cumulative_cost is None:
-                self._cumulative_cost = float(self._state)
-
-            if self._last_energy_reading is None:
-                _LOGGER.debug(
-                    "Initializing energy baseline from current reading during price update."
-                )
-                self._last_energy_reading = current_energy
-            elif _source_decremented_total_increasing(
-                energy_state, self._last_energy_reading
-            ):
-                _LOGGER.debug(
-                    "Source sensor reset detected during price update. "
-                    "Re-initialising baseline to %s.",
-                    current_energy,
-                )
-                self._last_energy_reading = current_energy
-            else:
-                energy_difference = current_energy - self._last_energy_reading
-                energy_difference_kwh = energy_difference * self._energy_to_kwh
-                price_to_kwh = _price_unit_conversion_factor(old_price_state)
-                cost_increment = energy_difference_kwh * price * price_to_kwh
-                self._cumulative_cost += cost_increment
-                self._state = self._cumulative_cost
-                self._cumulative_energy += energy_difference_kwh
-                _LOGGER.debug(
-                    f"Change in Energy price: cumulative cost {self._cumulative_cost} EUR and cumulative energy usage to {self._cumulative_energy} kWh"
-                )
-                self._last_energy_reading = current_energy
-            self.async_write_ha_state()
+    @property
+    def _energy_to_kwh(self) -> float:
+        """Return the energy unit factor resolved by the shared engine."""
+        return self._engine.energy_to_kwh
 
-        except Exception as e:
-            _LOGGER.error("Failed to update energy costs due to an error: %s", str(e))
+    @_energy_to_kwh.setter
+    def _energy_to_kwh(self, value: float) -> None:
+        self._engine.energy_to_kwh = value
 
-    # -----------------------------------------------------------------------------------------------
-    # when there is a new energy reading we update our state based on the last _cumulative_cost (which is set on each price event)
-    async def _async_update_energy_event(self, event):
-        """Handle energy sensor state changes."""
-        """Update the energy costs using the latest sensor states, adding both incremental as decremental costs."""
-        try:
-            new_state = event.data.get("new_state")
-            old_state = event.data.get("old_state")
-            current_energy = _state_to_float(new_state)
-            price_state = self.hass.states.get(self._price_sensor_id)
-            price = _state_to_float(price_state)
-            # Re-resolve unit in case the sensor was unavailable at startup
-            if self._energy_to_kwh == 1.0:
-                self._energy_to_kwh = _energy_unit_conversion_factor(new_state)
-
-            if current_energy is None or price is None:
-                _LOGGER.debug("One or more sensors are unavailable. Skipping update.")
-                return
-
-            if self._cumulative_cost is None:
-                self._cumulative_cost = float(self._state)
-
-            source_was_reset = (
-                current_energy == 0
-                or _last_reset_changed(old_state, new_state)
-                or _source_decremented_total_increasing(
-                    new_state, self._last_energy_reading
-                )
-            )
-            if source_was_reset or self._last_energy_reading is None:
-                _LOGGER.debug(
-                    "Source sensor reset detected or baseline missing. "
-                    "Re-initialising baseline to %s.",
-                    current_energy,
-                )
-                self._last_energy_reading = current_energy
-                return
-
-            energy_difference = current_energy - self._last_energy_reading
-            energy_difference_kwh = energy_difference * self._energy_to_kwh
-            price_to_kwh = _price_unit_conversion_factor(price_state)
-            cost_increment = energy_difference_kwh * price * price_to_kwh
-            self._cumulative_cost += cost_increment
-            self._cumulative_energy += energy_difference_kwh
-            self._state = self._cumulative_cost
-            self._last_energy_reading = current_energy
-            _LOGGER.debug(
-                f"Energy cost incremented by {cost_increment} on top of {self._cumulative_cost}, total cost now {self._state} EUR"
-            )
+    @property
+    def _cumulative_cost(self) -> float:
+        """Return the accumulated cost of this interval."""
+        return float(self._buckets.cost[self.bucket_slot])
 
-            self.async_write_ha_state()
+    @_cumulative_cost.setter
+    def _cumulative_cost(self, value: float) -> None:
+        self._buckets.cost[self.bucket_slot] = value
+
+    @property
+    def _cost_total_micros(self) -> int:
+        """Return the accumulated cost of this interval in micro-currency."""
+        return to_micros(self._cumulative_cost)
+
+    @property
+    def _cumulative_energy(self) -> float:
+        """Return the accumulated energy (kWh) of this interval."""
+        return float(self._buckets.energy[self.bucket_slot])
+
+    @_cumulative_energy.setter
+    def _cumulative_energy(self, value: float) -> None:
+        self._buckets.energy[self.bucket_slot] = value
+
+    @property
+    def _last_energy_reading(self) -> float | None:
+        """Return the source baseline of this interval, or None if unset."""
+        value = float(self._buckets.baseline[self.bucket_slot])
+        return None if math.isnan(value) else value
+
+    @_last_energy_reading.setter
+    def _last_energy_reading(self, value: float | None) -> None:
+        self._buckets.baseline[self.bucket_slot] = math.nan if value is None else value
 
-        except Exception as e:
-            _LOGGER.error("Failed to update energy costs due to an error: %s", str(e))
+    def _init_totals(self) -> None:
+        """Start the state at zero, keeping the totals restored in the buckets."""
+        self._state = Decimal("0.00")
+
+    def _calibrate_totals(self, value: float) -> None:
+        """Set the interval's bucket cost and the state to a calibrated value."""
+        self._cumulative_cost = value
+        self._state = value
+
+    @property
+    def _last_reset(self):
+        """Return the last reset time of this interval."""
+        return self._buckets.get_last_reset(self.bucket_slot)
+
+    @_last_reset.setter
+    def _last_reset(self, value) -> None:
+        self._buckets.set_last_reset(self.bucket_slot, value)
+
+    @callback
+    def async_publish(self) -> None:
+        """Sync the state with the accumulated cost and publish it."""
+        self._state = self._cumulative_cost
+        super().async_publish()
+
+    @callback
+    def async_publish_reset(self, when) -> None:
+        """Sync the state with the reset totals and publish it."""
+        self._state = self._cumulative_cost
+        super().async_publish_reset(when)
 
     @callback
     def async_reset(self, *args):
         """Reset cost totals, preserving energy baseline from the current sensor state.
 
-        Reading the current energy value before the base class clears
-        _last_energy_reading ensures that cumulative sensors (which never reset)
-        keep a correct baseline so the next delta is counted rather than swallowed.
-        For daily-resetting sensors that are already at 0 when the cost resets, the
-        baseline is set to 0 here; if they reset slightly after the cost reset the
-        existing current_energy == 0 guard in _async_update_energy_event handles it.
+        The slot is zeroed in the shared buckets with the current energy value
+        as its new baseline, so cumulative sensors (which never reset) produce
+        a correct first delta rather than swallowing it.  For daily-resetting
+        sensors that are already at 0 when the cost resets, the baseline is
+        set to 0 here; if they reset slightly after the cost reset the
+        current_energy == 0 guard in the engine handles it.  If the sensor is
+        unavailable the baseline stays unset and the first event after the
+        reset initialises it.
         """
-        # Snapshot the current reading before the base class wipes _last_energy_reading.
         current_energy: float | None = None
         if self.hass:
             current_state = self.hass.states.get(self._energy_sensor_id)
             current_energy = _state_to_float(current_state)
 
-        super().async_reset(*args)
-
-        # Restore the baseline so cumulative sensors produce a correct first delta.
-        # If the sensor was unavailable, leave _last_energy_reading as None
-        # (base class fallback: first event after reset will initialise the baseline).
-        if current_energy is not None:
-            self._last_energy_reading = current_energy
+        self._async_report_cost()
+        self._buckets.reset(self._slot_mask, now(), current_energy)
+        self._state = 0
+        self._last_update = now()
+        self._async_rebase_cost()
+        self.counters.count("resets")
+        self._publisher.async_publish_now()
+        _LOGGER.debug("Meter reset for %s", self._name)
 
 
 # -----------------------------------------------------------------------------------------------
@@ -697,130 +717,117 @@ class PowerCostSensor(BaseUtilitySensor, RestoreEntity):
     def __init__(
         self,
         hass: HomeAssistant,
-        real_time_cost_sensor: RealTimeCostSensor,
+        config_entry: ConfigEntry,
+        power_sensor_id: str,
+        price_sensor_id: str,
         interval: str,
+        engine: PowerCostEngine | None = None,
+        publish_policy: PublishPolicy | None = None,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(hass, interval)
-        self._real_time_cost_sensor = real_time_cost_sensor
-        self._last_cost_rate: Decimal | None = None
+        # The accumulators live in the engine's buckets
+        self._engine = engine or PowerCostEngine(hass, power_sensor_id, price_sensor_id)
+        self._buckets = self._engine.buckets
+        self.bucket_slot = self._engine.slot(interval)
+        self._slot_mask = self._buckets.mask(self.bucket_slot)
+        super().__init__(hass, interval, publish_policy)
+        self._config_entry = config_entry
+        self._power_sensor_id = power_sensor_id
+        friendly_name = _power_friendly_name(power_sensor_id)
+        self._device_name = friendly_name + " Dynamic Energy Cost"
+        self._name = f"{friendly_name} {interval_display_name(interval)} Energy Cost"
         # Power cost follows the same source device as realtime cost
-        self.device_entry = real_time_cost_sensor.device_entry
-        self._config_entry = real_time_cost_sensor._config_entry
-        self._device_name = real_time_cost_sensor._device_name
-        base_name = real_time_cost_sensor.name.replace(
-            " Real Time Energy Cost", ""
-        ).strip()
-        self._name = f"{base_name} {interval_display_name(interval)} Energy Cost"
+        self.device_entry = _resolve_source_device(hass, power_sensor_id)
+
+    def _init_totals(self) -> None:
+        """Keep the totals the engine's buckets start with or restored."""
+
+    def _calibrate_totals(self, value: float) -> None:
+        """Settle the rate up to now, then set the bucket cost to value.
+
+        Settling first keeps the time integrated before the calibration
+        from being added on top of the calibrated value later.
+        """
+        self._engine.settle()
+        self._async_report_cost()
+        self._state = value
+
+    @property
+    def _cost_micros(self) -> int:
+        """Return the accumulated cost of this interval in micro-currency."""
+        return int(self._buckets.cost[self.bucket_slot])
+
+    @property
+    def _state(self) -> float:
+        """Return the accumulated cost rounded to the published precision."""
+        return from_micros(quantize_micros(self._cost_micros, COST_PRECISION_MICROS))
+
+    @_state.setter
+    def _state(self, value) -> None:
+        self._buckets.cost[self.bucket_slot] = to_micros(float(value))
+        self._buckets.remainder[self.bucket_slot] = 0
+
+    @property
+    def _cost_total_micros(self) -> int:
+        """Return the accumulated cost of this interval in micro-currency."""
+        return self._cost_micros
+
+    @property
+    def _last_reset(self):
+        """Return the last reset time stored in the shared buckets."""
+        return self._buckets.get_last_reset(self.bucket_slot)
+
+    @_last_reset.setter
+    def _last_reset(self, value) -> None:
+        self._buckets.set_last_reset(self.bucket_slot, value)
 
     async def async_added_to_hass(self):
-        """Restore state and set up updates when added to Home Assistant."""
+        """Restore state and register with the power engine."""
         await super().async_added_to_hass()
         # Restore state if available
         self._unit_of_measurement = get_currency(self.hass)
-        last_state = await self.async_get_last_state()
-
-        if last_state and last_state.state not in ("unknown", "unavailable"):
+        stored = self._engine.stored
+        if stored is not None and (since := stored.restored_since(self.bucket_slot)):
+            # Integrate what was used while the integration was not running
+            self._engine.async_backfill(self.bucket_slot, since)
+        elif (
+            last_state := await self.async_get_last_state()
+        ) and last_state.state not in ("unknown", "unavailable"):
             try:
-                self._state = Decimal(last_state.state)
+                self._state = float(last_state.state)
                 if last_state.attributes.get("last_reset") is not None:
                     self._last_reset = last_state.attributes.get("last_reset")
-            except InvalidOperation:
+            except (TypeError, ValueError):
                 _LOGGER.error(
                     "Invalid state value for restoration: %s", last_state.state
                 )
-
-        current_rate_state = self.hass.states.get(self._real_time_cost_sensor.entity_id)
-        if current_rate_state and current_rate_state.state not in (
-            "unknown",
-            "unavailable",
-        ):
-            try:
-                self._last_cost_rate = Decimal(current_rate_state.state)
-            except InvalidOperation:
-                _LOGGER.error(
-                    "Invalid realtime cost value for baseline: %s",
-                    current_rate_state.state,
-                )
+            else:
+                # Integrate what was used while the integration was not running
+                self._engine.async_backfill(self.bucket_slot, last_state.last_updated)
 
         self._last_update = now()
-
+        # The engine integrates the power rate once for all intervals
+        self.async_on_remove(self._async_register_member())
         self.schedule_next_reset()
-        _LOGGER.debug(
-            "Registering state change event for: %s",
-            self._real_time_cost_sensor.entity_id,
-        )
-
-        try:
-            self.async_on_remove(
-                async_track_state_change_event(
-                    self.hass,
-                    [self._real_time_cost_sensor.entity_id],
-                    self._handle_real_time_cost_update,
-                )
-            )
-        except Exception as e:
-            _LOGGER.error("Failed to track state change: %s", str(e))
 
     @callback
-    def _handle_real_time_cost_update(self, event: Event):
-        """Update cumulative cost based on the real-time cost sensor updates."""
-        old_state = event.data.get("old_state")
-        new_state = event.data.get("new_state")
-        if new_state is None or new_state.state in ("unknown", "unavailable"):
-            _LOGGER.debug("Skipping update due to unavailable state")
-            return
-
-        try:
-            current_cost = Decimal(new_state.state)
-            previous_cost = self._last_cost_rate
-
-            if old_state is not None and old_state.state not in (
-                "unknown",
-                "unavailable",
-            ):
-                previous_cost = Decimal(old_state.state)
-
-            if self._last_update is None or previous_cost is None:
-                self._last_cost_rate = current_cost
-                self._last_update = now()
-                return
-
-            _LOGGER.debug(
-                "Current cost retrieved from state: %s", current_cost
-            )  # Log current cost
-
-            time_difference = now() - self._last_update
-            if time_difference.total_seconds() <= 0:
-                self._last_update = now()
-                return
-            hours_passed = Decimal(time_difference.total_seconds()) / Decimal(
-                3600
-            )  # Convert time difference to hours as Decimal
-            _LOGGER.debug(
-                "Time difference calculated as: %s, which is %s hours",
-                time_difference,
-                hours_passed,
-            )  # Log time difference in hours
-
-            self._state += (previous_cost * hours_passed).quantize(Decimal("0.0001"))
-            self._last_cost_rate = current_cost
-            self._last_update = now()
-            self.async_write_ha_state()
-            _LOGGER.debug(
-                "Updated state to: %s using previous cost: %s over %s hours",
-                self._state,
-                previous_cost,
-                hours_passed,
-            )
-        except (InvalidOperation, TypeError) as e:
-            _LOGGER.error("Error updating cumulative cost: %s", str(e))
+    def async_reset(self, *args):
+        """Reset the cost total after settling the rate up to the boundary."""
+        reset_time = now()
+        self._engine.settle(reset_time)
+        self._async_report_cost()
+        self._buckets.reset(self._slot_mask, reset_time)
+        self._last_update = reset_time
+        self._async_rebase_cost()
+        self.counters.count("resets")
+        self._publisher.async_publish_now()
+        _LOGGER.debug("Meter reset for %s", self._name)
 
     @property
     def unique_id(self):
         """Return a unique identifier for this sensor."""
         return get_interval_cost_unique_id(
-            self._real_time_cost_sensor._config_entry.entry_id,
+            self._config_entry.entry_id,
             self._interval,
         )
 
@@ -831,6 +838,258 @@ class PowerCostSensor(BaseUtilitySensor, RestoreEntity):
             self._config_entry, self._device_name, self.device_entry
         )
 
+    @property
+    def state_class(self):
+        """Return the state class of this device, from SensorStateClass.
+
+        None when the entry imports its cost statistics, so the recorder
+        does not also derive statistics from every state write.
+        """
+        if self._engine.statistics is not None:
+            return None
+        return SensorStateClass.TOTAL
+
+    @property
+    def should_poll(self):
+        """No need to poll. Will be updated by the power engine."""
+        return False
+
+
+# -----------------------------------------------------------------------------------------------
+class ConsumerRealTimeCostSensor(RealTimeCostSensor):
+    """Real-time cost of one power sensor of a multi-consumer entry."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        electricity_price_sensor_id: str,
+        consumer: PowerConsumer,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            hass,
+            config_entry,
+            electricity_price_sensor_id,
+            consumer.source_id,
+            consumer,
+        )
+
+    @property
+    def unique_id(self):
+        """Return a unique identifier for this sensor."""
+        return get_consumer_realtime_unique_id(
+            self._config_entry.entry_id, self._power_sensor_id
+        )
+
+    @property
+    def device_info(self):
+        """Fallback device info when source sensor has no device."""
+        return _consumer_device_info(
+            self._config_entry,
+            self._power_sensor_id,
+            self._device_name,
+            self.device_entry,
+        )
+
+
+class ConsumerPowerCostSensor(PowerCostSensor):
+    """Interval cost of one power sensor of a multi-consumer entry.
+
+    The entry's engine resets an interval of every consumer at once, so
+    the sensor does not schedule its own reset.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        consumer: PowerConsumer,
+        price_sensor_id: str,
+        interval: str,
+        publish_policy: PublishPolicy | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            hass,
+            config_entry,
+            consumer.source_id,
+            price_sensor_id,
+            interval,
+            consumer,
+            publish_policy,
+        )
+
+    @property
+    def unique_id(self):
+        """Return a unique identifier for this sensor."""
+        return get_consumer_cost_unique_id(
+            self._config_entry.entry_id, self._power_sensor_id, self._interval
+        )
+
+    @property
+    def device_info(self):
+        """Fallback device info when source sensor has no device."""
+        return _consumer_device_info(
+            self._config_entry,
+            self._power_sensor_id,
+            self._device_name,
+            self.device_entry,
+        )
+
+    def schedule_next_reset(self):
+        """Leave interval resets to the entry's engine."""
+
+
+class ConsumerEnergyCostSensor(EnergyCostSensor):
+    """Interval cost of one energy sensor of a multi-consumer entry.
+
+    The entry's engine resets an interval of every consumer at once, so
+    the sensor does not schedule its own reset.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        consumer: EnergyConsumer,
+        price_sensor_id: str,
+        interval: str,
+        publish_policy: PublishPolicy | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            hass,
+            config_entry,
+            consumer.source_id,
+            price_sensor_id,
+            interval,
+            consumer,
+            publish_policy,
+        )
+
+    @property
+    def unique_id(self):
+        """Return a unique identifier for this sensor."""
+        return get_consumer_cost_unique_id(
+            self._config_entry.entry_id, self._energy_sensor_id, self._interval
+        )
+
+    @property
+    def device_info(self):
+        """Fallback device info when source sensor has no device."""
+        return _consumer_device_info(
+            self._config_entry,
+            self._energy_sensor_id,
+            self._device_name,
+            self.device_entry,
+        )
+
+    def schedule_next_reset(self):
+        """Leave interval resets to the entry's engine."""
+
+
+# -----------------------------------------------------------------------------------------------
+class AggregateCostSensor(BaseUtilitySensor):
+    """Summed interval cost of the entries selected in an aggregate entry.
+
+    The total grows by the cost delta each member sensor reports, so an
+    update does not re-read the other members.  The sensor resets on its
+    own interval boundary like any interval sensor; before resetting it
+    collects what the members accrued up to the boundary.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        interval: str,
+        engine: AggregateCostEngine,
+        publish_policy: PublishPolicy | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        # The total lives in the engine's buckets
+        self._engine = engine
+        self._buckets = engine.buckets
+        self.bucket_slot = engine.slot(interval)
+        self._slot_mask = self._buckets.mask(self.bucket_slot)
+        super().__init__(hass, interval, publish_policy)
+        self._config_entry = config_entry
+        description = get_entry_config(config_entry).get(
+            "integration_description", "Unnamed"
+        )
+        self._device_name = f"{description} Dynamic Energy Cost"
+        self._name = f"{description} {interval_display_name(interval)} Energy Cost"
+
+    def _init_totals(self) -> None:
+        """Keep the total the engine's buckets start with or restored."""
+
+    @property
+    def _cost_micros(self) -> int:
+        """Return the aggregate cost of this interval in micro-currency."""
+        return int(self._buckets.cost[self.bucket_slot])
+
+    @property
+    def _state(self) -> float:
+        """Return the aggregate cost rounded to the published precision."""
+        return from_micros(quantize_micros(self._cost_micros, COST_PRECISION_MICROS))
+
+    @_state.setter
+    def _state(self, value) -> None:
+        self._buckets.cost[self.bucket_slot] = to_micros(float(value))
+
+    @property
+    def _cost_total_micros(self) -> int:
+        """Return the aggregate cost of this interval in micro-currency."""
+        return self._cost_micros
+
+    @property
+    def _last_reset(self):
+        """Return the last reset time stored in the engine's buckets."""
+        return self._buckets.get_last_reset(self.bucket_slot)
+
+    @_last_reset.setter
+    def _last_reset(self, value) -> None:
+        self._buckets.set_last_reset(self.bucket_slot, value)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the member sensors the total follows."""
+        return {
+            "members": [
+                member.entity_id for member in self._engine.members(self.bucket_slot)
+            ]
+        }
+
+    async def async_added_to_hass(self):
+        """Follow the member sensors of this interval."""
+        await super().async_added_to_hass()
+        self._unit_of_measurement = get_currency(self.hass)
+        self._last_update = now()
+        self.async_on_remove(self._engine.async_register(self))
+        self.schedule_next_reset()
+
+    @callback
+    def async_reset(self, *args):
+        """Reset the total after collecting the members' cost up to now."""
+        reset_time = now()
+        self._engine.async_settle_members(self.bucket_slot, reset_time)
+        self._buckets.reset(self._slot_mask, reset_time)
+        self._last_update = reset_time
+        self.counters.count("resets")
+        self._publisher.async_publish_now()
+        _LOGGER.debug("Meter reset for %s", self._name)
+
+    @property
+    def unique_id(self):
+        """Return a unique identifier for this sensor."""
+        return get_interval_cost_unique_id(self._config_entry.entry_id, self._interval)
+
+    @property
+    def device_info(self):
+        """Group the aggregate sensors under the entry's own device."""
+        return _fallback_device_info(self._config_entry, self._device_name, None)
+
     @property
     def state_class(self):
         """Return the state class of this device, from SensorStateClass."""
@@ -838,5 +1097,5 @@ class PowerCostSensor(BaseUtilitySensor, RestoreEntity):
 
     @property
     def should_poll(self):
-        """No need to poll. Will be updated by RealTimeCostSensor."""
+        """No need to poll. Will be updated by the member sensors."""
         return False
@@ -0,0 +1,307 @@
+"""Imported long-term cost statistics for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .backfill import _history, _power_kw, _series, async_run_backfill
+from .const import DOMAIN
+from .core import energy_gap_costs, power_gap_costs
+from .price_hub import normalize_price
+from .reset_scheduler import async_get_reset_scheduler
+from .units import _state_to_float
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bucket slot accumulating the cost of the current statistics hour
+STATISTICS_SLOT = "statistics"
+# Closed hours held in memory before they are imported in one call
+BATCH_HOURS = 6
+# How far back a rebuild looks for the sum it continues from
+_SUM_LOOKBACK = timedelta(days=366)
+# First window searched for that sum; each further step back doubles it
+_SUM_WINDOW = timedelta(days=1)
+_HOUR = timedelta(hours=1)
+
+
+def statistic_id(entry_id: str) -> str:
+    """Return the external statistic id of a config entry's cost."""
+    return f"{DOMAIN}:{entry_id.lower()}_cost"
+
+
+def _floor_hour(when: datetime) -> datetime:
+    """Return the start of the UTC hour containing when."""
+    return dt_util.as_utc(when).replace(minute=0, second=0, microsecond=0)
+
+
+def compute_energy_hours(
+    hass: HomeAssistant,
+    start: datetime,
+    end: datetime,
+    energy_sensor_id: str,
+    price_sensor_id: str,
+    energy_to_kwh: float,
+    total_increasing: bool,
+) -> np.ndarray:
+    """Return the cost of every hour between start and end (executor)."""
+    hours = int((end - start) / _HOUR)
+    states = _history(hass, [energy_sensor_id, price_sensor_id], start, end)
+    times, readings = _series(
+        states.get(energy_sensor_id, []), _state_to_float, float("-inf")
+    )
+    if len(times) < 2:
+        return np.zeros(hours)
+    price_times, prices = _series(
+        states.get(price_sensor_id, []), normalize_price, float("-inf")
+    )
+    gap = energy_gap_costs(
+        times,
+        readings,
+        price_times,
+        prices,
+        energy_to_kwh=energy_to_kwh,
+        total_increasing=total_increasing,
+        fallback_price=None,
+    )
+    return gap.hourly(start.timestamp(), hours)
+
+
+def compute_power_hours(
+    hass: HomeAssistant,
+    start: datetime,
+    end: datetime,
+    power_sensor_id: str,
+    price_sensor_id: str,
+) -> np.ndarray:
+    """Return the cost of every hour between start and end (executor)."""
+    hours = int((end - start) / _HOUR)
+    states = _history(hass, [power_sensor_id, price_sensor_id], start, end)
+    power_times, power = _series(
+        states.get(power_sensor_id, []), _power_kw, float("-inf")
+    )
+    price_times, prices = _series(
+        states.get(price_sensor_id, []), normalize_price, float("-inf")
+    )
+    gap = power_gap_costs(
+        power_times,
+        power,
+        price_times,
+        prices,
+        start=start.timestamp(),
+        end=end.timestamp(),
+        splits=[start.timestamp() + 3600 * hour for hour in range(1, hours)],
+        fallback_price=None,
+    )
+    return gap.hourly(start.timestamp(), hours)
+
+
+def _last_sum(rows) -> float:
+    """Return the sum of the last of some statistics rows, or 0 without one."""
+    if not rows or rows[-1].get("sum") is None:
+        return 0.0
+    return float(rows[-1]["sum"])
+
+
+class CostStatistics:
+    """Hourly cost sums of one entry, imported as an external statistic.
+
+    The owning engine accumulates the current hour in its statistics slot
+    and closes it on the shared reset scheduler.  Closed hours are held and
+    imported in batches, on unload and on stop, so the recorder stores one
+    row per hour instead of deriving statistics from every state write.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, name: str) -> None:
+        """Initialize an empty statistics buffer."""
+        self.hass = hass
+        self.statistic_id = statistic_id(entry_id)
+        self._name = name
+        self._pending: list[tuple[datetime, float]] = []
+        self._last_sum: float | None = None
+        self._flush_lock = asyncio.Lock()
+        self._rebuild_lock = asyncio.Lock()
+
+    def _metadata(self):
+        """Return the statistic metadata."""
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.models import StatisticMetaData
+
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{self._name} Cost",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement=self.hass.config.currency,
+        )
+        try:
+            # pylint: disable-next=import-outside-toplevel
+            from homeassistant.components.recorder.models import StatisticMeanType
+        except ImportError:
+            # Cores before mean types only read has_mean
+            return metadata
+        metadata["mean_type"] = StatisticMeanType.NONE
+        return metadata
+
+    @callback
+    def async_track_hours(
+        self, close_hour: Callable[[datetime], float]
+    ) -> CALLBACK_TYPE:
+        """Close every UTC hour with ``close_hour`` and return a stop callback.
+
+        ``close_hour`` receives the hour boundary and returns the cost of
+        the hour that ended there.
+        """
+        scheduler = async_get_reset_scheduler(self.hass)
+        cancel: CALLBACK_TYPE | None = None
+
+        @callback
+        def _async_schedule() -> None:
+            nonlocal cancel
+            cancel = scheduler.async_schedule(
+                _floor_hour(dt_util.utcnow()) + _HOUR, _async_close
+            )
+
+        @callback
+        def _async_close(fired_at: datetime) -> None:
+            boundary = _floor_hour(fired_at)
+            self.async_add_hour(boundary - _HOUR, close_hour(boundary))
+            _async_schedule()
+
+        @callback
+        def _async_stop() -> None:
+            if cancel is not None:
+                cancel()
+
+        _async_schedule()
+        return _async_stop
+
+    @callback
+    def async_add_hour(self, start: datetime, cost: float) -> None:
+        """Buffer the cost of a closed hour and import full batches."""
+        self._pending.append((start, cost))
+        if len(self._pending) >= BATCH_HOURS:
+            self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self, *_) -> None:
+        """Import the buffered hours in one call."""
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.models import StatisticData
+
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            metadata = self._metadata()
+            last_sum = self._last_sum
+            if last_sum is None:
+                last_sum = await self._async_last_sum()
+            # The buffer and the sum only move on once the rows are imported
+            pending = list(self._pending)
+            rows = []
+            for start, cost in pending:
+                last_sum += cost
+                rows.append(StatisticData(start=start, state=cost, sum=last_sum))
+            async_add_external_statistics(self.hass, metadata, rows)
+            del self._pending[: len(pending)]
+            self._last_sum = last_sum
+            _LOGGER.debug("Imported %s hours of %s", len(rows), self.statistic_id)
+
+    async def _async_last_sum(self, before: datetime | None = None) -> float:
+        """Return the sum of the latest imported hour, optionally before a time.
+
+        Before a time, the hours are searched backwards in windows that
+        double in length, so a recent hour is found with a few rows read.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder import get_instance, statistics
+
+        instance = get_instance(self.hass)
+        if before is None:
+            result = await instance.async_add_executor_job(
+                statistics.get_last_statistics,
+                self.hass,
+                1,
+                self.statistic_id,
+                True,
+                {"sum"},
+            )
+            return _last_sum(result.get(self.statistic_id))
+        oldest = before - _SUM_LOOKBACK
+        end, window = before, _SUM_WINDOW
+        while end > oldest:
+            start = max(end - window, oldest)
+            result = await instance.async_add_executor_job(
+                statistics.statistics_during_period,
+                self.hass,
+                start,
+                end,
+                {self.statistic_id},
+                "hour",
+                None,
+                {"sum"},
+            )
+            if rows := result.get(self.statistic_id):
+                return _last_sum(rows)
+            end, window = start, window * 2
+        return 0.0
+
+    async def async_rebuild(
+        self, start: datetime, job: Callable[..., np.ndarray], *args
+    ) -> None:
+        """Recompute and re-import every full hour since start in one batch.
+
+        ``job`` runs on the recorder executor and returns the cost of each
+        hour.  The rebuild ends at the current hour, so no later imported
+        hour is left with a sum that no longer follows on.
+        """
+        if self._rebuild_lock.locked():
+            _LOGGER.debug("Rebuild of %s already running", self.statistic_id)
+            return
+        async with self._rebuild_lock:
+            start = _floor_hour(start)
+            end = _floor_hour(dt_util.utcnow())
+            if start >= end:
+                return
+            costs = await async_run_backfill(self.hass, job, start, end, *args)
+            # pylint: disable-next=import-outside-toplevel
+            from homeassistant.components.recorder.models import StatisticData
+
+            # pylint: disable-next=import-outside-toplevel
+            from homeassistant.components.recorder.statistics import (
+                async_add_external_statistics,
+            )
+
+            # A flush waiting for the recorder must not continue from the
+            # sum the rebuild replaces
+            async with self._flush_lock:
+                metadata = self._metadata()
+                total = await self._async_last_sum(start)
+                sums = total + np.cumsum(costs)
+                rows = [
+                    StatisticData(
+                        start=start + _HOUR * hour,
+                        state=float(costs[hour]),
+                        sum=float(sums[hour]),
+                    )
+                    for hour in range(len(costs))
+                ]
+                async_add_external_statistics(self.hass, metadata, rows)
+                # Closed hours after the rebuilt range continue from its sum
+                self._pending = [item for item in self._pending if item[0] >= end]
+                self._last_sum = float(sums[-1])
+            _LOGGER.info(
+                "Rebuilt %s hours of %s from %s", len(rows), self.statistic_id, start
+            )
@@ -0,0 +1,309 @@
+"""Per-entry persistence of the Dynamic Energy Costs accumulators."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, CoreState, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util.json import json_loads
+
+from .buckets import IntervalBuckets, RateBuckets
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Seconds an accumulator change may wait before the entry's file is written
+SAVE_DELAY = 60
+# Seconds between appends to the crash journal of an entry that enables it
+JOURNAL_INTERVAL = 5
+
+
+def _storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}"
+
+
+def _journal_path(hass: HomeAssistant, entry_id: str) -> Path:
+    return Path(hass.config.path(STORAGE_DIR, f"{_storage_key(entry_id)}.journal"))
+
+
+def _read_journal(path: Path) -> list[dict[str, Any]]:
+    """Return the journal's records; a torn or corrupt line is skipped."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    records = []
+    for line in text.splitlines():
+        try:
+            record = json_loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and isinstance(record.get("sequence"), int):
+            records.append(record)
+    return records
+
+
+def _append_journal(path: Path, line: str) -> None:
+    """Append a record and make sure it reached the disk."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as journal:
+        journal.write(line + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def _compact_journal(path: Path, sequence: int) -> None:
+    """Drop the records a saved snapshot already contains."""
+    newer = [record for record in _read_journal(path) if record["sequence"] > sequence]
+    if not newer:
+        path.unlink(missing_ok=True)
+        return
+    compacted = path.with_suffix(".compact")
+    compacted.write_text(
+        "".join(json_dumps(record) + "\n" for record in newer), encoding="utf-8"
+    )
+    compacted.replace(path)
+
+
+class EntryStore:
+    """One storage file holding every accumulator of a config entry.
+
+    The file is read once when the entry is set up.  Changes only schedule
+    a save; saves within ``SAVE_DELAY`` seconds of each other are coalesced
+    into one write, and the snapshot is taken on the event loop so it is
+    consistent with the accumulators.
+
+    With ``journal`` enabled, changes are also appended to a journal file
+    every ``JOURNAL_INTERVAL`` seconds, so a crash or power cut loses a few
+    seconds rather than everything since the last save.  Each record is a
+    numbered snapshot of the changed state, so replaying it is idempotent:
+    on load the newest record after the saved snapshot wins.  A save drops
+    the records it contains.  The engines mark their changes as they apply
+    them, and an engine that is accruing between events is journaled on
+    every tick, so held state writes do not delay the journal.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, journal: bool = False
+    ) -> None:
+        """Initialize the store of an entry."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _storage_key(entry_id), atomic_writes=True
+        )
+        self._journal = _journal_path(hass, entry_id) if journal else None
+        self._journal_lock = asyncio.Lock()
+        self._journal_pending = False
+        self._sequence = 0
+        self._restored: dict[str, Any] = {}
+        self._snapshots: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._accruing: dict[str, Callable[[], bool]] = {}
+        self._unsub_save: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        """Read the entry's file and replay its journal.
+
+        Unusable data is logged and treated as missing.
+        """
+        try:
+            self._restored = await self._store.async_load() or {}
+            self._sequence = self._restored.get("sequence", 0)
+        except Exception as e:
+            _LOGGER.error("Failed to load stored accumulators: %s", str(e))
+            self._restored = {}
+        if self._journal is not None:
+            try:
+                records = await self.hass.async_add_executor_job(
+                    _read_journal, self._journal
+                )
+            except OSError as e:
+                _LOGGER.error("Failed to read %s: %s", self._journal, str(e))
+            else:
+                self._replay(records)
+
+    def _replay(self, records: list[dict[str, Any]]) -> None:
+        """Restore from the newest journal record after the saved snapshot."""
+        newer = [record for record in records if record["sequence"] > self._sequence]
+        if newer:
+            self._restored = max(newer, key=lambda record: record["sequence"])
+            self._sequence = self._restored["sequence"]
+            _LOGGER.info(
+                "Replayed %s journal records of %s", len(newer), self._store.key
+            )
+
+    @callback
+    def async_start_journal(self) -> CALLBACK_TYPE:
+        """Append changes to the journal on a timer; returns a stop callback."""
+        return async_track_time_interval(
+            self.hass,
+            self._async_append_journal,
+            timedelta(seconds=JOURNAL_INTERVAL),
+            name=f"{self._store.key} journal",
+        )
+
+    def restored(self, key: str) -> dict[str, Any] | None:
+        """Return the data saved under key, or None."""
+        return self._restored.get(key)
+
+    @callback
+    def async_add(
+        self,
+        key: str,
+        snapshot: Callable[[], dict[str, Any]],
+        accruing: Callable[[], bool] | None = None,
+    ) -> None:
+        """Save the result of snapshot under key.
+
+        While ``accruing`` returns True the snapshot changes without any
+        event, so it is journaled on every tick.
+        """
+        self._snapshots[key] = snapshot
+        if accruing is not None:
+            self._accruing[key] = accruing
+
+    @callback
+    def async_mark_changed(self) -> None:
+        """Journal the snapshots at the next tick."""
+        self._journal_pending = self._journal is not None
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the snapshots within ``SAVE_DELAY`` seconds."""
+        self.async_mark_changed()
+        if self._unsub_save is None:
+            self._unsub_save = async_call_later(
+                self.hass, SAVE_DELAY, self._async_save_later
+            )
+
+    @callback
+    def _async_save_later(self, _now: datetime) -> None:
+        """Write the snapshots once the save delay has passed."""
+        self._unsub_save = None
+        self.hass.async_create_task(self.async_save())
+
+    @callback
+    def _async_snapshot(self) -> dict[str, Any]:
+        """Return every snapshot under the next sequence number."""
+        self._sequence += 1
+        data: dict[str, Any] = {"sequence": self._sequence}
+        for key, snapshot in self._snapshots.items():
+            data[key] = snapshot()
+        return data
+
+    async def _async_append_journal(self, _now: datetime) -> None:
+        """Append the changes since the last record to the journal."""
+        if not self._snapshots or not (
+            self._journal_pending
+            or any(accruing() for accruing in self._accruing.values())
+        ):
+            return
+        self._journal_pending = False
+        line = json_dumps(self._async_snapshot())
+        async with self._journal_lock:
+            try:
+                await self.hass.async_add_executor_job(
+                    _append_journal, self._journal, line
+                )
+            except OSError as e:
+                _LOGGER.error("Failed to append to %s: %s", self._journal, str(e))
+
+    async def async_save(self, *_) -> None:
+        """Write the snapshots now, cancelling a scheduled save.
+
+        The journal records the snapshot contains are dropped afterwards.
+        """
+        if self._unsub_save is not None:
+            self._unsub_save()
+            self._unsub_save = None
+        if not self._snapshots:
+            return
+        data = self._async_snapshot()
+        self._journal_pending = False
+        await self._store.async_save(data)
+        # While stopping the store only writes at the final write, so keep
+        # the records until a later save; replay skips them either way
+        if self._journal is not None and self.hass.state is not CoreState.stopping:
+            async with self._journal_lock:
+                try:
+                    await self.hass.async_add_executor_job(
+                        _compact_journal, self._journal, data["sequence"]
+                    )
+                except OSError as e:
+                    _LOGGER.error("Failed to compact %s: %s", self._journal, str(e))
+
+
+async def async_remove_entry_store(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the storage file and journal of a removed entry."""
+    await Store(hass, STORAGE_VERSION, _storage_key(entry_id)).async_remove()
+    await hass.async_add_executor_job(_journal_path(hass, entry_id).unlink, True)
+
+
+class StoredBuckets:
+    """Persist the interval slots of one engine's buckets in an entry store.
+
+    Only slots that had a sensor registered are saved, so a deselected
+    interval does not restore stale totals when it is selected again.
+    ``updated`` returns the time up to which the buckets are accurate; it
+    is where the restored slots' backfill starts.  ``accruing`` tells the
+    journal when the buckets change between events.
+    """
+
+    def __init__(
+        self,
+        store: EntryStore,
+        key: str,
+        buckets: IntervalBuckets | RateBuckets,
+        updated: Callable[[], datetime],
+        accruing: Callable[[], bool] | None = None,
+    ) -> None:
+        """Restore the buckets saved under key and save them from now on."""
+        self._store = store
+        self._buckets = buckets
+        self._updated = updated
+        self._tracked = np.zeros(len(buckets.intervals), dtype=bool)
+        self._restored = np.zeros(len(buckets.intervals), dtype=bool)
+        self._since: datetime | None = None
+        if (data := store.restored(key)) is not None:
+            try:
+                self._since = datetime.fromisoformat(data["updated"])
+                self._restored = buckets.restore(data)
+            except (KeyError, TypeError, ValueError) as e:
+                _LOGGER.error("Invalid stored accumulators for %s: %s", key, str(e))
+        store.async_add(key, self.snapshot, accruing)
+
+    def track(self, slot: int) -> None:
+        """Save a slot from now on."""
+        self._tracked[slot] = True
+
+    def restored_since(self, slot: int) -> datetime | None:
+        """Return when a restored slot was last accurate, or None if not restored."""
+        return self._since if self._restored[slot] else None
+
+    @callback
+    def async_mark_changed(self) -> None:
+        """Journal the entry's accumulators at the next tick."""
+        self._store.async_mark_changed()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the entry's accumulators soon."""
+        self._store.async_schedule_save()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the tracked slots and the time they are accurate to."""
+        return {
+            "updated": self._updated().isoformat(),
+            **self._buckets.as_dict(self._tracked),
+        }
@@ -0,0 +1,127 @@
+"""Source state parsing and unit conversion helpers for Dynamic Energy Costs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+
+_ENERGY_UNIT_TO_KWH: dict[str, float] = {
+    "Wh": 0.001,
+    "kWh": 1.0,
+    "MWh": 1000.0,
+}
+
+
+def _energy_factor_for_unit(unit: str | None) -> float:
+    """Return the kWh factor of an energy unit string (1.0 if unrecognised)."""
+    return _ENERGY_UNIT_TO_KWH.get(unit or "kWh", 1.0)
+
+
+def _energy_unit_conversion_factor(state) -> float:
+    """Return the factor to convert the energy sensor's unit to kWh.
+
+    Defaults to 1.0 (kWh) when the unit is missing or unrecognised.
+    """
+    if state is None:
+        return 1.0
+    return _energy_factor_for_unit(state.attributes.get("unit_of_measurement"))
+
+
+_POWER_UNIT_TO_KW: dict[str, float] = {
+    "W": 0.001,
+    "kW": 1.0,
+    "MW": 1000.0,
+}
+
+
+def _power_factor_for_unit(unit: str | None) -> float:
+    """Return the kW factor of a power unit string (W if unrecognised)."""
+    return _POWER_UNIT_TO_KW.get(unit or "W", 0.001)
+
+
+def _power_unit_conversion_factor(state) -> float:
+    """Return the factor to convert the power sensor's unit to kW.
+
+    Defaults to 0.001 (W → kW) when the unit is missing or unrecognised,
+    matching the historical behaviour where W was assumed.
+    """
+    if state is None:
+        return 0.001
+    return _power_factor_for_unit(state.attributes.get("unit_of_measurement"))
+
+
+_PRICE_UNIT_TO_PER_KWH: dict[str, float] = {
+    "wh": 1000.0,
+    "kwh": 1.0,
+    "mwh": 0.001,
+}
+
+
+@lru_cache(maxsize=32)
+def _price_factor_for_unit(unit: str | None) -> float:
+    """Return the currency/kWh factor of a price unit string such as ``EUR/MWh``.
+
+    Memoized: price units come from a handful of sensors, so the split and
+    lowercase only run once per distinct unit string.
+    """
+    if not unit or "/" not in unit:
+        return 1.0
+    energy_part = unit.rsplit("/", 1)[-1].strip().lower()
+    return _PRICE_UNIT_TO_PER_KWH.get(energy_part, 1.0)
+
+
+def _price_unit_conversion_factor(state) -> float:
+    """Return the factor to convert a price sensor's value to currency/kWh.
+
+    Parses unit_of_measurement (e.g. ``EUR/MWh``) and extracts the energy
+    denominator after the last ``/``.  Supports Wh, kWh and MWh in any
+    case.  Defaults to 1.0 when the unit is missing, has no slash, or
+    the energy part is unrecognised.
+    """
+    if state is None:
+        return 1.0
+    return _price_factor_for_unit(state.attributes.get("unit_of_measurement"))
+
+
+_UNRESOLVED = object()
+
+
+class UnitFactorCache:
+    """Conversion factor of one source sensor, keyed by its last-seen unit.
+
+    ``resolve`` only recomputes the factor when the ``unit_of_measurement``
+    string differs from the previous state, so the common case is a single
+    attribute lookup and identity comparison.  A missing state keeps the
+    last factor, which covers sources that are unavailable at startup.
+    """
+
+    __slots__ = ("_factor_for_unit", "_unit", "factor")
+
+    def __init__(
+        self, factor_for_unit: Callable[[str | None], float], default: float
+    ) -> None:
+        """Initialize the cache with the factor used until a unit is seen."""
+        self._factor_for_unit = factor_for_unit
+        self._unit: object = _UNRESOLVED
+        self.factor = default
+
+    def resolve(self, state) -> float:
+        """Return the factor for a state, recomputing only on a unit change."""
+        if state is None:
+            return self.factor
+        unit = state.attributes.get("unit_of_measurement")
+        if unit != self._unit:
+            self._unit = unit
+            self.factor = self._factor_for_unit(unit)
+        return self.factor
+
+
+def _state_to_float(state) -> float | None:
+    """Convert a Home Assistant state object to float if usable."""
+    if state is None or state.state in (None, "unknown", "unavailable"):
+        return None
+
+    try:
+        return float(state.state)
+    except (TypeError, ValueError):
+        return None
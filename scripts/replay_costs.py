@@ -0,0 +1,432 @@
+"""Replay recorded price and energy or power series through the cost logic.
+
+Series are CSV files with a header, or NDJSON files (``.ndjson``/``.jsonl``)
+with one object per line.  Each row needs a time (``time``, ``timestamp``,
+``last_updated`` or ``start``; ISO 8601 or POSIX seconds) and a value
+(``value`` or ``state``).  Rows whose value is not a number, such as
+``unavailable``, are skipped.
+
+``--mode stream`` feeds the merged events one by one into the same interval
+buckets the sensors use; ``--mode numpy`` prices the whole series at once
+with the vectorized backfill functions.  Both print the cost of every
+interval period between the first and last event as CSV.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterator
+import csv
+from dataclasses import dataclass
+from datetime import UTC, datetime, tzinfo
+import heapq
+import json
+import math
+from pathlib import Path
+import sys
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from custom_components.dynamic_energy_cost import INTERVALS
+from custom_components.dynamic_energy_cost.boundaries import BoundaryCalendar
+from custom_components.dynamic_energy_cost.core import (
+    EnergyAccumulator,
+    EnergyReading,
+    GapCosts,
+    PowerAccumulator,
+    energy_gap_costs,
+    power_gap_costs,
+)
+from custom_components.dynamic_energy_cost.money import from_micros
+from custom_components.dynamic_energy_cost.units import (
+    _energy_factor_for_unit,
+    _power_factor_for_unit,
+    _price_factor_for_unit,
+)
+
+_TIME_KEYS = ("time", "timestamp", "last_updated", "start")
+_VALUE_KEYS = ("value", "state")
+_NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+# Merge order of events sharing a timestamp: the price first, so a reading
+# at a price change is priced like the step function of the batch mode
+_PRICE = 0
+_SOURCE = 1
+
+Series = tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodCost:
+    """Cost accrued in one period of an interval."""
+
+    interval: str
+    start: datetime
+    cost: float
+
+
+def _first(record: dict, keys: tuple[str, ...]):
+    """Return the value of the first key present in a record."""
+    for key in keys:
+        if record.get(key) not in (None, ""):
+            return record[key]
+    return None
+
+
+def _parse_time(value, tz: tzinfo) -> float:
+    """Return a POSIX timestamp from POSIX seconds or an ISO 8601 string."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed.timestamp()
+
+
+def _parse_value(value) -> float | None:
+    """Return a finite float, or None for unusable values."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _records(path: Path) -> Iterator[dict]:
+    """Yield the rows of a CSV or NDJSON file as dicts."""
+    with path.open(encoding="utf-8", newline="") as file:
+        if path.suffix.lower() in _NDJSON_SUFFIXES:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def read_series(path: Path, tz: tzinfo = UTC, factor: float = 1.0) -> Series:
+    """Return the (timestamps, values) of a series file, sorted by time.
+
+    Values are scaled by ``factor``; naive times are read in ``tz``.
+    """
+    times = []
+    values = []
+    for record in _records(path):
+        stamp = _first(record, _TIME_KEYS)
+        value = _parse_value(_first(record, _VALUE_KEYS))
+        if stamp is None or value is None:
+            continue
+        times.append(_parse_time(stamp, tz))
+        values.append(value * factor)
+    order = np.argsort(times, kind="stable")
+    return np.asarray(times, dtype=float)[order], np.asarray(values)[order]
+
+
+def _span(*series: Series) -> tuple[datetime, datetime]:
+    """Return the times of the first and last event of the series."""
+    stamps = [times for times, _ in series if len(times)]
+    if not stamps:
+        raise ValueError("No usable rows in the input series")
+    first = min(times[0] for times in stamps)
+    last = max(times[-1] for times in stamps)
+    return datetime.fromtimestamp(first, UTC), datetime.fromtimestamp(last, UTC)
+
+
+def _events(prices: Series, source: Series) -> Iterator[tuple[float, int, float]]:
+    """Yield (timestamp, kind, value) of both series merged in time order."""
+    return heapq.merge(
+        ((stamp, _PRICE, value) for stamp, value in zip(*prices, strict=True)),
+        ((stamp, _SOURCE, value) for stamp, value in zip(*source, strict=True)),
+    )
+
+
+def _period_starts(
+    calendar: BoundaryCalendar, interval: str, first: datetime, last: datetime
+) -> list[datetime]:
+    """Return the start of every period of an interval from first to last.
+
+    A manual interval never resets, so it has a single period from first.
+    """
+    bucket = calendar.bucket(interval, first)
+    if bucket is None:
+        return [first]
+    starts = [bucket[0]]
+    boundary = bucket[1]
+    while boundary <= last:
+        starts.append(boundary)
+        boundary = calendar.next_boundary(interval, boundary)
+    return starts
+
+
+class _Periods:
+    """Open period of every interval during a streaming replay."""
+
+    def __init__(
+        self, intervals: list[str], calendar: BoundaryCalendar, first: datetime
+    ) -> None:
+        """Open the periods containing the first event."""
+        self._intervals = intervals
+        self._calendar = calendar
+        self._start: list[datetime] = []
+        self._next: list[datetime | None] = []
+        for interval in intervals:
+            bucket = calendar.bucket(interval, first)
+            self._start.append(first if bucket is None else bucket[0])
+            self._next.append(None if bucket is None else bucket[1])
+        self.rows: list[PeriodCost] = []
+
+    def crossed(self, when: datetime) -> list[tuple[datetime, int]]:
+        """Return the (boundary, slot) pairs up to when, in time order."""
+        crossed = []
+        for slot, interval in enumerate(self._intervals):
+            boundary = self._next[slot]
+            while boundary is not None and boundary <= when:
+                crossed.append((boundary, slot))
+                boundary = self._calendar.next_boundary(interval, boundary)
+            self._next[slot] = boundary
+        crossed.sort()
+        return crossed
+
+    def close(self, slot: int, boundary: datetime, cost: float) -> None:
+        """Record the cost of a slot's period and open the next one."""
+        self.rows.append(PeriodCost(self._intervals[slot], self._start[slot], cost))
+        self._start[slot] = boundary
+
+    def finish(self, costs: list[float]) -> list[PeriodCost]:
+        """Record the open periods and return every period, by interval."""
+        for slot, cost in enumerate(costs):
+            self.close(slot, self._start[slot], cost)
+        order = {interval: index for index, interval in enumerate(self._intervals)}
+        return sorted(self.rows, key=lambda row: (order[row.interval], row.start))
+
+
+def replay_energy_stream(
+    prices: Series,
+    readings: Series,
+    *,
+    intervals: list[str],
+    tz: tzinfo,
+    energy_to_kwh: float = 1.0,
+    total_increasing: bool = False,
+) -> list[PeriodCost]:
+    """Apply each reading to an ``EnergyAccumulator`` like the energy engine."""
+    first, _ = _span(prices, readings)
+    accumulator = EnergyAccumulator(intervals)
+    accumulator.buckets.active[:] = True
+    periods = _Periods(intervals, BoundaryCalendar(tz), first)
+    price: float | None = None
+
+    for stamp, kind, value in _events(prices, readings):
+        when = datetime.fromtimestamp(stamp, UTC)
+        for boundary, slot in periods.crossed(when):
+            periods.close(slot, boundary, accumulator.close(slot, boundary))
+        if kind == _PRICE:
+            price = value
+        elif price is not None:
+            accumulator.apply(
+                EnergyReading(
+                    current_energy=value,
+                    price=price,
+                    energy_to_kwh=energy_to_kwh,
+                    total_increasing=total_increasing,
+                    source_was_reset=value == 0,
+                )
+            )
+
+    return periods.finish([float(cost) for cost in accumulator.buckets.cost])
+
+
+def replay_power_stream(
+    prices: Series,
+    power: Series,
+    *,
+    intervals: list[str],
+    tz: tzinfo,
+    power_to_kw: float = 0.001,
+) -> list[PeriodCost]:
+    """Integrate the rate with a ``PowerAccumulator`` like the power engine."""
+    first, _ = _span(prices, power)
+    accumulator = PowerAccumulator(intervals)
+    accumulator.buckets.active[:] = True
+    accumulator.last_update = first
+    periods = _Periods(intervals, BoundaryCalendar(tz), first)
+    price: float | None = None
+    power_kw: float | None = None
+
+    for stamp, kind, value in _events(prices, power):
+        when = datetime.fromtimestamp(stamp, UTC)
+        for boundary, slot in periods.crossed(when):
+            periods.close(slot, boundary, accumulator.close(slot, boundary))
+        accumulator.settle(when, when)
+        if kind == _PRICE:
+            price = value
+        else:
+            power_kw = value * power_to_kw
+        if price is not None and power_kw is not None:
+            accumulator.set_rate(price, power_kw)
+
+    return periods.finish([from_micros(int(cost)) for cost in accumulator.buckets.cost])
+
+
+def _period_costs(
+    gap: GapCosts,
+    intervals: list[str],
+    calendar: BoundaryCalendar,
+    span: tuple[datetime, datetime],
+    side: str,
+) -> list[PeriodCost]:
+    """Sum the attributed costs of a gap per period of every interval.
+
+    ``side`` is ``"right"`` when an entry exactly on a boundary opens the
+    next period (readings) and ``"left"`` when it ends the previous one
+    (power segments).
+    """
+    rows = []
+    for interval in intervals:
+        starts = _period_starts(calendar, interval, *span)
+        stamps = np.array([start.timestamp() for start in starts])
+        index = np.searchsorted(stamps, gap.times, side=side) - 1
+        costs = np.bincount(index, weights=gap.costs, minlength=len(starts))
+        rows.extend(
+            PeriodCost(interval, start, float(cost))
+            for start, cost in zip(starts, costs, strict=True)
+        )
+    return rows
+
+
+def replay_energy_batch(
+    prices: Series,
+    readings: Series,
+    *,
+    intervals: list[str],
+    tz: tzinfo,
+    energy_to_kwh: float = 1.0,
+    total_increasing: bool = False,
+) -> list[PeriodCost]:
+    """Price every energy delta at once with ``energy_gap_costs``.
+
+    Readings before the first price are dropped, as the live path skips
+    them without taking a baseline.
+    """
+    span = _span(prices, readings)
+    price_times, price_values = prices
+    times, values = readings
+    if len(price_times):
+        keep = times >= price_times[0]
+        times, values = times[keep], values[keep]
+    gap = energy_gap_costs(
+        times,
+        values,
+        price_times,
+        price_values,
+        energy_to_kwh=energy_to_kwh,
+        total_increasing=total_increasing,
+        fallback_price=None,
+    )
+    return _period_costs(gap, intervals, BoundaryCalendar(tz), span, "right")
+
+
+def replay_power_batch(
+    prices: Series,
+    power: Series,
+    *,
+    intervals: list[str],
+    tz: tzinfo,
+    power_to_kw: float = 0.001,
+) -> list[PeriodCost]:
+    """Integrate the whole series at once with ``power_gap_costs``."""
+    span = _span(prices, power)
+    calendar = BoundaryCalendar(tz)
+    splits = [
+        start.timestamp()
+        for interval in intervals
+        for start in _period_starts(calendar, interval, *span)[1:]
+    ]
+    gap = power_gap_costs(
+        power[0],
+        power[1] * power_to_kw,
+        *prices,
+        start=span[0].timestamp(),
+        end=span[1].timestamp(),
+        splits=splits,
+        fallback_price=None,
+    )
+    return _period_costs(gap, intervals, calendar, span, "left")
+
+
+def write_costs(rows: list[PeriodCost], tz: tzinfo, file=None) -> None:
+    """Write the period costs as CSV, to stdout by default."""
+    writer = csv.writer(sys.stdout if file is None else file)
+    writer.writerow(["interval", "start", "cost"])
+    for row in rows:
+        writer.writerow(
+            [row.interval, row.start.astimezone(tz).isoformat(), f"{row.cost:.6f}"]
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Replay the given series and print the cost of every interval period."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("price", type=Path, help="price series (CSV or NDJSON)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--energy", type=Path, help="energy sensor series")
+    source.add_argument("--power", type=Path, help="power sensor series")
+    parser.add_argument("--mode", choices=("stream", "numpy"), default="stream")
+    parser.add_argument(
+        "--intervals",
+        default=",".join(INTERVALS),
+        help="comma-separated intervals (default: all)",
+    )
+    parser.add_argument("--timezone", default="UTC", help="local timezone")
+    parser.add_argument("--price-unit", help="price unit, such as EUR/MWh")
+    parser.add_argument("--energy-unit", default="kWh", help="Wh, kWh or MWh")
+    parser.add_argument("--power-unit", default="W", help="W, kW or MW")
+    parser.add_argument(
+        "--total-increasing",
+        action="store_true",
+        help="treat energy decreases as source resets",
+    )
+    args = parser.parse_args(argv)
+
+    intervals = [interval.strip() for interval in args.intervals.split(",")]
+    if unknown := set(intervals) - set(INTERVALS):
+        parser.error(f"unknown intervals: {', '.join(sorted(unknown))}")
+    tz = ZoneInfo(args.timezone)
+    prices = read_series(args.price, tz, _price_factor_for_unit(args.price_unit))
+
+    try:
+        if args.energy is not None:
+            replay = (
+                replay_energy_stream if args.mode == "stream" else replay_energy_batch
+            )
+            rows = replay(
+                prices,
+                read_series(args.energy, tz),
+                intervals=intervals,
+                tz=tz,
+                energy_to_kwh=_energy_factor_for_unit(args.energy_unit),
+                total_increasing=args.total_increasing,
+            )
+        else:
+            replay = (
+                replay_power_stream if args.mode == "stream" else replay_power_batch
+            )
+            rows = replay(
+                prices,
+                read_series(args.power, tz),
+                intervals=intervals,
+                tz=tz,
+                power_to_kw=_power_factor_for_unit(args.power_unit),
+            )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    write_costs(rows, tz)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,6 +6,20 @@ from pytest_homeassistant_custom_component.syrupy import HomeAssistantSnapshotEx
 from syrupy.assertion import SnapshotAssertion
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    parser.addoption(
+        "--update-benchmarks",
+        action="store_true",
+        help="rewrite test/fixtures/benchmark_baselines.json",
+    )
+    parser.addoption(
+        "--benchmark-large",
+        action="store_true",
+        help="also run the 500 entry setup benchmark",
+    )
+
+
 @pytest.fixture
 def snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
     """Return snapshot assertion fixture with the Home Assistant extension."""
@@ -0,0 +1,154 @@
+"""Tests for aggregate cost entries."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.dynamic_energy_cost.const import (
+    AGGREGATE_ENTRIES,
+    DAILY,
+    DOMAIN,
+    ENERGY_SENSORS,
+    HOURLY,
+    MANUAL,
+    SELECTED_SENSORS,
+)
+
+PRICE_ID = "sensor.electricity_price"
+ENERGY_ID = "sensor.boiler_energy"
+POWER_ID = "sensor.heater_power"
+PLUG_1 = "sensor.plug_1_energy"
+PLUG_2 = "sensor.plug_2_energy"
+KWH = {"unit_of_measurement": "kWh"}
+WATT = {"unit_of_measurement": "W"}
+
+
+async def _add_entry(hass, entry_id, data, selected) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id=entry_id,
+        data={"integration_description": entry_id.title(), **data},
+        options={SELECTED_SENSORS: selected},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def _state(hass, entry_id, interval) -> float:
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{entry_id}_{interval}_cost"
+    )
+    return float(hass.states.get(entity_id).state)
+
+
+async def _setup_house(hass):
+    """Set up an energy entry, a power entry and an aggregate of both."""
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(ENERGY_ID, "10", KWH)
+    hass.states.async_set(POWER_ID, "1000", WATT)
+    source = {"electricity_price_sensor": PRICE_ID}
+    await _add_entry(hass, "boiler", {**source, "energy_sensor": ENERGY_ID}, [DAILY])
+    await _add_entry(
+        hass, "heater", {**source, "power_sensor": POWER_ID}, [HOURLY, DAILY]
+    )
+    return await _add_entry(
+        hass, "house", {AGGREGATE_ENTRIES: ["boiler", "heater"]}, [HOURLY, DAILY]
+    )
+
+
+async def test_aggregate_adds_member_deltas(hass, freezer):
+    """The total follows every member and ignores member resets."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    await _setup_house(hass)
+    hass.states.async_set(ENERGY_ID, "11", KWH)
+    hass.states.async_set(ENERGY_ID, "13", KWH)
+    freezer.tick(timedelta(minutes=30))
+    hass.states.async_set(POWER_ID, "0", WATT)
+    await hass.async_block_till_done()
+
+    assert _state(hass, "boiler", DAILY) == pytest.approx(1.0)
+    assert _state(hass, "heater", DAILY) == pytest.approx(0.25)
+    assert _state(hass, "house", DAILY) == pytest.approx(1.25)
+    # Only the heater has an hourly sensor
+    assert _state(hass, "house", HOURLY) == pytest.approx(0.25)
+
+    # Resetting a member by hand is not a negative cost
+    boiler_daily = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"boiler_{DAILY}_cost"
+    )
+    await hass.services.async_call(
+        DOMAIN, "reset_cost", {"entity_id": boiler_daily}, blocking=True
+    )
+    hass.states.async_set(ENERGY_ID, "14", KWH)
+    await hass.async_block_till_done()
+
+    assert _state(hass, "boiler", DAILY) == pytest.approx(0.5)
+    assert _state(hass, "house", DAILY) == pytest.approx(1.75)
+    house_daily = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"house_{DAILY}_cost"
+    )
+    assert sorted(hass.states.get(house_daily).attributes["members"]) == [
+        boiler_daily,
+        er.async_get(hass).async_get_entity_id(
+            "sensor", DOMAIN, f"heater_{DAILY}_cost"
+        ),
+    ]
+
+
+async def test_aggregate_resets_on_its_own_boundary(hass, freezer):
+    """The hourly total restarts at its boundary; the daily total keeps counting."""
+    freezer.move_to("2026-02-15 10:30:00+00:00")
+    await _setup_house(hass)
+
+    # No power event arrives before the boundary
+    freezer.move_to("2026-02-15 11:00:00+00:00")
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert _state(hass, "house", HOURLY) == 0.0
+
+    freezer.tick(timedelta(minutes=6))
+    hass.states.async_set(POWER_ID, "2000", WATT)
+    await hass.async_block_till_done()
+
+    assert _state(hass, "house", HOURLY) == pytest.approx(0.05)
+    assert _state(hass, "house", DAILY) == pytest.approx(0.3)
+
+
+async def test_aggregate_follows_reloaded_members(hass, freezer):
+    """A reloaded member is followed again without counting its restored total."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set(PRICE_ID, "1.0")
+    hass.states.async_set(PLUG_1, "10", KWH)
+    hass.states.async_set(PLUG_2, "20", KWH)
+    plugs = await _add_entry(
+        hass,
+        "plugs",
+        {"electricity_price_sensor": PRICE_ID, ENERGY_SENSORS: [PLUG_1, PLUG_2]},
+        [MANUAL],
+    )
+    house = await _add_entry(hass, "house", {AGGREGATE_ENTRIES: ["plugs"]}, [MANUAL])
+    for source in (PLUG_1, PLUG_2):
+        hass.states.async_set(source, "30", KWH)
+        hass.states.async_set(source, "31", KWH)
+    await hass.async_block_till_done()
+    assert _state(hass, "house", MANUAL) == pytest.approx(2.0)
+
+    assert await hass.config_entries.async_reload(plugs.entry_id)
+    await hass.async_block_till_done()
+    hass.states.async_set(PLUG_1, "32", KWH)
+    await hass.async_block_till_done()
+
+    assert _state(hass, "house", MANUAL) == pytest.approx(3.0)
+    engine = house.runtime_data.engines[0]
+    assert len(engine.members(engine.slot(MANUAL))) == 2
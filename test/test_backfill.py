@@ -0,0 +1,185 @@
+"""Tests for the recorder backfill of downtime gaps."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.dynamic_energy_cost.const import (
+    AGGREGATE_ENTRIES,
+    DOMAIN,
+    HOURLY,
+    MANUAL,
+    SELECTED_SENSORS,
+)
+from custom_components.dynamic_energy_cost.engine import (
+    EnergyCostEngine,
+    PowerCostEngine,
+)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Set up the recorder before hass, which the autouse fixture requests."""
+    yield
+
+
+def _cost(hass, entry_id) -> float:
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{entry_id}_{HOURLY}_cost"
+    )
+    return float(hass.states.get(entity_id).state)
+
+
+async def test_energy_engine_backfills_gap_from_recorder(recorder_mock, hass, freezer):
+    """Consumption during a gap is priced from recorded price history."""
+    start = dt_util.utcnow().replace(minute=5, second=0, microsecond=0)
+    freezer.move_to(start)
+    hass.states.async_set("sensor.electricity_price", "1")
+    hass.states.async_set("sensor.heat_pump_energy", "10")
+    freezer.move_to(start + timedelta(minutes=10))
+    hass.states.async_set("sensor.heat_pump_energy", "12")
+    freezer.move_to(start + timedelta(minutes=20))
+    hass.states.async_set("sensor.electricity_price", "3")
+    freezer.move_to(start + timedelta(minutes=30))
+    hass.states.async_set("sensor.heat_pump_energy", "13")
+    await async_wait_recording_done(hass)
+
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    slot = engine.buckets.slot(MANUAL)
+    engine.buckets.baseline[slot] = 10.0
+    engine.async_backfill(slot, start + timedelta(seconds=1))
+    assert engine.buckets.baseline[slot] == 13.0
+    await engine._backfill_task
+    await hass.async_block_till_done()
+
+    # 2 kWh @ 1 and 1 kWh @ 3
+    assert engine.buckets.cost[slot] == pytest.approx(5.0)
+    assert engine.buckets.energy[slot] == pytest.approx(3.0)
+
+
+async def test_power_engine_backfill_applies_missed_reset(recorder_mock, hass, freezer):
+    """An hourly slot restored from before the boundary resets and keeps the tail."""
+    boundary = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = boundary - timedelta(minutes=30)
+    freezer.move_to(start - timedelta(minutes=5))
+    hass.states.async_set("sensor.electricity_price", "1")
+    hass.states.async_set("sensor.heat_pump_power", "2000")
+    freezer.move_to(boundary + timedelta(minutes=15))
+    await async_wait_recording_done(hass)
+
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    hourly = engine.buckets.slot(HOURLY)
+    manual = engine.buckets.slot(MANUAL)
+    engine.buckets.set_last_reset(hourly, start - timedelta(minutes=10))
+    engine.buckets.cost[hourly] = 7_000_000
+    engine.async_backfill(hourly, start)
+    engine.async_backfill(manual, start)
+    await engine._backfill_task
+    await hass.async_block_till_done()
+
+    assert engine.buckets.get_last_reset(hourly) == boundary
+    assert engine.buckets.cost[hourly] == 500_000
+    assert engine.buckets.cost[manual] == 1_500_000
+
+
+async def test_power_engine_backfills_slot_restored_during_read(
+    recorder_mock, hass, freezer
+):
+    """A slot restored while history is read is backfilled from its own time."""
+    boundary = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = boundary - timedelta(minutes=30)
+    freezer.move_to(start - timedelta(minutes=5))
+    hass.states.async_set("sensor.electricity_price", "1")
+    hass.states.async_set("sensor.heat_pump_power", "2000")
+    freezer.move_to(boundary + timedelta(minutes=15))
+    await async_wait_recording_done(hass)
+
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    hourly = engine.buckets.slot(HOURLY)
+    manual = engine.buckets.slot(MANUAL)
+    engine.async_backfill(manual, start + timedelta(minutes=15))
+    # Let the first pass start reading history
+    await asyncio.sleep(0)
+    assert engine._backfill_task is not None
+    engine.buckets.set_last_reset(hourly, start - timedelta(minutes=10))
+    engine.buckets.cost[hourly] = 7_000_000
+    engine.async_backfill(hourly, start)
+    await engine._backfill_task
+    await hass.async_block_till_done()
+
+    assert engine.buckets.get_last_reset(hourly) == boundary
+    assert engine.buckets.cost[hourly] == 500_000
+    # 30 minutes at 2 kW, not the 45 minutes of the earliest restored slot
+    assert engine.buckets.cost[manual] == 1_000_000
+
+
+async def test_aggregate_follows_member_backfilled_across_boundary(
+    recorder_mock, hass, freezer
+):
+    """A member restarted after its boundary adds only the gap after it."""
+    freezer.move_to("2026-02-15 10:40:00+00:00")
+    hass.states.async_set("sensor.electricity_price", "6")
+    hass.states.async_set("sensor.heater_power", "1000", {"unit_of_measurement": "W"})
+    heater = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="heater",
+        data={
+            "integration_description": "Heater",
+            "electricity_price_sensor": "sensor.electricity_price",
+            "power_sensor": "sensor.heater_power",
+        },
+        options={SELECTED_SENSORS: [HOURLY]},
+    )
+    house = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="house",
+        data={"integration_description": "House", AGGREGATE_ENTRIES: ["heater"]},
+        options={SELECTED_SENSORS: [HOURLY]},
+    )
+    for entry in (heater, house):
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    # 10 minutes at 6/h
+    freezer.move_to("2026-02-15 10:50:00+00:00")
+    hass.states.async_set("sensor.heater_power", "2000", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    assert _cost(hass, "house") == pytest.approx(1.0)
+
+    # Unloading saves the heater's 6 more minutes at 12/h
+    freezer.move_to("2026-02-15 10:56:00+00:00")
+    assert await hass.config_entries.async_unload(heater.entry_id)
+    await hass.async_block_till_done()
+    await async_wait_recording_done(hass)
+    freezer.move_to("2026-02-15 11:10:00+00:00")
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert _cost(hass, "house") == 0.0
+
+    assert await hass.config_entries.async_setup(heater.entry_id)
+    await hass.async_block_till_done()
+    engine = heater.runtime_data.engines[0]
+    if engine._backfill_task is not None:
+        await engine._backfill_task
+    await hass.async_block_till_done()
+
+    # The 10 minutes at 12/h after the boundary; the restored 2.2 before
+    # it is not taken back from the house
+    assert _cost(hass, "heater") == pytest.approx(2.0)
+    assert _cost(hass, "house") == pytest.approx(2.0)
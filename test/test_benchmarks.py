@@ -0,0 +1,322 @@
+"""Hot-path benchmarks compared against the baselines in fixtures/.
+
+Timings are stored relative to a fixed pure-Python reference workload run on
+the same machine, so the baselines carry over between a laptop and CI.  A
+benchmark fails when it gets more than ``MAX_SLOWDOWN`` times slower than its
+baseline.  Rewrite the baselines with ``pytest test/test_benchmarks.py
+--update-benchmarks --benchmark-large`` after an intended change.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import json
+from pathlib import Path
+import time
+
+import pytest
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, State
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_energy_cost import INTERVALS
+from custom_components.dynamic_energy_cost.const import DOMAIN
+from custom_components.dynamic_energy_cost.core import (
+    EnergyAccumulator,
+    EnergyReading,
+    PowerAccumulator,
+)
+from custom_components.dynamic_energy_cost.engine import (
+    EnergyCostEngine,
+    PowerCostEngine,
+)
+from custom_components.dynamic_energy_cost.price_hub import async_get_price_hub
+from custom_components.dynamic_energy_cost.sensor import (
+    EnergyCostSensor,
+    PowerCostSensor,
+    RealTimeCostSensor,
+)
+
+BASELINES_PATH = Path(__file__).parent / "fixtures" / "benchmark_baselines.json"
+# Fail when a benchmark is this many times slower than its baseline
+MAX_SLOWDOWN = 2.0
+EVENTS = 2000
+ROUNDS = 5
+
+PRICE_ID = "sensor.electricity_price"
+ENERGY_ID = "sensor.heat_pump_energy"
+POWER_ID = "sensor.heat_pump_power"
+
+
+def _reference_workload() -> None:
+    values: dict[int, float] = {}
+    for index in range(20_000):
+        values[index % 64] = values.get(index % 64, 0.0) + index * 1.5
+
+
+def _best_of(run: Callable[[int], None], rounds: int = ROUNDS) -> float:
+    best = float("inf")
+    for round_index in range(rounds):
+        started = time.perf_counter()
+        run(round_index)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def _async_best_of(
+    run: Callable[[int], Awaitable[None]], rounds: int = ROUNDS
+) -> float:
+    best = float("inf")
+    for round_index in range(rounds):
+        started = time.perf_counter()
+        await run(round_index)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@pytest.fixture(scope="module")
+def reference_seconds() -> float:
+    """Return the time of the reference workload on this machine."""
+    return _best_of(lambda _: _reference_workload(), rounds=20)
+
+
+@pytest.fixture(scope="module")
+def baselines(request):
+    """Load the stored baselines and rewrite them on request."""
+    stored = json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    yield stored
+    if request.config.getoption("--update-benchmarks"):
+        BASELINES_PATH.write_text(
+            json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+
+
+@pytest.fixture
+def check_benchmark(request, baselines, reference_seconds):
+    """Compare seconds per operation with the stored baseline of a benchmark."""
+
+    def _check(name: str, seconds: float) -> None:
+        relative = seconds / reference_seconds
+        if request.config.getoption("--update-benchmarks"):
+            baselines[name] = {
+                "relative": round(relative, 6),
+                "microseconds": round(seconds * 1e6, 3),
+            }
+            return
+        assert name in baselines, f"No baseline for {name}, run --update-benchmarks"
+        limit = baselines[name]["relative"] * MAX_SLOWDOWN
+        assert relative <= limit, (
+            f"{name} takes {seconds * 1e6:.1f} us, "
+            f"{relative / baselines[name]['relative']:.2f}x its baseline"
+        )
+
+    return _check
+
+
+def _entry() -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "integration_description": "Heat Pump",
+            "electricity_price_sensor": PRICE_ID,
+            "power_sensor": POWER_ID,
+            "energy_sensor": ENERGY_ID,
+        },
+    )
+
+
+def _events(entity_id: str, values: list[float], unit: str) -> list[Event]:
+    """Return state changed events one second apart, ending now."""
+    start = dt_util.utcnow() - timedelta(seconds=len(values))
+    attributes = {"unit_of_measurement": unit, "state_class": "total_increasing"}
+    events = []
+    old_state = None
+    for index, value in enumerate(values):
+        new_state = State(
+            entity_id,
+            str(value),
+            attributes,
+            last_updated=start + timedelta(seconds=index),
+        )
+        events.append(
+            Event(
+                EVENT_STATE_CHANGED,
+                {
+                    "entity_id": entity_id,
+                    "old_state": old_state,
+                    "new_state": new_state,
+                },
+            )
+        )
+        old_state = new_state
+    return events
+
+
+def _rounds(events: list[Event]) -> list[list[Event]]:
+    return [events[index : index + EVENTS] for index in range(0, len(events), EVENTS)]
+
+
+def _power_events() -> list[list[Event]]:
+    values = [float(1000 + index % 700) for index in range(EVENTS * ROUNDS)]
+    return _rounds(_events(POWER_ID, values, "W"))
+
+
+def _noop() -> None:
+    return None
+
+
+async def test_benchmark_realtime_power_event(hass, check_benchmark):
+    """Per-event cost of the power engine's handler feeding a realtime sensor."""
+    hass.states.async_set(PRICE_ID, "0.25")
+    engine = PowerCostEngine(hass, POWER_ID, PRICE_ID)
+    sensor = RealTimeCostSensor(hass, _entry(), PRICE_ID, POWER_ID, engine)
+    sensor.async_write_ha_state = _noop
+    engine.async_add_rate_listener(sensor._async_publish_rate)
+    rounds = _power_events()
+
+    def run(round_index: int) -> None:
+        for event in rounds[round_index]:
+            engine._async_handle_power_event(event)
+
+    check_benchmark("realtime_power_event", _best_of(run) / EVENTS)
+
+
+def _energy_engine(hass) -> EnergyCostEngine:
+    """Return an energy engine with a sensor registered for every interval."""
+    engine = EnergyCostEngine(hass, ENERGY_ID, PRICE_ID)
+    for interval in INTERVALS:
+        sensor = EnergyCostSensor(hass, _entry(), ENERGY_ID, PRICE_ID, interval, engine)
+        sensor.async_write_ha_state = _noop
+        engine.async_register(sensor)
+    return engine
+
+
+async def test_benchmark_energy_interval_update(hass, check_benchmark):
+    """Per-event cost of applying an energy reading to every interval sensor."""
+    hass.states.async_set(PRICE_ID, "0.25")
+    engine = _energy_engine(hass)
+    values = [100 + index * 0.01 for index in range(EVENTS * ROUNDS)]
+    rounds = _rounds(_events(ENERGY_ID, values, "kWh"))
+
+    def run(round_index: int) -> None:
+        for event in rounds[round_index]:
+            engine._async_handle_energy_event(event)
+
+    check_benchmark("energy_interval_update", _best_of(run) / EVENTS)
+
+
+async def test_benchmark_energy_price_update(hass, check_benchmark):
+    """Per-event cost of a price change, from the shared feed to every interval."""
+    hass.states.async_set(PRICE_ID, "0.1", {"unit_of_measurement": "EUR/kWh"})
+    hass.states.async_set(ENERGY_ID, "100", {"unit_of_measurement": "kWh"})
+    _energy_engine(hass)
+    feed = async_get_price_hub(hass).feed(PRICE_ID)
+    values = [0.1 + index % 50 * 0.01 for index in range(EVENTS * ROUNDS)]
+    rounds = _rounds(_events(PRICE_ID, values, "EUR/kWh"))
+
+    def run(round_index: int) -> None:
+        for event in rounds[round_index]:
+            feed._async_handle_event(event)
+
+    check_benchmark("energy_price_update", _best_of(run) / EVENTS)
+
+
+async def test_benchmark_power_interval_update(hass, check_benchmark):
+    """Per-event cost of integrating a power change into every interval sensor.
+
+    Interval sensors no longer listen to the realtime sensor; the engine's
+    power handler integrates and publishes all of them.
+    """
+    hass.states.async_set(PRICE_ID, "0.25")
+    engine = PowerCostEngine(hass, POWER_ID, PRICE_ID)
+    for interval in INTERVALS:
+        sensor = PowerCostSensor(hass, _entry(), POWER_ID, PRICE_ID, interval, engine)
+        sensor.async_write_ha_state = _noop
+        engine.async_register(sensor)
+    rounds = _power_events()
+    # Integrate from the first event rather than from the subscription time
+    engine.accumulator.last_update = rounds[0][0].data["new_state"].last_updated
+
+    def run(round_index: int) -> None:
+        for event in rounds[round_index]:
+            engine._async_handle_power_event(event)
+
+    check_benchmark("power_interval_update", _best_of(run) / EVENTS)
+
+
+def test_benchmark_core_energy_apply(check_benchmark):
+    """Per-reading cost of the energy accumulator over every interval."""
+    accumulator = EnergyAccumulator(INTERVALS)
+    accumulator.buckets.active[:] = True
+    readings = [
+        EnergyReading(
+            current_energy=100 + index * 0.01,
+            price=0.25,
+            energy_to_kwh=1.0,
+            total_increasing=True,
+        )
+        for index in range(EVENTS * ROUNDS)
+    ]
+
+    def run(round_index: int) -> None:
+        for reading in readings[round_index * EVENTS : (round_index + 1) * EVENTS]:
+            accumulator.apply(reading)
+
+    check_benchmark("core_energy_apply", _best_of(run) / EVENTS)
+
+
+def test_benchmark_core_power_settle(check_benchmark):
+    """Per-step cost of integrating a power rate into every interval."""
+    accumulator = PowerAccumulator(INTERVALS)
+    accumulator.buckets.active[:] = True
+    accumulator.set_rate(0.25, 1.5)
+    start = dt_util.utcnow() - timedelta(seconds=EVENTS * ROUNDS + 1)
+    accumulator.last_update = start
+    times = [start + timedelta(seconds=index + 1) for index in range(EVENTS * ROUNDS)]
+    current_time = dt_util.utcnow()
+
+    def run(round_index: int) -> None:
+        for when in times[round_index * EVENTS : (round_index + 1) * EVENTS]:
+            accumulator.settle(when, current_time)
+
+    check_benchmark("core_power_settle", _best_of(run) / EVENTS)
+
+
+@pytest.mark.parametrize("entries", [1, 50, 500])
+async def test_benchmark_entry_setup(hass, request, check_benchmark, entries):
+    """Per-entry cost of setting up energy entries with every interval."""
+    if entries > 50 and not request.config.getoption("--benchmark-large"):
+        pytest.skip("needs --benchmark-large")
+    hass.states.async_set(PRICE_ID, "0.25")
+    # Set up the integration first, so each entry is set up on its own
+    assert await async_setup_component(hass, DOMAIN, {})
+    rounds = 3 if entries <= 50 else 1
+    config_entries = []
+    for index in range(entries * rounds):
+        energy_id = f"sensor.energy_{index}"
+        hass.states.async_set(energy_id, "1", {"unit_of_measurement": "kWh"})
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                "integration_description": f"Meter {index}",
+                "electricity_price_sensor": PRICE_ID,
+                "energy_sensor": energy_id,
+                "power_sensor": None,
+            },
+        )
+        config_entries.append(entry)
+
+    async def run(round_index: int) -> None:
+        for entry in config_entries[
+            round_index * entries : (round_index + 1) * entries
+        ]:
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    seconds = await _async_best_of(run, rounds)
+    check_benchmark(f"entry_setup_{entries}", seconds / entries)
@@ -0,0 +1,89 @@
+"""Tests for the precomputed reset boundary calendar."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from custom_components.dynamic_energy_cost.boundaries import (
+    BoundaryCalendar,
+    boundary_calendar,
+)
+from custom_components.dynamic_energy_cost.const import (
+    DAILY,
+    HOURLY,
+    MANUAL,
+    MONTHLY,
+    QUARTERLY,
+    WEEKLY,
+    YEARLY,
+)
+
+TALLINN = ZoneInfo("Europe/Tallinn")
+
+
+def test_daily_buckets_follow_23_and_25_hour_days() -> None:
+    """Daily buckets span the real length of DST transition days."""
+    calendar = BoundaryCalendar(TALLINN)
+
+    start, end = calendar.bucket(DAILY, datetime(2026, 3, 29, 12, tzinfo=TALLINN))
+    assert start == datetime(2026, 3, 29, tzinfo=TALLINN)
+    assert end == datetime(2026, 3, 30, tzinfo=TALLINN)
+    assert end.astimezone(UTC) - start.astimezone(UTC) == timedelta(hours=23)
+
+    start, end = calendar.bucket(DAILY, datetime(2026, 10, 25, 12, tzinfo=TALLINN))
+    assert end.astimezone(UTC) - start.astimezone(UTC) == timedelta(hours=25)
+
+
+def test_hourly_boundaries_step_through_repeated_hour() -> None:
+    """The repeated hour of a fall-back transition is its own bucket."""
+    calendar = BoundaryCalendar(TALLINN)
+    # 03:30 local occurs twice on 2026-10-25; fold=1 is the second, EET one.
+    second_pass = datetime(2026, 10, 25, 3, 30, fold=1, tzinfo=TALLINN)
+
+    start, end = calendar.bucket(HOURLY, second_pass)
+
+    assert start.astimezone(UTC) == datetime(2026, 10, 25, 1, tzinfo=UTC)
+    assert end.astimezone(UTC) == datetime(2026, 10, 25, 2, tzinfo=UTC)
+
+
+def test_next_boundary_is_strictly_after_when() -> None:
+    """A time on a boundary resolves to the following boundary."""
+    calendar = BoundaryCalendar(TALLINN)
+    on_boundary = datetime(2026, 2, 15, 10, 30, tzinfo=TALLINN)
+
+    assert calendar.next_boundary(QUARTERLY, on_boundary) == datetime(
+        2026, 2, 15, 10, 45, tzinfo=TALLINN
+    )
+    assert calendar.next_boundary(WEEKLY, on_boundary) == datetime(
+        2026, 2, 16, tzinfo=TALLINN
+    )
+    assert calendar.next_boundary(MONTHLY, on_boundary) == datetime(
+        2026, 3, 1, tzinfo=TALLINN
+    )
+    assert calendar.next_boundary(YEARLY, on_boundary) == datetime(
+        2027, 1, 1, tzinfo=TALLINN
+    )
+    assert calendar.next_boundary(MANUAL, on_boundary) is None
+
+
+def test_lookups_roll_forward_and_rebuild_past_horizon() -> None:
+    """Walking forward past the precomputed range keeps boundaries consistent."""
+    calendar = BoundaryCalendar(TALLINN)
+    when = datetime(2026, 1, 1, tzinfo=TALLINN)
+
+    for _ in range(400):
+        next_reset = calendar.next_boundary(QUARTERLY, when)
+        assert next_reset - when == timedelta(minutes=15)
+        when = next_reset
+
+    assert when == datetime(2026, 1, 5, 4, tzinfo=TALLINN)
+    assert calendar.bucket(QUARTERLY, datetime(2026, 1, 1, 0, 7, tzinfo=TALLINN)) == (
+        datetime(2026, 1, 1, 0, 0, tzinfo=TALLINN),
+        datetime(2026, 1, 1, 0, 15, tzinfo=TALLINN),
+    )
+
+
+def test_calendar_is_shared_per_timezone() -> None:
+    """Sensors in the same timezone share one calendar."""
+    assert boundary_calendar(TALLINN) is boundary_calendar(TALLINN)
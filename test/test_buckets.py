@@ -0,0 +1,234 @@
+"""Tests for the vectorized interval accumulators."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.dynamic_energy_cost import INTERVALS
+from custom_components.dynamic_energy_cost.buckets import IntervalBuckets, RateBuckets
+from custom_components.dynamic_energy_cost.const import DAILY, HOURLY, MANUAL
+from custom_components.dynamic_energy_cost.money import US_PER_HOUR, integrate_micros
+
+
+def _apply(buckets, current_energy, price, **kwargs):
+    kwargs.setdefault("source_was_reset", False)
+    kwargs.setdefault("total_increasing", False)
+    return buckets.apply(current_energy, 1.0, price, **kwargs)
+
+
+def test_apply_updates_all_active_intervals_at_once():
+    """One reading accrues cost and energy in every active slot."""
+    buckets = IntervalBuckets(INTERVALS)
+    buckets.active[:] = True
+    buckets.baseline[:] = 10.0
+
+    accrued = _apply(buckets, 12.0, 0.5)
+
+    assert accrued.all()
+    np.testing.assert_allclose(buckets.cost, 1.0)
+    np.testing.assert_allclose(buckets.energy, 2.0)
+    np.testing.assert_allclose(buckets.baseline, 12.0)
+
+
+def test_apply_only_sets_baseline_for_slots_without_one():
+    """Slots without a baseline start from the reading instead of accruing."""
+    buckets = IntervalBuckets(INTERVALS)
+    buckets.active[:] = True
+    hourly = buckets.slot(HOURLY)
+    buckets.baseline[hourly] = 10.0
+
+    accrued = _apply(buckets, 12.0, 2.0)
+
+    assert accrued[hourly]
+    assert accrued.sum() == 1
+    assert buckets.cost[hourly] == 4.0
+    np.testing.assert_allclose(buckets.baseline, 12.0)
+
+
+def test_apply_total_increasing_decrement_rebases_per_slot():
+    """A decrement below a slot's baseline is a source reset for that slot only."""
+    buckets = IntervalBuckets(INTERVALS)
+    buckets.active[:] = True
+    buckets.baseline[:] = 5.0
+    daily = buckets.slot(DAILY)
+    buckets.baseline[daily] = 50.0
+
+    accrued = _apply(buckets, 6.0, 1.0, total_increasing=True)
+
+    assert not accrued[daily]
+    assert buckets.cost[daily] == 0.0
+    assert buckets.cost[buckets.slot(HOURLY)] == pytest.approx(1.0)
+
+
+def test_apply_ignores_inactive_slots():
+    """Inactive slots keep their state untouched."""
+    buckets = IntervalBuckets(INTERVALS)
+    buckets.baseline[:] = 1.0
+    buckets.active[buckets.slot(MANUAL)] = True
+
+    _apply(buckets, 3.0, 1.0)
+
+    assert buckets.cost.sum() == pytest.approx(2.0)
+    assert buckets.baseline[buckets.slot(HOURLY)] == 1.0
+
+
+def test_reset_zeroes_masked_slots_only():
+    """Reset is a masked zeroing that keeps other intervals intact."""
+    buckets = IntervalBuckets(INTERVALS)
+    buckets.cost[:] = 3.0
+    buckets.energy[:] = 1.5
+    hourly = buckets.slot(HOURLY)
+    when = datetime(2026, 3, 1, 12, 0, tzinfo=dt_util.UTC)
+
+    buckets.reset(buckets.mask(hourly), when, baseline=42.0)
+
+    assert buckets.cost[hourly] == 0.0
+    assert buckets.energy[hourly] == 0.0
+    assert buckets.baseline[hourly] == 42.0
+    assert buckets.get_last_reset(hourly) == when
+    assert buckets.cost[buckets.slot(DAILY)] == 3.0
+    assert np.isnan(buckets.baseline[buckets.slot(DAILY)])
+
+
+def test_last_reset_round_trips_iso_strings_exactly():
+    """Restored ISO timestamps survive the integer microsecond storage."""
+    buckets = IntervalBuckets(INTERVALS)
+    value = "2026-03-01T00:00:00.123457+00:00"
+
+    buckets.set_last_reset(0, value)
+
+    assert buckets.get_last_reset(0) == dt_util.parse_datetime(value)
+
+
+def test_rate_integration_carries_remainder_per_slot():
+    """Integer rate integration is exact and keeps each slot's remainder."""
+    buckets = RateBuckets(INTERVALS)
+    buckets.active[:] = True
+    hourly = buckets.slot(HOURLY)
+    buckets.reset(buckets.mask(hourly), dt_util.utcnow())
+    buckets.remainder[buckets.slot(DAILY)] = US_PER_HOUR - 1
+
+    changed = buckets.integrate(3, US_PER_HOUR // 2)
+
+    assert changed[buckets.slot(DAILY)]
+    assert buckets.cost[buckets.slot(DAILY)] == 2
+    assert buckets.cost[hourly] == 1
+    assert buckets.remainder[hourly] == US_PER_HOUR // 2
+
+    buckets.integrate(3, US_PER_HOUR // 2)
+    assert buckets.cost[hourly] == 3
+    assert buckets.remainder[hourly] == 0
+
+
+def test_rate_integration_handles_negative_prices_and_inactive_slots():
+    """Negative rates reduce cost and inactive slots are left untouched."""
+    buckets = RateBuckets(INTERVALS)
+    buckets.active[buckets.slot(HOURLY)] = True
+
+    changed = buckets.integrate(-2_000_000, US_PER_HOUR)
+
+    assert buckets.cost[buckets.slot(HOURLY)] == -2_000_000
+    assert buckets.cost[buckets.slot(DAILY)] == 0
+    assert changed.sum() == 1
+
+
+def test_per_slot_rates_match_single_rate_integration():
+    """Per-slot rates integrate exactly like one rate, also over many hours."""
+    single = RateBuckets(INTERVALS)
+    rates = RateBuckets(INTERVALS)
+    single.active[:] = True
+    rates.active[:] = True
+    rate = 1_234_567
+
+    for elapsed in (1, US_PER_HOUR // 3, 7 * US_PER_HOUR + 11, 400 * US_PER_HOUR):
+        expected = single.integrate(rate, elapsed)
+        changed = rates.integrate_rates(np.full(len(INTERVALS), rate), elapsed)
+        assert changed.tolist() == expected.tolist()
+
+    assert rates.cost.tolist() == single.cost.tolist()
+    assert rates.remainder.tolist() == single.remainder.tolist()
+
+
+def test_per_slot_rates_stay_exact_above_the_int64_rate_limit():
+    """Rates whose sub-hour product overflows int64 still integrate exactly."""
+    buckets = RateBuckets(INTERVALS)
+    buckets.active[:] = True
+    limit = (np.iinfo(np.int64).max - US_PER_HOUR) // US_PER_HOUR
+    rates = np.array([limit, limit + 1, 3_000_000_000, -3_000_000_000, 10**12, 1, 0])
+    elapsed = 2 * US_PER_HOUR - 1
+
+    buckets.integrate_rates(rates, elapsed)
+
+    for slot, rate in enumerate(rates.tolist()):
+        assert (buckets.cost[slot], buckets.remainder[slot]) == integrate_micros(
+            rate, elapsed, 0
+        )
+
+
+def test_apply_prices_per_slot_readings_in_one_step():
+    """Slots fed by different sources take their own reading and unit."""
+    buckets = IntervalBuckets(["a", "b", "c"])
+    buckets.active[:] = True
+    buckets.baseline[:] = [10.0, 1000.0, 5.0]
+
+    accrued = buckets.apply(
+        np.array([12.0, 1500.0, 4.0]),
+        np.array([1.0, 0.001, 1.0]),
+        0.5,
+        source_was_reset=False,
+        total_increasing=np.array([False, False, True]),
+    )
+
+    assert accrued.tolist() == [True, True, False]
+    assert buckets.cost.tolist() == pytest.approx([1.0, 0.25, 0.0])
+    assert buckets.baseline.tolist() == [12.0, 1500.0, 4.0]
+
+
+def test_as_dict_round_trips_selected_slots_by_interval():
+    """Saved slots restore by interval name; NaN baselines survive as None."""
+    buckets = IntervalBuckets(INTERVALS)
+    hourly, daily = buckets.slot(HOURLY), buckets.slot(DAILY)
+    buckets.cost[hourly] = 1.25
+    buckets.baseline[hourly] = 42.0
+    buckets.cost[daily] = 3.5
+    buckets.set_last_reset(daily, datetime(2026, 3, 1, tzinfo=dt_util.UTC))
+
+    data = buckets.as_dict(buckets.mask(hourly, daily))
+    data["intervals"].append("fortnightly")
+    for name in ("last_reset", "cost", "energy", "baseline"):
+        data[name].append(0)
+
+    restored = IntervalBuckets(list(reversed(INTERVALS)))
+    mask = restored.restore(data)
+
+    assert data["baseline"][1] is None
+    assert np.flatnonzero(mask).tolist() == sorted(
+        [restored.slot(HOURLY), restored.slot(DAILY)]
+    )
+    assert restored.cost[restored.slot(HOURLY)] == 1.25
+    assert restored.baseline[restored.slot(HOURLY)] == 42.0
+    assert np.isnan(restored.baseline[restored.slot(DAILY)])
+    assert restored.get_last_reset(restored.slot(DAILY)) == datetime(
+        2026, 3, 1, tzinfo=dt_util.UTC
+    )
+
+
+def test_rate_as_dict_keeps_exact_micros():
+    """Power totals and their remainder are saved as exact integers."""
+    buckets = RateBuckets(INTERVALS)
+    slot = buckets.slot(MANUAL)
+    buckets.cost[slot] = 2**53 + 1
+    buckets.remainder[slot] = US_PER_HOUR - 1
+
+    data = buckets.as_dict(buckets.mask(slot))
+    restored = RateBuckets(INTERVALS)
+    restored.restore(data)
+
+    assert data["cost"] == [2**53 + 1]
+    assert int(restored.cost[slot]) == 2**53 + 1
+    assert int(restored.remainder[slot]) == US_PER_HOUR - 1
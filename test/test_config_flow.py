@@ -23,6 +23,12 @@ from custom_components.dynamic_energy_cost.const import (
     MONTHLY,
     YEARLY,
     MANUAL,
+    AGGREGATE_ENTRIES,
+    CRASH_JOURNAL,
+    IMPORT_STATISTICS,
+    POWER_SENSORS,
+    MAX_PUBLISH_STALENESS,
+    MIN_PUBLISH_INTERVAL,
     REAL_TIME,
     SELECTED_SENSORS,
 )
@@ -513,3 +519,134 @@ async def test_options_flow_shows_current_selection_as_defaults(hass):
         else selected_key.default
     )
     assert set(default_value) == {DAILY, MONTHLY}
+
+
+async def test_sensors_step_stores_publish_policy(hass):
+    """The sensors step stores the publish policy with the entry."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_USER},
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        _base_user_input(),
+    )
+
+    with patch(
+        "custom_components.dynamic_energy_cost.async_setup_entry", return_value=True
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                SELECTED_SENSORS: [DAILY],
+                MIN_PUBLISH_INTERVAL: 30,
+                MAX_PUBLISH_STALENESS: 120,
+            },
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"][MIN_PUBLISH_INTERVAL] == 30
+    assert result["data"][MAX_PUBLISH_STALENESS] == 120
+    assert result["data"][IMPORT_STATISTICS] is False
+    assert result["data"][CRASH_JOURNAL] is False
+
+
+async def test_user_flow_creates_multi_consumer_entry(hass):
+    """Several power sensors share one entry; mixing source kinds is rejected."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_USER},
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        _base_user_input(
+            power_sensor=None,
+            power_sensors=["sensor.plug_1_power"],
+            energy_sensor="sensor.plug_2_energy",
+        ),
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_config"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        _base_user_input(
+            power_sensor=None,
+            power_sensors=[
+                "sensor.plug_1_power",
+                "sensor.plug_2_power",
+                "sensor.plug_1_power",
+            ],
+        ),
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "sensors"
+
+    # Statistics are imported per source
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {SELECTED_SENSORS: [DAILY], IMPORT_STATISTICS: True},
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "statistics_single_source"}
+
+    with patch(
+        "custom_components.dynamic_energy_cost.async_setup_entry", return_value=True
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {SELECTED_SENSORS: [DAILY]},
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"][IMPORT_STATISTICS] is False
+    assert result["data"][POWER_SENSORS] == [
+        "sensor.plug_1_power",
+        "sensor.plug_2_power",
+    ]
+    assert result["data"]["power_sensor"] is None
+    assert result["data"][SELECTED_SENSORS] == sorted([DAILY, REAL_TIME])
+
+
+async def test_user_flow_creates_aggregate_entry_without_price_sensor(hass):
+    """An aggregate entry sums existing entries and needs no price sensor."""
+    member = MockConfigEntry(
+        domain=DOMAIN,
+        title="Dynamic Energy Cost - Heat Pump",
+        data=_base_user_input(),
+    )
+    member.add_to_hass(hass)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_USER},
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {"integration_description": "Heat Pump"},
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "missing_price_sensor"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            "integration_description": "House",
+            AGGREGATE_ENTRIES: [member.entry_id],
+        },
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "sensors"
+
+    with patch(
+        "custom_components.dynamic_energy_cost.async_setup_entry", return_value=True
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {SELECTED_SENSORS: [DAILY]},
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"][AGGREGATE_ENTRIES] == [member.entry_id]
+    assert result["data"]["electricity_price_sensor"] is None
+    assert result["data"][SELECTED_SENSORS] == [DAILY]
@@ -0,0 +1,195 @@
+"""Tests for multi-consumer entries."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.dynamic_energy_cost import async_reload_entry
+from custom_components.dynamic_energy_cost.const import (
+    DAILY,
+    DOMAIN,
+    ENERGY_SENSORS,
+    HOURLY,
+    MANUAL,
+    POWER_SENSORS,
+    REAL_TIME,
+    SELECTED_SENSORS,
+)
+from custom_components.dynamic_energy_cost.price_hub import async_get_price_hub
+from custom_components.dynamic_energy_cost.reset_scheduler import (
+    async_get_reset_scheduler,
+)
+
+PRICE_ID = "sensor.electricity_price"
+PLUG_1 = "sensor.plug_1_energy"
+PLUG_2 = "sensor.plug_2_energy"
+HEATER_1 = "sensor.heater_1_power"
+HEATER_2 = "sensor.heater_2_power"
+KWH = {"unit_of_measurement": "kWh"}
+WATT = {"unit_of_measurement": "W"}
+
+
+async def _setup_entry(hass, key, sources, selected) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="entry-123",
+        data={
+            "integration_description": "Plugs",
+            "electricity_price_sensor": PRICE_ID,
+            key: sources,
+        },
+        options={SELECTED_SENSORS: selected},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def _cost_state(hass, source, key):
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"entry-123_{source}_{key}_cost"
+    )
+    return hass.states.get(entity_id)
+
+
+async def test_energy_consumers_share_one_engine(hass, freezer):
+    """Each consumer accrues its own readings; a price change prices all of them."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(PLUG_1, "10", KWH)
+    hass.states.async_set(PLUG_2, "1000", {"unit_of_measurement": "Wh"})
+    entry = await _setup_entry(hass, ENERGY_SENSORS, [PLUG_1, PLUG_2], [DAILY])
+
+    # The first readings only set the baselines
+    hass.states.async_set(PLUG_1, "11", KWH)
+    hass.states.async_set(PLUG_2, "1500", {"unit_of_measurement": "Wh"})
+    hass.states.async_set(PLUG_1, "13", KWH)
+    await hass.async_block_till_done()
+    assert float(_cost_state(hass, PLUG_1, DAILY).state) == pytest.approx(1.0)
+    assert float(_cost_state(hass, PLUG_2, DAILY).state) == 0.0
+
+    # Each consumer is priced in its own unit, at the price of the moment
+    hass.states.async_set(PLUG_2, "2500", {"unit_of_measurement": "Wh"})
+    hass.states.async_set(PRICE_ID, "2.0")
+    await hass.async_block_till_done()
+    hass.states.async_set(PLUG_1, "14", KWH)
+    hass.states.async_set(PLUG_2, "3000", {"unit_of_measurement": "Wh"})
+    await hass.async_block_till_done()
+
+    assert float(_cost_state(hass, PLUG_1, DAILY).state) == pytest.approx(3.0)
+    assert float(_cost_state(hass, PLUG_2, DAILY).state) == pytest.approx(1.5)
+    assert len(entry.runtime_data.engines) == 1
+    feed = async_get_price_hub(hass).feed(PRICE_ID)
+    assert len(feed._listeners) == 1
+
+
+async def test_power_consumers_integrate_their_own_rates(hass, freezer):
+    """Every consumer integrates its own rate and has its own real-time cost."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(HEATER_1, "1000", WATT)
+    hass.states.async_set(HEATER_2, "2000", WATT)
+    entry = await _setup_entry(
+        hass, POWER_SENSORS, [HEATER_1, HEATER_2], [REAL_TIME, MANUAL]
+    )
+    realtime = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"entry-123_{HEATER_2}_real_time_cost"
+    )
+    assert float(hass.states.get(realtime).state) == pytest.approx(1.0)
+
+    freezer.tick(timedelta(hours=1))
+    hass.states.async_set(HEATER_1, "0", WATT)
+    await hass.async_block_till_done()
+
+    assert float(_cost_state(hass, HEATER_1, MANUAL).state) == pytest.approx(0.5)
+    # Heater 2 is integrated up to the same time but published on its own events
+    engine = entry.runtime_data.engines[0]
+    slot = engine.source(HEATER_2).slot(MANUAL)
+    assert int(engine.buckets.cost[slot]) == 1_000_000
+
+    freezer.tick(timedelta(hours=1))
+    hass.states.async_set(PRICE_ID, "1.0")
+    await hass.async_block_till_done()
+
+    assert float(_cost_state(hass, HEATER_1, MANUAL).state) == pytest.approx(0.5)
+    assert float(_cost_state(hass, HEATER_2, MANUAL).state) == pytest.approx(2.0)
+    assert float(hass.states.get(realtime).state) == pytest.approx(2.0)
+
+
+async def test_consumers_share_one_reset_per_interval(hass, freezer):
+    """An interval of every consumer is reset by one scheduled action."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(PLUG_1, "10", KWH)
+    hass.states.async_set(PLUG_2, "20", KWH)
+    await _setup_entry(hass, ENERGY_SENSORS, [PLUG_1, PLUG_2], [HOURLY, DAILY])
+    for source in (PLUG_1, PLUG_2):
+        hass.states.async_set(source, "30", KWH)
+        hass.states.async_set(source, "32", KWH)
+    await hass.async_block_till_done()
+
+    scheduler = async_get_reset_scheduler(hass)
+    assert scheduler.timer_count == 2
+    assert [len(b.actions) for b in scheduler._boundaries.values()] == [1, 1]
+
+    freezer.move_to("2026-02-15 11:00:00+00:00")
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    for source in (PLUG_1, PLUG_2):
+        hourly = _cost_state(hass, source, HOURLY)
+        assert float(hourly.state) == 0.0
+        assert hourly.attributes["last_reset"] == dt_util.utcnow().isoformat()
+        assert float(_cost_state(hass, source, DAILY).state) == pytest.approx(1.0)
+    # The reset keeps the current readings as baselines
+    hass.states.async_set(PLUG_1, "33", KWH)
+    await hass.async_block_till_done()
+    assert float(_cost_state(hass, PLUG_1, HOURLY).state) == pytest.approx(0.5)
+    assert scheduler.timer_count == 2
+
+
+async def test_reload_removes_entities_of_removed_consumers(hass):
+    """Removing a consumer or deselecting an interval removes its entities."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="entry-123",
+        data={
+            "integration_description": "Plugs",
+            "electricity_price_sensor": PRICE_ID,
+            ENERGY_SENSORS: [PLUG_1, PLUG_2],
+            SELECTED_SENSORS: [HOURLY, DAILY],
+        },
+        options={ENERGY_SENSORS: [PLUG_1], SELECTED_SENSORS: [DAILY]},
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    entities = {
+        (source, interval): registry.async_get_or_create(
+            "sensor",
+            DOMAIN,
+            f"entry-123_{source}_{interval}_cost",
+            config_entry=entry,
+        ).entity_id
+        for source in (PLUG_1, PLUG_2)
+        for interval in (HOURLY, DAILY)
+    }
+
+    with patch.object(
+        hass.config_entries, "async_reload", AsyncMock(return_value=True)
+    ) as reload_entry:
+        await async_reload_entry(hass, entry)
+
+    kept = {key for key, entity_id in entities.items() if registry.async_get(entity_id)}
+    assert kept == {(PLUG_1, DAILY)}
+    reload_entry.assert_awaited_once_with(entry.entry_id)
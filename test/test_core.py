@@ -0,0 +1,119 @@
+"""Tests for the Home Assistant independent calculation core."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from custom_components.dynamic_energy_cost.const import DAILY, HOURLY
+from custom_components.dynamic_energy_cost.core import (
+    EnergyAccumulator,
+    EnergyReading,
+    PowerAccumulator,
+    energy_gap_costs,
+    power_gap_costs,
+)
+
+START = datetime(2026, 2, 15, 10, 0, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations():
+    """Run without the Home Assistant instance the shared fixture sets up."""
+    yield
+
+
+def _reading(current_energy: float, price: float, **kwargs) -> EnergyReading:
+    return EnergyReading(
+        current_energy=current_energy,
+        price=price,
+        energy_to_kwh=kwargs.pop("energy_to_kwh", 1.0),
+        total_increasing=kwargs.pop("total_increasing", False),
+        **kwargs,
+    )
+
+
+def test_energy_accumulator_applies_readings_and_closes_slots():
+    """Closing a slot returns its cost and keeps the reading as its baseline."""
+    accumulator = EnergyAccumulator([HOURLY, DAILY])
+    accumulator.buckets.active[:] = True
+
+    accumulator.apply(_reading(10.0, 0.5))
+    accumulator.apply(_reading(14.0, 0.5))
+    assert accumulator.close(0, START) == pytest.approx(2.0)
+
+    accumulator.apply(_reading(16.0, 1.0))
+    np.testing.assert_allclose(accumulator.buckets.cost, [2.0, 4.0])
+    np.testing.assert_allclose(accumulator.buckets.energy, [2.0, 6.0])
+
+
+def test_energy_accumulator_adds_gap_after_missed_boundary():
+    """A slot whose reset fell in a gap only takes what accrued after it."""
+    accumulator = EnergyAccumulator([HOURLY, DAILY])
+    accumulator.buckets.cost[:] = 3.0
+    gap = energy_gap_costs(
+        np.array([0.0, 1800.0, 5400.0]) + START.timestamp(),
+        np.array([10.0, 11.0, 13.0]),
+        np.array([START.timestamp()]),
+        np.array([1.0]),
+        energy_to_kwh=1.0,
+        total_increasing=False,
+        fallback_price=None,
+    )
+
+    accumulator.add_gap(0, gap, START, START + timedelta(hours=1))
+    accumulator.add_gap(1, gap, START)
+
+    np.testing.assert_allclose(accumulator.buckets.cost, [2.0, 6.0])
+
+
+def test_power_accumulator_settles_forward_only():
+    """Integration never rewinds and is clamped to the current time."""
+    accumulator = PowerAccumulator([HOURLY])
+    accumulator.buckets.active[:] = True
+    accumulator.last_update = START
+    accumulator.set_rate(0.25, 2.0)
+
+    assert accumulator.settle(START + timedelta(hours=3), START + timedelta(hours=1))[0]
+    assert not accumulator.settle(START + timedelta(minutes=30), START)[0]
+    assert accumulator.buckets.cost[0] == 500_000
+    assert accumulator.close(0, START + timedelta(hours=2)) == pytest.approx(1.0)
+    assert accumulator.buckets.cost[0] == 0
+    assert accumulator.last_update == START + timedelta(hours=2)
+
+
+def test_energy_gap_prices_each_delta_at_its_own_price():
+    """Deltas use the price in effect when read; source resets only rebase."""
+    gap = energy_gap_costs(
+        np.array([0.0, 1800.0, 3600.0, 5400.0, 7200.0]),
+        np.array([10.0, 11.0, 13.0, 0.5, 1.5]),
+        np.array([-100.0, 3000.0]),
+        np.array([1.0, 2.0]),
+        energy_to_kwh=1.0,
+        total_increasing=True,
+        fallback_price=5.0,
+    )
+
+    # 1 kWh @ 1, 2 kWh @ 2, reset, 1 kWh @ 2
+    assert gap.total_after(0.0) == (pytest.approx(7.0), pytest.approx(4.0))
+    assert gap.total_after(3600.0) == (pytest.approx(2.0), pytest.approx(1.0))
+
+
+def test_power_gap_integrates_segments_and_splits_at_boundaries():
+    """Power is held between samples and segments split at missed boundaries."""
+    gap = power_gap_costs(
+        np.array([-10.0, 1800.0]),
+        np.array([2.0, 4.0]),
+        np.array([-10.0]),
+        np.array([0.5]),
+        start=0.0,
+        end=5400.0,
+        splits=[3600.0],
+        fallback_price=None,
+    )
+
+    # 0.5 h @ 2 kW, then 1 h @ 4 kW, at 0.5/kWh
+    assert gap.total_after(0.0) == (pytest.approx(2.5), pytest.approx(5.0))
+    assert gap.total_after(3600.0) == (pytest.approx(1.0), pytest.approx(2.0))
@@ -0,0 +1,98 @@
+"""Tests for the diagnostics platform and runtime counters."""
+
+from __future__ import annotations
+
+from time import perf_counter_ns
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_energy_cost.const import DOMAIN
+from custom_components.dynamic_energy_cost.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.dynamic_energy_cost.runtime import (
+    LAG_BUCKETS,
+    TIMING_WINDOW,
+    RuntimeCounters,
+)
+
+
+def test_counters_report_percentiles_of_recent_calls():
+    """Percentiles cover the timing window; totals cover every call."""
+    counters = RuntimeCounters()
+    for elapsed_ms in range(1, TIMING_WINDOW + 101):
+        counters.record(perf_counter_ns() - elapsed_ms * 1_000_000)
+    counters.count("energy_events")
+    counters.skip("unavailable")
+
+    data = counters.as_dict()
+
+    assert data["energy_events"] == 1
+    assert data["skipped"] == {"unavailable": 1}
+    assert data["handler"]["calls"] == TIMING_WINDOW + 100
+    assert data["handler"]["total_ms"] >= sum(range(1, TIMING_WINDOW + 101))
+    # The oldest 100 calls (1..100 ms) have left the window
+    assert (
+        100 + TIMING_WINDOW // 2 <= data["handler"]["p50_ms"] < 101 + TIMING_WINDOW // 2
+    )
+    assert data["handler"]["p99_ms"] >= 100 + TIMING_WINDOW * 0.99
+
+
+def test_lag_histogram_rolls_over_the_timing_window():
+    """Lags leaving the window are removed from their bucket; max is kept."""
+    counters = RuntimeCounters()
+    counters.record_lag(30.0)
+    for _ in range(TIMING_WINDOW):
+        counters.record_lag(0.002)
+    counters.record_lag(-0.5)  # a state stamped ahead of the local clock
+
+    lag = counters.as_dict()["lag"]
+
+    assert lag["events"] == TIMING_WINDOW + 2
+    assert lag["last_s"] == 0.0
+    assert lag["max_s"] == 30.0
+    assert len(lag["histogram"]) == len(LAG_BUCKETS) + 1
+    assert lag["histogram"]["<=0.001s"] == 1
+    assert lag["histogram"]["<=0.005s"] == TIMING_WINDOW - 1
+    assert lag["histogram"][">5s"] == 0
+    assert sum(lag["histogram"].values()) == TIMING_WINDOW
+
+
+async def test_diagnostics_report_entry_and_sensor_counters(hass):
+    """Engine events, skips, handler timing and sensor writes are reported."""
+    hass.states.async_set("sensor.electricity_price", "0.5")
+    hass.states.async_set("sensor.meter_energy", "10", {"unit_of_measurement": "kWh"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "integration_description": "Meter",
+            "electricity_price_sensor": "sensor.electricity_price",
+            "energy_sensor": "sensor.meter_energy",
+            "power_sensor": None,
+        },
+        options={"selected_sensors": ["hourly"]},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("sensor.meter_energy", "11", {"unit_of_measurement": "kWh"})
+    hass.states.async_set("sensor.meter_energy", "12", {"unit_of_measurement": "kWh"})
+    hass.states.async_set("sensor.meter_energy", "unavailable")
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    (engine,) = diagnostics["engines"]
+    assert engine["engine"] == "EnergyCostEngine"
+    assert engine["energy_events"] == 3
+    assert engine["skipped"] == {"unavailable": 1}
+    assert engine["handler"]["calls"] == 3
+    assert engine["handler"]["p99_ms"] >= engine["handler"]["p50_ms"] > 0
+    assert engine["lag"]["events"] == 3
+    assert sum(engine["lag"]["histogram"].values()) == 3
+    sensor = diagnostics["sensors"]["sensor.meter_hourly_energy_cost"]
+    assert sensor["updates"] == 1
+    # The initial state and one accrued reading
+    assert sensor["writes"] == 2
+    assert diagnostics["config"]["energy_sensor"] == "sensor.meter_energy"
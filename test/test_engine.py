@@ -0,0 +1,289 @@
+"""Tests for the shared per-entry accumulation engine."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from homeassistant.core import StateMachine
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_energy_cost.const import DAILY, DOMAIN, HOURLY, MANUAL
+from custom_components.dynamic_energy_cost.engine import (
+    EnergyCostEngine,
+    PowerCostEngine,
+    async_track_state_change_event,
+)
+from custom_components.dynamic_energy_cost.sensor import (
+    EnergyCostSensor,
+    PowerCostSensor,
+    RealTimeCostSensor,
+)
+
+
+def _entry() -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="entry-123",
+        data={
+            "integration_description": "Heat Pump",
+            "electricity_price_sensor": "sensor.electricity_price",
+            "energy_sensor": "sensor.heat_pump_energy",
+        },
+    )
+
+
+async def _add_sensors(hass, engine, intervals):
+    sensors = []
+    for interval in intervals:
+        sensor = EnergyCostSensor(
+            hass,
+            _entry(),
+            "sensor.heat_pump_energy",
+            "sensor.electricity_price",
+            interval,
+            engine,
+        )
+        sensor.async_get_last_state = AsyncMock(return_value=None)
+        sensor.async_write_ha_state = Mock()
+        sensor.schedule_next_reset = Mock()
+        await sensor.async_added_to_hass()
+        sensors.append(sensor)
+    return sensors
+
+
+async def test_engine_subscribes_once_for_all_intervals(hass):
+    """All interval sensors of an entry share one energy and one price subscription."""
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+
+    with (
+        patch(
+            "custom_components.dynamic_energy_cost.engine.async_track_state_change_event",
+            side_effect=async_track_state_change_event,
+        ) as track_energy,
+        patch(
+            "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+            side_effect=async_track_state_change_event,
+        ) as track_price,
+    ):
+        await _add_sensors(hass, engine, [HOURLY, DAILY, MANUAL])
+
+    assert track_energy.call_count == 1
+    assert track_price.call_count == 1
+
+
+async def test_engine_fans_energy_delta_out_to_all_intervals(hass):
+    """One energy event updates every registered interval sensor."""
+    hass.states.async_set("sensor.electricity_price", "2")
+    hass.states.async_set(
+        "sensor.heat_pump_energy", "10", {"unit_of_measurement": "kWh"}
+    )
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    sensors = await _add_sensors(hass, engine, [HOURLY, DAILY, MANUAL])
+
+    hass.states.async_set(
+        "sensor.heat_pump_energy", "11", {"unit_of_measurement": "kWh"}
+    )
+    await hass.async_block_till_done()
+    hass.states.async_set(
+        "sensor.heat_pump_energy", "13", {"unit_of_measurement": "kWh"}
+    )
+    await hass.async_block_till_done()
+
+    for sensor in sensors:
+        assert sensor._cumulative_cost == pytest.approx(4.0)
+        assert sensor._cumulative_energy == pytest.approx(2.0)
+        assert sensor._last_energy_reading == 13.0
+
+
+async def test_engine_drops_events_that_leave_the_reading_unchanged(hass):
+    """Attribute churn and forced rewrites are dropped and counted by reason."""
+    hass.states.async_set("sensor.electricity_price", "2")
+    attributes = {"unit_of_measurement": "kWh", "state_class": "total"}
+    hass.states.async_set("sensor.heat_pump_energy", "10", attributes)
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    (sensor,) = await _add_sensors(hass, engine, [MANUAL])
+    sensor._last_energy_reading = 10.0
+    sensor.async_write_ha_state.reset_mock()
+
+    hass.states.async_set(
+        "sensor.heat_pump_energy", "10", {**attributes, "friendly_name": "Heat pump"}
+    )
+    hass.states.async_set(
+        "sensor.heat_pump_energy",
+        "10",
+        {**attributes, "friendly_name": "Heat pump"},
+        force_update=True,
+    )
+    await hass.async_block_till_done()
+
+    assert engine.counters.skipped == {"attributes_only": 1, "unchanged": 1}
+    sensor.async_write_ha_state.assert_not_called()
+
+    # A source reset announced only through last_reset is still processed
+    hass.states.async_set(
+        "sensor.heat_pump_energy",
+        "10",
+        {**attributes, "last_reset": "2026-02-15T00:00:00+00:00"},
+    )
+    await hass.async_block_till_done()
+
+    assert engine.counters.counts["energy_events"] == 3
+    assert engine.counters.skipped == {"attributes_only": 1, "unchanged": 1}
+    assert sensor._cumulative_cost == 0.0
+
+
+async def test_engine_price_event_uses_old_price_for_all_intervals(hass):
+    """A price change finalizes the accrued delta at the old price everywhere."""
+    hass.states.async_set("sensor.electricity_price", "2")
+    hass.states.async_set("sensor.heat_pump_energy", "12")
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    sensors = await _add_sensors(hass, engine, [HOURLY, DAILY])
+    for sensor in sensors:
+        sensor._last_energy_reading = 10.0
+
+    hass.states.async_set("sensor.electricity_price", "3")
+    await hass.async_block_till_done()
+
+    for sensor in sensors:
+        assert sensor._cumulative_cost == pytest.approx(4.0)
+        assert sensor._last_energy_reading == 12.0
+
+
+async def test_engine_unsubscribes_when_last_sensor_is_removed(hass):
+    """Source subscriptions are released once no interval sensor is left."""
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    first = Mock(bucket_slot=0)
+    second = Mock(bucket_slot=1)
+    energy_unsubscribe = Mock()
+    price_unsubscribe = Mock()
+
+    with (
+        patch(
+            "custom_components.dynamic_energy_cost.engine.async_track_state_change_event",
+            return_value=energy_unsubscribe,
+        ),
+        patch(
+            "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+            return_value=price_unsubscribe,
+        ),
+    ):
+        unregister_first = engine.async_register(first)
+        unregister_second = engine.async_register(second)
+
+    assert engine.buckets.active[[0, 1]].all()
+
+    unregister_first()
+    energy_unsubscribe.assert_not_called()
+    assert not engine.buckets.active[0]
+
+    unregister_second()
+    energy_unsubscribe.assert_called_once_with()
+    price_unsubscribe.assert_called_once_with()
+
+
+async def _add_power_sensors(hass, engine, intervals):
+    sensors = []
+    for interval in intervals:
+        sensor = PowerCostSensor(
+            hass,
+            _entry(),
+            "sensor.heat_pump_power",
+            "sensor.electricity_price",
+            interval,
+            engine,
+        )
+        sensor.async_get_last_state = AsyncMock(return_value=None)
+        sensor.async_write_ha_state = Mock()
+        sensor.schedule_next_reset = Mock()
+        await sensor.async_added_to_hass()
+        sensors.append(sensor)
+    return sensors
+
+
+async def test_power_engine_feeds_intervals_without_realtime_entity(hass):
+    """Interval sensors integrate the rate in-process, no Real Time entity needed."""
+    hass.states.async_set("sensor.electricity_price", "0.5")
+    hass.states.async_set("sensor.heat_pump_power", "2000")
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    sensors = await _add_power_sensors(hass, engine, [HOURLY, DAILY, MANUAL])
+    assert engine.rate_micros == 1_000_000
+
+    engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=1)
+    hass.states.async_set("sensor.heat_pump_power", "4000")
+    await hass.async_block_till_done()
+
+    assert engine.rate_micros == 2_000_000
+    for sensor in sensors:
+        assert sensor.state == 1.0
+        sensor.async_write_ha_state.assert_called_once()
+
+
+async def test_power_engine_shares_subscriptions_with_realtime_output(hass):
+    """The Real Time entity and interval sensors share one power subscription."""
+    hass.states.async_set("sensor.electricity_price", "0.5")
+    hass.states.async_set("sensor.heat_pump_power", "2000")
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    realtime = RealTimeCostSensor(
+        hass,
+        _entry(),
+        "sensor.electricity_price",
+        "sensor.heat_pump_power",
+        engine,
+    )
+    realtime.async_write_ha_state = Mock()
+
+    with patch(
+        "custom_components.dynamic_energy_cost.engine.async_track_state_change_event",
+        side_effect=async_track_state_change_event,
+    ) as track_power:
+        await realtime.async_added_to_hass()
+        await _add_power_sensors(hass, engine, [HOURLY, DAILY])
+
+    assert track_power.call_count == 1
+    assert realtime.state == 1.0
+
+    hass.states.async_set("sensor.heat_pump_power", "3000")
+    await hass.async_block_till_done()
+
+    assert realtime.state == 1.5
+
+
+async def test_power_engine_reads_no_states_per_event(hass):
+    """Power and price events re-rate from the payload and the cached reading."""
+    hass.states.async_set("sensor.electricity_price", "0.5")
+    hass.states.async_set("sensor.heat_pump_power", "2", {"unit_of_measurement": "kW"})
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    await _add_power_sensors(hass, engine, [HOURLY])
+
+    with patch.object(
+        StateMachine, "get", autospec=True, side_effect=StateMachine.get
+    ) as get:
+        hass.states.async_set(
+            "sensor.heat_pump_power", "unavailable", {"unit_of_measurement": "kW"}
+        )
+        hass.states.async_set("sensor.electricity_price", "1")
+        await hass.async_block_till_done()
+        assert engine.rate_micros == 2_000_000
+
+        hass.states.async_set(
+            "sensor.heat_pump_power", "3", {"unit_of_measurement": "kW"}
+        )
+        await hass.async_block_till_done()
+
+    get.assert_not_called()
+    assert engine.power_kw == 3.0
+    assert engine.rate_micros == 3_000_000
@@ -20,6 +20,9 @@ class _TestUtilitySensor(BaseUtilitySensor):
     def name(self):
         return "Test Utility Sensor"
 
+    def async_reset(self, *args):
+        """Reset nothing."""
+
 
 async def test_base_utility_sensor_cleanup_calls_unsubscriber_once(hass):
     """Removing an entity calls the stored unsubscribe callback safely."""
@@ -34,27 +37,37 @@ async def test_base_utility_sensor_cleanup_calls_unsubscriber_once(hass):
 
 
 async def test_realtime_sensor_registers_state_listener_for_cleanup(hass):
-    """Realtime sensor state subscriptions are registered for entity cleanup."""
+    """Realtime sensor engine registration is released on entity cleanup."""
     sensor = RealTimeCostSensor(
         hass,
         Mock(entry_id="entry-1"),
         "sensor.electricity_price",
         "sensor.heat_pump_power",
     )
-    unsubscribe = Mock()
+    power_unsubscribe = Mock()
+    price_unsubscribe = Mock()
     sensor.async_on_remove = Mock()
 
-    with patch(
-        "custom_components.dynamic_energy_cost.sensor.async_track_state_change_event",
-        return_value=unsubscribe,
+    with (
+        patch(
+            "custom_components.dynamic_energy_cost.engine.async_track_state_change_event",
+            return_value=power_unsubscribe,
+        ),
+        patch(
+            "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+            return_value=price_unsubscribe,
+        ),
     ):
         await sensor.async_added_to_hass()
 
-    sensor.async_on_remove.assert_called_once_with(unsubscribe)
+    sensor.async_on_remove.assert_called_once()
+    sensor.async_on_remove.call_args.args[0]()
+    power_unsubscribe.assert_called_once_with()
+    price_unsubscribe.assert_called_once_with()
 
 
 async def test_energy_sensor_registers_state_listeners_for_cleanup(hass):
-    """Energy sensor subscriptions are registered for entity cleanup."""
+    """Energy sensor engine registration is released on entity cleanup."""
     sensor = EnergyCostSensor(
         hass,
         Mock(entry_id="entry-1"),
@@ -62,40 +75,61 @@ async def test_energy_sensor_registers_state_listeners_for_cleanup(hass):
         "sensor.electricity_price",
         HOURLY,
     )
-    first_unsubscribe = Mock()
-    second_unsubscribe = Mock()
+    energy_unsubscribe = Mock()
+    price_unsubscribe = Mock()
     sensor.async_on_remove = Mock()
     sensor.async_get_last_state = AsyncMock(return_value=None)
     sensor.async_write_ha_state = Mock()
     sensor.schedule_next_reset = Mock()
 
-    with patch(
-        "custom_components.dynamic_energy_cost.sensor.async_track_state_change_event",
-        side_effect=[first_unsubscribe, second_unsubscribe],
+    with (
+        patch(
+            "custom_components.dynamic_energy_cost.engine.async_track_state_change_event",
+            return_value=energy_unsubscribe,
+        ),
+        patch(
+            "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+            return_value=price_unsubscribe,
+        ),
     ):
         await sensor.async_added_to_hass()
 
-    assert sensor.async_on_remove.call_args_list[0].args == (first_unsubscribe,)
-    assert sensor.async_on_remove.call_args_list[1].args == (second_unsubscribe,)
+    sensor.async_on_remove.assert_called_once()
+    unregister = sensor.async_on_remove.call_args.args[0]
+    unregister()
 
+    energy_unsubscribe.assert_called_once_with()
+    price_unsubscribe.assert_called_once_with()
 
-async def test_power_sensor_registers_state_listener_for_cleanup(hass):
-    """Power sensor subscriptions are registered for entity cleanup."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {("dynamic_energy_cost", "entry-1")}}
-    realtime_sensor.unique_id = "entry-1_real_time_cost"
 
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
-    unsubscribe = Mock()
+async def test_power_sensor_registers_state_listener_for_cleanup(hass):
+    """Power sensor engine registration is released on entity cleanup."""
+    sensor = PowerCostSensor(
+        hass,
+        Mock(entry_id="entry-1"),
+        "sensor.heat_pump_power",
+        "sensor.electricity_price",
+        HOURLY,
+    )
+    power_unsubscribe = Mock()
+    price_unsubscribe = Mock()
     sensor.async_on_remove = Mock()
     sensor.async_get_last_state = AsyncMock(return_value=None)
     sensor.schedule_next_reset = Mock()
 
-    with patch(
-        "custom_components.dynamic_energy_cost.sensor.async_track_state_change_event",
-        return_value=unsubscribe,
+    with (
+        patch(
+            "custom_components.dynamic_energy_cost.engine.async_track_state_change_event",
+            return_value=power_unsubscribe,
+        ),
+        patch(
+            "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+            return_value=price_unsubscribe,
+        ),
     ):
         await sensor.async_added_to_hass()
 
-    sensor.async_on_remove.assert_called_once_with(unsubscribe)
+    sensor.async_on_remove.assert_called_once()
+    sensor.async_on_remove.call_args.args[0]()
+    power_unsubscribe.assert_called_once_with()
+    price_unsubscribe.assert_called_once_with()
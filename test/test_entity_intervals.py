@@ -17,6 +17,9 @@ class _TestUtilitySensor(BaseUtilitySensor):
     def name(self):
         return "Test Utility Sensor"
 
+    def async_reset(self, *args):
+        """Reset nothing."""
+
 
 def test_quarterly_interval_display_name_is_15_minute() -> None:
     """User-facing labels should describe the actual interval behavior."""
@@ -80,7 +80,13 @@ async def test_sensors_use_entry_based_unique_ids(hass):
         "sensor.electricity_price",
         HOURLY,
     )
-    power_sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
+    power_sensor = PowerCostSensor(
+        hass,
+        entry,
+        "sensor.heat_pump_power",
+        "sensor.electricity_price",
+        HOURLY,
+    )
 
     assert realtime_sensor.unique_id == "entry-123_real_time_cost"
     assert energy_sensor.unique_id == "entry-123_hourly_cost"
@@ -0,0 +1,43 @@
+"""Tests for fixed-point micro-currency helpers."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from custom_components.dynamic_energy_cost.money import (
+    US_PER_HOUR,
+    elapsed_us,
+    from_micros,
+    integrate_micros,
+    quantize_micros,
+    to_micros,
+)
+
+
+def test_micros_round_trip():
+    """Currency amounts convert to micro-currency and back exactly."""
+    assert to_micros(0.0165) == 16_500
+    assert from_micros(16_500) == 0.0165
+    assert to_micros(-1.25) == -1_250_000
+
+
+def test_quantize_micros_rounds_half_to_even():
+    """Quantization matches Decimal's default ROUND_HALF_EVEN."""
+    assert quantize_micros(16_543, 100) == 16_500
+    assert quantize_micros(16_550, 100) == 16_600
+    assert quantize_micros(16_650, 100) == 16_600
+    assert quantize_micros(16_651, 100) == 16_700
+
+
+def test_integrate_micros_carries_sub_micro_remainder():
+    """Many short steps accrue exactly what one long step would."""
+    rate = 1_000_003  # micro-currency/h
+    step = elapsed_us(timedelta(seconds=1))
+    total, remainder = 0, 0
+    for _ in range(3600):
+        accrued, remainder = integrate_micros(rate, step, remainder)
+        total += accrued
+
+    assert total == rate
+    assert remainder == 0
+    assert integrate_micros(rate, US_PER_HOUR, 0) == (rate, 0)
@@ -0,0 +1,116 @@
+"""Tests for the shared price hub."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+
+from custom_components.dynamic_energy_cost.price_hub import (
+    async_get_price_hub,
+    async_track_state_change_event,
+    normalize_price,
+)
+
+
+def test_normalize_price_converts_to_currency_per_kwh():
+    """Prices are normalized to currency/kWh once at the hub."""
+    state = Mock(state="50", attributes={"unit_of_measurement": "EUR/MWh"})
+
+    assert normalize_price(state) == pytest.approx(0.05)
+    assert normalize_price(Mock(state="unavailable", attributes={})) is None
+    assert normalize_price(None) is None
+
+
+async def test_hub_subscribes_once_per_price_sensor(hass):
+    """Many listeners on one price sensor share a single state subscription."""
+    hub = async_get_price_hub(hass)
+
+    with patch(
+        "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+        side_effect=async_track_state_change_event,
+    ) as track:
+        unsubscribes = [
+            hub.async_subscribe("sensor.electricity_price", Mock()) for _ in range(5)
+        ]
+
+    assert track.call_count == 1
+    assert async_get_price_hub(hass) is hub
+
+    for unsubscribe in unsubscribes:
+        unsubscribe()
+
+
+async def test_hub_pushes_normalized_and_previous_price(hass):
+    """Listeners receive the normalized new price and the price it replaced."""
+    hass.states.async_set(
+        "sensor.electricity_price", "100", {"unit_of_measurement": "EUR/MWh"}
+    )
+    hub = async_get_price_hub(hass)
+    received = []
+    first = Mock(side_effect=lambda feed: received.append(feed.previous_price))
+    second = Mock()
+    hub.async_subscribe("sensor.electricity_price", first)
+    hub.async_subscribe("sensor.electricity_price", second)
+
+    hass.states.async_set(
+        "sensor.electricity_price", "200", {"unit_of_measurement": "EUR/MWh"}
+    )
+    await hass.async_block_till_done()
+
+    feed = second.call_args.args[0]
+    assert feed.price == pytest.approx(0.2)
+    assert feed.previous_price == pytest.approx(0.1)
+    assert received == [pytest.approx(0.1)]
+    assert hub.price("sensor.electricity_price") == pytest.approx(0.2)
+
+
+async def test_hub_releases_feed_after_last_unsubscribe(hass):
+    """The price subscription is dropped when the last listener leaves."""
+    hub = async_get_price_hub(hass)
+    unsubscribe_price = Mock()
+
+    with patch(
+        "custom_components.dynamic_energy_cost.price_hub.async_track_state_change_event",
+        return_value=unsubscribe_price,
+    ):
+        first = hub.async_subscribe("sensor.electricity_price", Mock())
+        second = hub.async_subscribe("sensor.electricity_price", Mock())
+
+    first()
+    unsubscribe_price.assert_not_called()
+    second()
+    unsubscribe_price.assert_called_once_with()
+
+    hass.states.async_set("sensor.electricity_price", "0.3")
+    assert hub.price("sensor.electricity_price") == pytest.approx(0.3)
+
+
+async def test_feed_only_reindexes_forecast_on_attribute_updates(hass, freezer):
+    """A forecast rewrite at the same price reaches no listener but the schedule."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set("sensor.electricity_price", "0.2", {"prices": []})
+    hub = async_get_price_hub(hass)
+    listener = Mock()
+    hub.async_subscribe("sensor.electricity_price", listener)
+    feed = hub.feed("sensor.electricity_price")
+    start = datetime(2026, 2, 15, 10, 0, tzinfo=UTC)
+    forecast = [
+        {"time": (start + timedelta(hours=hour)).isoformat(), "price": price}
+        for hour, price in enumerate((0.2, 0.5))
+    ]
+
+    hass.states.async_set("sensor.electricity_price", "0.2", {"prices": forecast})
+    await hass.async_block_till_done()
+
+    listener.assert_not_called()
+    assert feed.price == pytest.approx(0.2)
+    assert feed.price_at(start + timedelta(hours=1, minutes=5)) == pytest.approx(0.5)
+    assert feed.counters.skipped == {"attributes_only": 1}
+
+    hass.states.async_set("sensor.electricity_price", "0.3")
+    await hass.async_block_till_done()
+
+    listener.assert_called_once_with(feed)
+    assert feed.counters.counts["price_events"] == 2
@@ -0,0 +1,127 @@
+"""Tests for price schedules built from forecast attributes."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.dynamic_energy_cost.engine import EnergyCostEngine
+from custom_components.dynamic_energy_cost.price_hub import async_get_price_hub
+from custom_components.dynamic_energy_cost.price_schedule import PriceSchedule
+
+HOUR = datetime(2026, 2, 15, 10, tzinfo=UTC)
+
+
+def _forecast_state(state: str, attributes: dict, last_updated: datetime = HOUR):
+    return Mock(
+        entity_id="sensor.electricity_price",
+        state=state,
+        attributes=attributes,
+        last_updated=last_updated,
+    )
+
+
+def test_schedule_looks_up_slot_by_time():
+    """Nord Pool style raw_today entries are indexed by their start time."""
+    state = _forecast_state(
+        "0.1",
+        {
+            "raw_today": [
+                {
+                    "start": HOUR + timedelta(hours=1),
+                    "end": HOUR + timedelta(hours=2),
+                    "value": 0.2,
+                },
+                {
+                    "start": HOUR.isoformat(),
+                    "end": (HOUR + timedelta(hours=1)).isoformat(),
+                    "value": 0.1,
+                },
+            ]
+        },
+    )
+
+    schedule = PriceSchedule.from_state(state)
+
+    assert len(schedule) == 2
+    assert schedule.price_at(HOUR + timedelta(minutes=59)) == 0.1
+    assert schedule.price_at(HOUR + timedelta(hours=1)) == 0.2
+    assert schedule.price_at(HOUR - timedelta(seconds=1)) is None
+    assert schedule.price_at(HOUR + timedelta(hours=2)) is None
+
+
+def test_schedule_without_end_lasts_until_next_start_and_scales_unit():
+    """ENTSO-E style entries without an end are contiguous and unit scaled."""
+    state = _forecast_state(
+        "100",
+        {
+            "prices": [
+                {"time": HOUR + timedelta(minutes=15 * index), "price": 100 + index}
+                for index in range(4)
+            ]
+        },
+    )
+
+    schedule = PriceSchedule.from_state(state, 0.001)
+
+    assert schedule.price_at(HOUR + timedelta(minutes=50)) == pytest.approx(0.103)
+    assert schedule.price_at(HOUR + timedelta(hours=1)) is None
+
+
+def test_schedule_is_ignored_when_it_disagrees_with_state():
+    """Forecasts that do not match the current state are not trusted."""
+    state = _forecast_state(
+        "0.25",
+        {
+            "raw_today": [
+                {"start": HOUR, "end": HOUR + timedelta(hours=1), "value": 0.1}
+            ]
+        },
+    )
+
+    assert PriceSchedule.from_state(state) is None
+    assert PriceSchedule.from_state(_forecast_state("0.1", {})) is None
+
+
+async def test_energy_delta_priced_at_measurement_time(hass):
+    """A late price event does not price the new slot's energy at the old price."""
+    now = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    hass.states.async_set(
+        "sensor.electricity_price",
+        "1",
+        {
+            "raw_today": [
+                {"start": now - timedelta(hours=1), "end": now, "value": 1.0},
+                {"start": now, "end": now + timedelta(hours=1), "value": 2.0},
+            ]
+        },
+    )
+    # The price sensor still reports the previous slot's price
+    state = hass.states.get("sensor.electricity_price")
+    hub = async_get_price_hub(hass)
+    hub.async_subscribe("sensor.electricity_price", Mock())
+    feed = hub._feeds["sensor.electricity_price"]
+    feed.schedule = PriceSchedule.from_state(
+        _forecast_state("1", state.attributes, now - timedelta(minutes=1))
+    )
+
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    event = Mock(
+        data={
+            "old_state": None,
+            "new_state": Mock(
+                state="3",
+                attributes={"unit_of_measurement": "kWh"},
+                last_updated=now + timedelta(seconds=2),
+            ),
+        }
+    )
+
+    assert engine.energy_reading(event).price == 2.0
+    assert hub.price("sensor.electricity_price") == 1.0
@@ -0,0 +1,89 @@
+"""Tests for coalesced state publishing."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import Mock
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.dynamic_energy_cost.const import (
+    MAX_PUBLISH_STALENESS,
+    MIN_PUBLISH_INTERVAL,
+)
+from custom_components.dynamic_energy_cost.publish import (
+    PublishPolicy,
+    StatePublisher,
+)
+
+
+def test_policy_from_config_keeps_staleness_above_min_interval():
+    """Maximum staleness is never shorter than the minimum interval."""
+    policy = PublishPolicy.from_config(
+        {MIN_PUBLISH_INTERVAL: 60, MAX_PUBLISH_STALENESS: 10}
+    )
+
+    assert policy == PublishPolicy(60.0, 60.0)
+    assert PublishPolicy.from_config({}).min_interval == 0
+
+
+async def test_default_policy_writes_every_change(hass):
+    """Without a minimum interval every change is written immediately."""
+    write = Mock()
+    publisher = StatePublisher(hass, write)
+
+    for _ in range(3):
+        publisher.async_request()
+
+    assert write.call_count == 3
+    assert not publisher.pending
+
+
+async def test_changes_within_min_interval_are_held_until_stale(hass):
+    """Bursts are coalesced into one write at the maximum staleness."""
+    write = Mock()
+    publisher = StatePublisher(hass, write, PublishPolicy(10, 60))
+
+    publisher.async_request()
+    publisher.async_request()
+    publisher.async_request()
+
+    assert write.call_count == 1
+    assert publisher.pending
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+
+    assert write.call_count == 2
+    assert not publisher.pending
+
+
+async def test_change_after_min_interval_is_written_and_clears_hold(hass):
+    """A change past the minimum interval is written at once."""
+    write = Mock()
+    publisher = StatePublisher(hass, write, PublishPolicy(10, 60))
+
+    publisher.async_request()
+    publisher.async_request()
+    publisher._last_publish -= 11
+    publisher.async_request()
+
+    assert write.call_count == 2
+    assert not publisher.pending
+
+
+async def test_publish_now_and_flush_bypass_the_policy(hass):
+    """Forced writes (reset, calibrate, stop) ignore the minimum interval."""
+    write = Mock()
+    publisher = StatePublisher(hass, write, PublishPolicy(10, 60))
+
+    publisher.async_request()
+    publisher.async_publish_now()
+    assert write.call_count == 2
+
+    publisher.async_request()
+    publisher.async_flush()
+    publisher.async_flush()
+    assert write.call_count == 3
+    assert not publisher.pending
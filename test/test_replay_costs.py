@@ -0,0 +1,119 @@
+"""Tests for the offline cost replay."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import json
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from scripts.replay_costs import (
+    main,
+    replay_energy_batch,
+    replay_energy_stream,
+    replay_power_batch,
+    replay_power_stream,
+)
+
+TALLINN = ZoneInfo("Europe/Tallinn")
+# Spans the spring-forward transition of 2026-03-29
+START = datetime(2026, 3, 28, 20, 0, tzinfo=UTC)
+
+
+def _series(times: list[datetime], values: list[float]):
+    return (
+        np.array([time.timestamp() for time in times]),
+        np.array(values, dtype=float),
+    )
+
+
+def _hourly_prices(hours: int):
+    rng = np.random.default_rng(7)
+    times = [START + timedelta(hours=hour) for hour in range(hours)]
+    return _series(times, list(rng.uniform(0.05, 0.4, hours)))
+
+
+def test_energy_stream_and_batch_agree_across_dst() -> None:
+    """Both modes price each delta at its reading time and split at local midnight."""
+    rng = np.random.default_rng(3)
+    times = [START + timedelta(minutes=7 * step, seconds=13) for step in range(500)]
+    readings = np.cumsum(rng.uniform(0, 0.05, len(times)))
+    readings[200] = 0  # source reset only rebases
+    prices = _hourly_prices(60)
+    kwargs = {"intervals": ["daily", "manual"], "tz": TALLINN}
+
+    stream = replay_energy_stream(prices, _series(times, list(readings)), **kwargs)
+    batch = replay_energy_batch(prices, _series(times, list(readings)), **kwargs)
+
+    assert [(row.interval, row.start) for row in stream] == [
+        (row.interval, row.start) for row in batch
+    ]
+    assert [row.start.astimezone(TALLINN).hour for row in stream[:-1]] == [0, 0, 0, 0]
+    assert [row.cost for row in stream] == pytest.approx([row.cost for row in batch])
+    assert stream[-1].cost == pytest.approx(sum(row.cost for row in stream[:-1]))
+
+
+def test_power_stream_and_batch_integrate_the_same_rate() -> None:
+    """A constant 1 kW draw at 0.20/kWh costs 0.05 per quarter hour in both modes."""
+    prices = _series([START], [0.2])
+    power = _series(
+        [START + timedelta(minutes=minute) for minute in range(0, 61, 10)],
+        [1000.0] * 7,
+    )
+    kwargs = {"intervals": ["quarterly", "hourly"], "tz": UTC}
+
+    stream = replay_power_stream(prices, power, **kwargs)
+    batch = replay_power_batch(prices, power, **kwargs)
+
+    assert [row.cost for row in stream] == pytest.approx(
+        [0.05, 0.05, 0.05, 0.05, 0.0, 0.2, 0.0], abs=1e-6
+    )
+    assert [row.cost for row in batch] == pytest.approx(
+        [row.cost for row in stream], abs=1e-6
+    )
+
+
+def test_main_reads_csv_and_ndjson(tmp_path, capsys) -> None:
+    """The CLI converts units, skips unusable rows and prints CSV periods."""
+    price_path = tmp_path / "price.csv"
+    price_path.write_text(
+        "time,value\n2026-01-05T00:00:00+00:00,100\n2026-01-05T01:00:00+00:00,unknown\n"
+    )
+    energy_path = tmp_path / "energy.ndjson"
+    energy_path.write_text(
+        "\n".join(
+            json.dumps({"timestamp": stamp, "state": state})
+            for stamp, state in (
+                (datetime(2026, 1, 5, tzinfo=UTC).timestamp(), 1000),
+                ("2026-01-05T12:00:00+00:00", "unavailable"),
+                ("2026-01-06T00:30:00+00:00", 3000),
+            )
+        )
+    )
+
+    assert (
+        main(
+            [
+                str(price_path),
+                "--energy",
+                str(energy_path),
+                "--mode",
+                "numpy",
+                "--intervals",
+                "daily",
+                "--price-unit",
+                "EUR/MWh",
+                "--energy-unit",
+                "Wh",
+            ]
+        )
+        == 0
+    )
+
+    assert capsys.readouterr().out.splitlines() == [
+        "interval,start,cost",
+        "daily,2026-01-05T00:00:00+00:00,0.000000",
+        "daily,2026-01-06T00:00:00+00:00,0.200000",
+    ]
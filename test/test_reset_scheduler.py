@@ -0,0 +1,105 @@
+"""Tests for the shared interval reset scheduler."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.dynamic_energy_cost.const import DAILY, HOURLY
+from custom_components.dynamic_energy_cost.entity import BaseUtilitySensor
+from custom_components.dynamic_energy_cost.reset_scheduler import (
+    async_get_reset_scheduler,
+)
+
+
+class _TestUtilitySensor(BaseUtilitySensor):
+    """Concrete utility sensor for scheduler tests."""
+
+    @property
+    def name(self):
+        return "Test Utility Sensor"
+
+    def async_reset(self, *args):
+        """Reset nothing."""
+
+
+async def test_scheduler_arms_one_timer_per_boundary(hass):
+    """Actions sharing a boundary share one timer and fire in one batch."""
+    scheduler = async_get_reset_scheduler(hass)
+    boundary = dt_util.utcnow() + timedelta(minutes=5)
+    later = boundary + timedelta(hours=1)
+    first, second, third = Mock(), Mock(), Mock()
+
+    with patch(
+        "custom_components.dynamic_energy_cost.reset_scheduler.async_track_point_in_time",
+        return_value=Mock(),
+    ) as track:
+        scheduler.async_schedule(boundary, first)
+        scheduler.async_schedule(boundary, second)
+        scheduler.async_schedule(later, third)
+
+    assert track.call_count == 2
+    assert scheduler.timer_count == 2
+
+    fire = track.call_args_list[0].args[1]
+    fire(boundary)
+
+    first.assert_called_once_with(boundary)
+    second.assert_called_once_with(boundary)
+    third.assert_not_called()
+    assert scheduler.timer_count == 1
+
+
+async def test_scheduler_cancels_timer_after_last_action(hass):
+    """The boundary timer is released once every waiting action is cancelled."""
+    scheduler = async_get_reset_scheduler(hass)
+    boundary = dt_util.utcnow() + timedelta(minutes=5)
+    timer_unsub = Mock()
+
+    with patch(
+        "custom_components.dynamic_energy_cost.reset_scheduler.async_track_point_in_time",
+        return_value=timer_unsub,
+    ):
+        cancel_first = scheduler.async_schedule(boundary, Mock())
+        cancel_second = scheduler.async_schedule(boundary, Mock())
+
+    cancel_first()
+    timer_unsub.assert_not_called()
+
+    cancel_second()
+    cancel_second()
+    timer_unsub.assert_called_once_with()
+    assert scheduler.timer_count == 0
+
+
+async def test_sensors_reset_and_rearm_through_shared_timer(hass, freezer):
+    """Sensors reset at the boundary and re-arm on the next shared timer."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    sensors = [
+        _TestUtilitySensor(hass, HOURLY),
+        _TestUtilitySensor(hass, HOURLY),
+        _TestUtilitySensor(hass, DAILY),
+    ]
+    for sensor in sensors:
+        sensor.async_reset = Mock()
+        sensor.schedule_next_reset()
+
+    scheduler = async_get_reset_scheduler(hass)
+    assert scheduler.timer_count == 2
+
+    next_hour = sensors[0].calculate_next_reset_time()
+    freezer.move_to(next_hour + timedelta(seconds=1))
+    async_fire_time_changed(hass, next_hour + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    sensors[0].async_reset.assert_called_once()
+    sensors[1].async_reset.assert_called_once()
+    assert scheduler.timer_count == 2
+    assert sensors[0].calculate_next_reset_time() == next_hour + timedelta(hours=1)
+
+    for sensor in sensors:
+        await sensor.async_will_remove_from_hass()
+    assert scheduler.timer_count == 0
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-from decimal import Decimal
 from datetime import datetime
 from unittest.mock import AsyncMock, Mock
 
@@ -14,14 +13,19 @@ from homeassistant.util import dt as dt_util
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.dynamic_energy_cost.const import DAILY, DOMAIN, HOURLY
+from custom_components.dynamic_energy_cost.price_hub import normalize_price
 from custom_components.dynamic_energy_cost.sensor import (
     EnergyCostSensor,
     PowerCostSensor,
     RealTimeCostSensor,
     _is_finite_number,
+    validate_is_number,
+)
+from custom_components.dynamic_energy_cost.units import (
+    UnitFactorCache,
+    _energy_factor_for_unit,
     _power_unit_conversion_factor,
     _price_unit_conversion_factor,
-    validate_is_number,
 )
 
 
@@ -52,6 +56,28 @@ def _entry() -> MockConfigEntry:
     )
 
 
+def _energy_engine(sensor: EnergyCostSensor):
+    """Register an energy sensor with its engine, without subscribing."""
+    engine = sensor._engine
+    if sensor not in engine._sensors:
+        sensor._buckets.active[sensor.bucket_slot] = True
+        engine._sensors.append(sensor)
+    return engine
+
+
+def _realtime_engine(sensor: RealTimeCostSensor):
+    """Register a realtime sensor as a rate listener, without subscribing."""
+    engine = sensor._engine
+    if sensor._async_publish_rate not in engine._rate_listeners:
+        engine._rate_listeners.append(sensor._async_publish_rate)
+    return engine
+
+
+def _price_change(old_state):
+    """Return a price feed update away from ``old_state``."""
+    return Mock(previous_price=normalize_price(old_state))
+
+
 def test_realtime_sensor_ignores_missing_source_state(hass):
     """Realtime cost updates are skipped if source states are missing."""
     sensor = RealTimeCostSensor(
@@ -65,7 +91,7 @@ def test_realtime_sensor_ignores_missing_source_state(hass):
     hass.states.async_remove("sensor.electricity_price")
     hass.states.async_remove("sensor.heat_pump_power")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("500"))
     )
 
@@ -83,7 +109,7 @@ def test_realtime_sensor_ignores_none_event_state(hass):
     )
     sensor.async_write_ha_state = Mock()
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=None)
     )
 
@@ -104,11 +130,11 @@ def test_realtime_sensor_keeps_internal_precision_for_low_loads(hass):
     hass.states.async_set("sensor.electricity_price", "0.9731")
     hass.states.async_set("sensor.heat_pump_power", "17")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("17"))
     )
 
-    assert sensor._state == Decimal("0.0165")
+    assert sensor._engine.rate_micros == 16_543
     assert sensor.state == 0.0165
     sensor.async_write_ha_state.assert_called_once()
 
@@ -127,7 +153,7 @@ async def test_energy_sensor_zero_price_and_follow_up_increment(hass):
     sensor._cumulative_cost = 0.0
 
     hass.states.async_set("sensor.electricity_price", "0")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("11"))
     )
 
@@ -136,7 +162,7 @@ async def test_energy_sensor_zero_price_and_follow_up_increment(hass):
     assert sensor._last_energy_reading == 11.0
 
     hass.states.async_set("sensor.electricity_price", "2")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("12"))
     )
 
@@ -160,7 +186,7 @@ async def test_energy_sensor_reset_to_zero_reinitializes_baseline(hass):
     sensor._state = 7.5
 
     hass.states.async_set("sensor.electricity_price", "3")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("0"))
     )
 
@@ -168,7 +194,7 @@ async def test_energy_sensor_reset_to_zero_reinitializes_baseline(hass):
     assert sensor._cumulative_cost == 7.5
     assert sensor._last_energy_reading == 0.0
 
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("1"))
     )
 
@@ -202,14 +228,14 @@ async def test_energy_cost_reset_reinitialises_baseline(hass):
     assert sensor._last_energy_reading is None
 
     # First energy reading after reset — sets baseline
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("100"))
     )
     assert sensor._last_energy_reading == 100.0
     assert sensor.state == 0  # no cost yet, just baseline
 
     # Second energy reading — produces correct cost
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("102"))
     )
     assert sensor._cumulative_cost == 4.0  # 2 kWh * €2
@@ -241,14 +267,14 @@ async def test_energy_sensor_daily_source_resets_with_daily_cost(hass):
     assert sensor.state == 0
 
     # Source sensor also resets — first reading sets baseline
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.daily_energy", new_state=_state("0.1"))
     )
     assert sensor._last_energy_reading == 0.1
     assert sensor.state == 0  # baseline only, no cost yet
 
     # Next reading produces correct positive cost
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.daily_energy", new_state=_state("2.1"))
     )
     assert sensor._cumulative_cost == 0.4  # 2 kWh * €0.20
@@ -280,14 +306,14 @@ async def test_energy_sensor_cumulative_source_never_resets(hass):
     assert sensor._last_energy_reading is None
 
     # Source sensor keeps incrementing (never resets)
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.total_energy", new_state=_state("1002"))
     )
     # First reading after reset sets baseline
     assert sensor._last_energy_reading == 1002.0
     assert sensor.state == 0
 
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.total_energy", new_state=_state("1005"))
     )
     # 3 kWh * €0.10 = €0.30
@@ -296,7 +322,7 @@ async def test_energy_sensor_cumulative_source_never_resets(hass):
     assert sensor._cumulative_cost == approx(0.3)
     assert sensor.state == approx(0.3)
 
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.total_energy", new_state=_state("1010"))
     )
     # +5 kWh * €0.10 = €0.50, total €0.80
@@ -318,7 +344,7 @@ async def test_energy_sensor_calibrate_updates_internal_baseline(hass):
 
     sensor.async_calibrate("4.5")
     hass.states.async_set("sensor.electricity_price", "2")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("6"))
     )
 
@@ -342,13 +368,7 @@ async def test_energy_sensor_price_change_uses_previous_price(hass):
     sensor._state = 4.0
 
     hass.states.async_set("sensor.heat_pump_energy", "12")
-    await sensor._async_update_price_event(
-        _event(
-            entity_id="sensor.electricity_price",
-            old_state=_state("2"),
-            new_state=_state("3"),
-        )
-    )
+    _energy_engine(sensor)._async_handle_price_update(_price_change(_state("2")))
 
     assert sensor.state == 8.0
     assert sensor._cumulative_cost == 8.0
@@ -372,7 +392,7 @@ async def test_energy_sensor_supports_decreasing_readings_for_feed_in(hass):
     sensor._state = 10.0
 
     hass.states.async_set("sensor.electricity_price", "2")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.heat_pump_energy", new_state=_state("11"))
     )
 
@@ -398,9 +418,7 @@ async def test_energy_sensor_price_change_supports_decreasing_readings(hass):
     sensor._state = 10.0
 
     hass.states.async_set("sensor.heat_pump_energy", "11")
-    await sensor._async_update_price_event(
-        _event(entity_id="sensor.electricity_price", old_state=_state("2"))
-    )
+    _energy_engine(sensor)._async_handle_price_update(_price_change(_state("2")))
 
     assert sensor.state == 8.0
     assert sensor._cumulative_cost == 8.0
@@ -472,168 +490,171 @@ async def test_energy_sensor_exposes_and_restores_last_reset(hass):
     assert sensor.last_reset >= previous_reset
 
 
-def test_power_sensor_first_update_only_sets_baseline(hass):
-    """Power cost sensor avoids a large jump when no prior update timestamp exists."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
-
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
+def _power_sensor(hass) -> PowerCostSensor:
+    sensor = PowerCostSensor(
+        hass,
+        _entry(),
+        "sensor.heat_pump_power",
+        "sensor.electricity_price",
+        HOURLY,
+    )
     sensor.async_write_ha_state = Mock()
-    sensor._state = Decimal("1.5000")
-    sensor._last_update = None
+    sensor._buckets.active[sensor.bucket_slot] = True
+    sensor._engine._sensors.append(sensor)
+    return sensor
 
-    sensor._handle_real_time_cost_update(
-        _event(entity_id=realtime_sensor.entity_id, new_state=_state("2.5"))
-    )
 
-    assert sensor.state == Decimal("1.5000")
-    assert sensor._last_update is not None
+def _power_event(hass, value: str):
+    hass.states.async_set("sensor.heat_pump_power", value)
+    return _event(entity_id="sensor.heat_pump_power", new_state=_state(value))
+
+
+def test_power_sensor_first_update_only_sets_baseline(hass):
+    """Power cost sensor avoids a large jump when no prior rate exists."""
+    hass.states.async_set("sensor.electricity_price", "1")
+    sensor = _power_sensor(hass)
+    sensor._state = 1.5
+    sensor._engine.accumulator.last_update = None
+
+    sensor._engine._async_handle_power_event(_power_event(hass, "2500"))
+
+    assert sensor.state == 1.5
+    assert sensor._engine.rate_micros == 2_500_000
     sensor.async_write_ha_state.assert_not_called()
 
 
 def test_power_sensor_integrates_cost_over_elapsed_time(hass):
-    """Power cost sensor integrates realtime cost over elapsed time."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
-
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
-    sensor.async_write_ha_state = Mock()
-    sensor._state = Decimal("1.0000")
+    """Power cost sensor integrates the cost rate over elapsed time."""
+    hass.states.async_set("sensor.electricity_price", "1")
+    sensor = _power_sensor(hass)
+    sensor._state = 1.0
 
     from datetime import timedelta
-    from homeassistant.util.dt import now
 
-    sensor._last_cost_rate = Decimal("1.5")
-    sensor._last_update = now() - timedelta(hours=2)
-    sensor._handle_real_time_cost_update(
-        _event(entity_id=realtime_sensor.entity_id, new_state=_state("1.5"))
-    )
+    sensor._engine.rate_micros = 1_500_000
+    sensor._engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=2)
+    sensor._engine._async_handle_power_event(_power_event(hass, "1500"))
 
-    assert sensor.state == Decimal("4.0000")
+    assert sensor.state == 4.0
     sensor.async_write_ha_state.assert_called_once()
 
 
 def test_power_sensor_uses_previous_cost_rate_for_elapsed_time(hass):
-    """Elapsed time is charged using the previous realtime cost rate."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
-
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
-    sensor.async_write_ha_state = Mock()
-    sensor._state = Decimal("1.0000")
+    """Elapsed time is charged using the previous cost rate."""
+    hass.states.async_set("sensor.electricity_price", "1")
+    sensor = _power_sensor(hass)
+    sensor._state = 1.0
 
     from datetime import timedelta
-    from homeassistant.util.dt import now
 
-    sensor._last_update = now() - timedelta(hours=2)
-    sensor._handle_real_time_cost_update(
-        _event(
-            entity_id=realtime_sensor.entity_id,
-            old_state=_state("0.5"),
-            new_state=_state("1.5"),
-        )
-    )
+    sensor._engine.rate_micros = 500_000
+    sensor._engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=2)
+    sensor._engine._async_handle_power_event(_power_event(hass, "1500"))
 
-    assert sensor.state == Decimal("2.0000")
-    assert sensor._last_cost_rate == Decimal("1.5")
+    assert sensor.state == 2.0
+    assert sensor._engine.rate_micros == 1_500_000
     sensor.async_write_ha_state.assert_called_once()
 
 
 def test_power_sensor_uses_precise_rate_for_elapsed_time(hass):
-    """Power integration uses the higher precision realtime rate baseline."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
-
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
-    sensor.async_write_ha_state = Mock()
-    sensor._state = Decimal("0.0000")
+    """Power integration uses the unrounded in-process rate, not the published one."""
+    hass.states.async_set("sensor.electricity_price", "0.9731")
+    sensor = _power_sensor(hass)
 
     from datetime import timedelta
-    from homeassistant.util.dt import now
 
-    sensor._last_cost_rate = Decimal("0.0165")
-    sensor._last_update = now() - timedelta(hours=2)
-    sensor._handle_real_time_cost_update(
-        _event(
-            entity_id=realtime_sensor.entity_id,
-            old_state=_state("0.0165"),
-            new_state=_state("0.0200"),
-        )
-    )
+    sensor._engine.rate_micros = 16_543
+    sensor._engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=2)
+    sensor._engine._async_handle_power_event(_power_event(hass, "20"))
 
-    assert sensor.state == Decimal("0.0330")
+    assert sensor._cost_micros == pytest.approx(33_086, abs=1)
+    assert sensor.state == 0.0331
 
 
 def test_power_sensor_does_not_backfill_idle_time_with_new_spike(hass):
     """A new spike after idle time does not charge the whole gap at the new rate."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
+    hass.states.async_set("sensor.electricity_price", "1")
+    sensor = _power_sensor(hass)
 
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
-    sensor.async_write_ha_state = Mock()
-    sensor._state = Decimal("0.0000")
+    from datetime import timedelta
+
+    sensor._engine.rate_micros = 0
+    sensor._engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=3)
+    sensor._engine._async_handle_power_event(_power_event(hass, "7500"))
+
+    assert sensor.state == 0.0
+    assert sensor._engine.rate_micros == 7_500_000
+    sensor.async_write_ha_state.assert_not_called()
+
+
+def test_power_sensor_price_change_settles_at_old_rate(hass):
+    """A price change charges the elapsed time at the rate before the change."""
+    hass.states.async_set("sensor.electricity_price", "1")
+    hass.states.async_set("sensor.heat_pump_power", "1000")
+    sensor = _power_sensor(hass)
 
     from datetime import timedelta
-    from homeassistant.util.dt import now
 
-    sensor._last_update = now() - timedelta(hours=3)
-    sensor._handle_real_time_cost_update(
-        _event(
-            entity_id=realtime_sensor.entity_id,
-            old_state=_state("0"),
-            new_state=_state("7.5"),
-        )
-    )
+    sensor._engine.rate_micros = 1_000_000
+    # Price changes re-rate from the last power reading the engine saw
+    sensor._engine.power_kw = 1.0
+    sensor._engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=1)
+    hass.states.async_set("sensor.electricity_price", "3")
+    sensor._engine._async_handle_price_update(Mock(price=3.0, last_updated=None))
 
-    assert sensor.state == Decimal("0.0000")
-    assert sensor._last_cost_rate == Decimal("7.5")
+    assert sensor.state == 1.0
+    assert sensor._engine.rate_micros == 3_000_000
 
 
-async def test_power_sensor_restore_uses_current_rate_as_baseline(hass):
-    """Restore sets the current realtime rate as the baseline for later integration."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
+def test_power_sensor_calibrate_settles_the_rate_first(hass):
+    """Time integrated before a calibration is not added on top of it."""
+    hass.states.async_set("sensor.electricity_price", "1")
+    sensor = _power_sensor(hass)
+
+    from datetime import timedelta
+
+    sensor._engine.rate_micros = 1_000_000
+    sensor._engine.accumulator.last_update = dt_util.utcnow() - timedelta(hours=2)
+    sensor.async_calibrate("4.5")
+
+    assert sensor.state == 4.5
+    assert "_cumulative_cost" not in vars(sensor)
+    sensor._engine._async_handle_power_event(_power_event(hass, "1000"))
+
+    assert sensor.state == pytest.approx(4.5, abs=0.0001)
+
 
-    hass.states.async_set(realtime_sensor.entity_id, "2.5")
+async def test_power_sensor_restore_uses_current_rate_as_baseline(hass):
+    """Restore starts integrating from the rate of the current source states."""
+    hass.states.async_set("sensor.electricity_price", "2.5")
+    hass.states.async_set("sensor.heat_pump_power", "1000")
 
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
+    sensor = PowerCostSensor(
+        hass,
+        _entry(),
+        "sensor.heat_pump_power",
+        "sensor.electricity_price",
+        HOURLY,
+    )
     sensor.async_get_last_state = AsyncMock(return_value=Mock(state="4.0"))
     sensor.schedule_next_reset = Mock()
 
     await sensor.async_added_to_hass()
 
-    assert sensor.state == Decimal("4.0")
-    assert sensor._last_cost_rate == Decimal("2.5")
+    assert sensor.state == 4.0
+    assert sensor._engine.rate_micros == 2_500_000
 
 
 async def test_power_sensor_exposes_total_state_class_and_last_reset(hass):
     """Power cost sensors behave like resetting TOTAL sensors."""
-    realtime_sensor = Mock(entity_id="sensor.heat_pump_real_time_energy_cost")
-    realtime_sensor.name = "Heat Pump Real Time Energy Cost"
-    realtime_sensor.device_info = {"identifiers": {(DOMAIN, "entry-123")}}
-    realtime_sensor.unique_id = "entry-123_real_time_cost"
-    realtime_sensor._config_entry = _entry()
-
     last_reset = datetime(2026, 3, 1, 0, 0, tzinfo=dt_util.UTC)
-    sensor = PowerCostSensor(hass, realtime_sensor, HOURLY)
+    sensor = PowerCostSensor(
+        hass,
+        _entry(),
+        "sensor.heat_pump_power",
+        "sensor.electricity_price",
+        HOURLY,
+    )
     sensor.async_get_last_state = AsyncMock(
         return_value=Mock(
             state="4.0",
@@ -651,6 +672,7 @@ async def test_power_sensor_exposes_total_state_class_and_last_reset(hass):
     previous_reset = sensor.last_reset
     sensor.async_reset()
 
+    assert sensor.state == 0.0
     assert sensor.last_reset is not None
     assert sensor.last_reset >= previous_reset
 
@@ -683,7 +705,7 @@ async def test_energy_sensor_wh_unit_converts_to_kwh(hass):
     sensor._energy_to_kwh = 0.001  # Wh → kWh
 
     hass.states.async_set("sensor.electricity_price", "0.2")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("2000", "Wh"),
@@ -710,7 +732,7 @@ async def test_energy_sensor_mwh_unit_converts_to_kwh(hass):
     sensor._energy_to_kwh = 1000.0  # MWh → kWh
 
     hass.states.async_set("sensor.electricity_price", "0.1")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("2", "MWh"),
@@ -737,7 +759,7 @@ async def test_energy_sensor_kwh_unit_unchanged(hass):
     sensor._energy_to_kwh = 1.0  # kWh, default
 
     hass.states.async_set("sensor.electricity_price", "0.3")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("11", "kWh"),
@@ -766,7 +788,7 @@ async def test_energy_sensor_wh_unit_resolved_from_event(hass):
 
     hass.states.async_set("sensor.electricity_price", "0.2")
     # First event carries Wh unit — should trigger re-resolution
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("2000", "Wh"),
@@ -833,12 +855,12 @@ def test_realtime_sensor_converts_eur_per_mwh(hass):
     )
     hass.states.async_set("sensor.heat_pump_power", "1000")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("1000"))
     )
 
     # 50 EUR/MWh = 0.05 EUR/kWh; 1000 W = 1 kW; cost = 0.05 EUR/h
-    assert sensor._state == Decimal("0.0500")
+    assert sensor._state == 0.05
 
 
 def test_realtime_sensor_converts_eur_per_wh(hass):
@@ -858,12 +880,12 @@ def test_realtime_sensor_converts_eur_per_wh(hass):
     )
     hass.states.async_set("sensor.heat_pump_power", "1000")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("1000"))
     )
 
     # 0.0002 EUR/Wh = 0.2 EUR/kWh; 1000 W = 1 kW; cost = 0.2 EUR/h
-    assert sensor._state == Decimal("0.2000")
+    assert sensor._state == 0.2
 
 
 def test_realtime_sensor_eur_per_kwh_unchanged(hass):
@@ -883,12 +905,12 @@ def test_realtime_sensor_eur_per_kwh_unchanged(hass):
     )
     hass.states.async_set("sensor.heat_pump_power", "2000")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("2000"))
     )
 
     # 0.25 EUR/kWh; 2000 W = 2 kW; cost = 0.5 EUR/h
-    assert sensor._state == Decimal("0.5000")
+    assert sensor._state == 0.5
 
 
 # ---------------------------------------------------------------------------
@@ -918,6 +940,54 @@ def test_power_unit_conversion_factor_none():
     assert _power_unit_conversion_factor(None) == pytest.approx(0.001)
 
 
+def test_unit_factor_cache_recomputes_only_on_unit_change():
+    """The cached factor is recomputed only when the unit string changes."""
+    factor_for_unit = Mock(side_effect=_energy_factor_for_unit)
+    cache = UnitFactorCache(factor_for_unit, 1.0)
+
+    assert cache.resolve(_state_with_unit("1", "Wh")) == pytest.approx(0.001)
+    assert cache.resolve(_state_with_unit("2", "Wh")) == pytest.approx(0.001)
+    assert cache.resolve(None) == pytest.approx(0.001)
+    assert factor_for_unit.call_count == 1
+
+    assert cache.resolve(_state_with_unit("3", "kWh")) == 1.0
+    assert factor_for_unit.call_count == 2
+
+
+async def test_energy_sensor_follows_unit_change_away_from_wh(hass):
+    """A source switching from Wh to kWh is re-resolved, not only a 1.0 factor."""
+    sensor = EnergyCostSensor(
+        hass,
+        _entry(),
+        "sensor.heat_pump_energy",
+        "sensor.electricity_price",
+        HOURLY,
+    )
+    sensor.async_write_ha_state = Mock()
+    sensor._last_energy_reading = 1000.0
+    hass.states.async_set("sensor.electricity_price", "0.2")
+
+    _energy_engine(sensor)._async_handle_energy_event(
+        _event(
+            entity_id="sensor.heat_pump_energy",
+            new_state=_state_with_unit("2000", "Wh"),
+        )
+    )
+    assert sensor._energy_to_kwh == pytest.approx(0.001)
+
+    sensor._last_energy_reading = 2.0
+    _energy_engine(sensor)._async_handle_energy_event(
+        _event(
+            entity_id="sensor.heat_pump_energy",
+            new_state=_state_with_unit("3", "kWh"),
+        )
+    )
+
+    assert sensor._energy_to_kwh == 1.0
+    # 1 kWh at 0.2 on top of the first 1 kWh
+    assert sensor._cumulative_cost == pytest.approx(0.4)
+
+
 def test_realtime_sensor_kw_power_sensor(hass):
     """Power sensor reporting in kW is treated as kW, not W (#229)."""
     sensor = RealTimeCostSensor(
@@ -939,12 +1009,15 @@ def test_realtime_sensor_kw_power_sensor(hass):
         {"unit_of_measurement": "kW"},
     )
 
-    sensor.handle_state_change(
-        _event(entity_id="sensor.heat_pump_power", new_state=_state("5"))
+    _realtime_engine(sensor)._async_handle_power_event(
+        _event(
+            entity_id="sensor.heat_pump_power",
+            new_state=hass.states.get("sensor.heat_pump_power"),
+        )
     )
 
     # 5 kW x 0.30 EUR/kWh = 1.50 EUR/h (not 0.0015 if treated as W)
-    assert sensor._state == Decimal("1.5000")
+    assert sensor._state == 1.5
 
 
 def test_realtime_sensor_w_power_sensor_explicit_unit(hass):
@@ -968,12 +1041,12 @@ def test_realtime_sensor_w_power_sensor_explicit_unit(hass):
         {"unit_of_measurement": "W"},
     )
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("2000"))
     )
 
     # 2000 W = 2 kW x 0.30 EUR/kWh = 0.60 EUR/h
-    assert sensor._state == Decimal("0.6000")
+    assert sensor._state == 0.6
 
 
 def test_realtime_sensor_mw_power_sensor(hass):
@@ -997,12 +1070,15 @@ def test_realtime_sensor_mw_power_sensor(hass):
         {"unit_of_measurement": "MW"},
     )
 
-    sensor.handle_state_change(
-        _event(entity_id="sensor.heat_pump_power", new_state=_state("0.5"))
+    _realtime_engine(sensor)._async_handle_power_event(
+        _event(
+            entity_id="sensor.heat_pump_power",
+            new_state=hass.states.get("sensor.heat_pump_power"),
+        )
     )
 
     # 0.5 MW = 500 kW x 0.10 EUR/kWh = 50 EUR/h
-    assert sensor._state == Decimal("50.0000")
+    assert sensor._state == 50.0
 
 
 def test_realtime_sensor_kw_power_with_eur_per_mwh_price(hass):
@@ -1026,12 +1102,15 @@ def test_realtime_sensor_kw_power_with_eur_per_mwh_price(hass):
         {"unit_of_measurement": "kW"},
     )
 
-    sensor.handle_state_change(
-        _event(entity_id="sensor.heat_pump_power", new_state=_state("3"))
+    _realtime_engine(sensor)._async_handle_power_event(
+        _event(
+            entity_id="sensor.heat_pump_power",
+            new_state=hass.states.get("sensor.heat_pump_power"),
+        )
     )
 
     # 100 EUR/MWh = 0.10 EUR/kWh; 3 kW x 0.10 = 0.30 EUR/h
-    assert sensor._state == Decimal("0.3000")
+    assert sensor._state == 0.3
 
 
 def test_realtime_sensor_no_power_unit_backward_compat(hass):
@@ -1048,12 +1127,12 @@ def test_realtime_sensor_no_power_unit_backward_compat(hass):
     hass.states.async_set("sensor.electricity_price", "0.25")
     hass.states.async_set("sensor.heat_pump_power", "2000")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("2000"))
     )
 
     # 0.25 EUR/kWh; 2000 W = 2 kW; cost = 0.5 EUR/h (unchanged from pre-fix)
-    assert sensor._state == Decimal("0.5000")
+    assert sensor._state == 0.5
 
 
 # ---------------------------------------------------------------------------
@@ -1079,7 +1158,7 @@ async def test_energy_sensor_converts_eur_per_mwh_on_energy_event(hass):
         "100",
         {"unit_of_measurement": "EUR/MWh"},
     )
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("11", "kWh"),
@@ -1104,12 +1183,8 @@ async def test_energy_sensor_converts_eur_per_mwh_on_price_event(hass):
     sensor._cumulative_cost = 0.0
 
     hass.states.async_set("sensor.heat_pump_energy", "11")
-    await sensor._async_update_price_event(
-        _event(
-            entity_id="sensor.electricity_price",
-            old_state=_state_with_unit("200", "EUR/MWh"),
-            new_state=_state_with_unit("250", "EUR/MWh"),
-        )
+    _energy_engine(sensor)._async_handle_price_update(
+        _price_change(_state_with_unit("200", "EUR/MWh"))
     )
 
     # delta = 1 kWh; old price = 200 EUR/MWh = 0.2 EUR/kWh; cost = 0.2
@@ -1134,7 +1209,7 @@ async def test_energy_sensor_converts_eur_per_wh(hass):
         "0.0002",
         {"unit_of_measurement": "EUR/Wh"},
     )
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("11", "kWh"),
@@ -1164,12 +1239,12 @@ def test_realtime_sensor_no_price_unit_backward_compat(hass):
     hass.states.async_set("sensor.electricity_price", "0.25")
     hass.states.async_set("sensor.heat_pump_power", "2000")
 
-    sensor.handle_state_change(
+    _realtime_engine(sensor)._async_handle_power_event(
         _event(entity_id="sensor.heat_pump_power", new_state=_state("2000"))
     )
 
     # 0.25 EUR/kWh (assumed); 2000 W = 2 kW; cost = 0.5 EUR/h
-    assert sensor._state == Decimal("0.5000")
+    assert sensor._state == 0.5
 
 
 async def test_energy_sensor_no_price_unit_backward_compat(hass):
@@ -1187,7 +1262,7 @@ async def test_energy_sensor_no_price_unit_backward_compat(hass):
 
     # No unit_of_measurement on price — most existing setups
     hass.states.async_set("sensor.electricity_price", "0.30")
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("12", "kWh"),
@@ -1212,13 +1287,7 @@ async def test_energy_sensor_price_change_no_unit_backward_compat(hass):
     sensor._cumulative_cost = 0.0
 
     hass.states.async_set("sensor.heat_pump_energy", "12")
-    await sensor._async_update_price_event(
-        _event(
-            entity_id="sensor.electricity_price",
-            old_state=_state("0.25"),
-            new_state=_state("0.30"),
-        )
-    )
+    _energy_engine(sensor)._async_handle_price_update(_price_change(_state("0.25")))
 
     # delta = 2 kWh; old price = 0.25 (no unit, assumed /kWh); cost = 0.50
     assert sensor._cumulative_cost == pytest.approx(0.5)
@@ -1248,7 +1317,7 @@ async def test_energy_sensor_mwh_energy_with_eur_per_mwh_price(hass):
         "50",
         {"unit_of_measurement": "EUR/MWh"},
     )
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("1.5", "MWh"),
@@ -1280,7 +1349,7 @@ async def test_energy_sensor_wh_energy_with_eur_per_wh_price(hass):
         "0.0003",
         {"unit_of_measurement": "EUR/Wh"},
     )
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.heat_pump_energy",
             new_state=_state_with_unit("2000", "Wh"),
@@ -1327,7 +1396,7 @@ async def test_energy_sensor_cumulative_first_delta_counted_after_reset(hass):
     assert sensor.state == 0
 
     # First energy update — delta is counted immediately (not swallowed as baseline)
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.grid_import", new_state=_state("1002"))
     )
     # 2 kWh * €0.20 = €0.40
@@ -1367,7 +1436,7 @@ async def test_energy_sensor_daily_reset_baseline_set_when_at_zero(hass):
     assert sensor.state == 0
 
     # First reading of the new day — cost is counted from the 0 baseline
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.solar_today", new_state=_state("0.5"))
     )
     # 0.5 kWh * €0.20 = €0.10
@@ -1414,7 +1483,7 @@ async def test_source_reset_detected_via_total_increasing_decrement(hass):
         },
     )
 
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.daily_energy",
             new_state=new_state,
@@ -1465,7 +1534,7 @@ async def test_source_reset_detected_via_last_reset_attribute(hass):
         },
     )
 
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(
             entity_id="sensor.daily_energy",
             new_state=new_state,
@@ -1505,13 +1574,7 @@ async def test_source_reset_via_total_increasing_during_price_event(hass):
         {"unit_of_measurement": "Wh", "state_class": "total_increasing"},
     )
 
-    await sensor._async_update_price_event(
-        _event(
-            entity_id="sensor.electricity_price",
-            old_state=_state("0.10"),
-            new_state=_state("0.08"),
-        )
-    )
+    _energy_engine(sensor)._async_handle_price_update(_price_change(_state("0.10")))
 
     # Price handler detected source reset — no negative spike
     assert sensor._last_energy_reading == 5.0
@@ -1542,7 +1605,7 @@ async def test_total_increasing_normal_increment_not_treated_as_reset(hass):
         },
     )
 
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.daily_energy", new_state=new_state)
     )
 
@@ -1580,14 +1643,14 @@ async def test_energy_sensor_reset_baseline_unavailable_sensor(hass):
     assert sensor.state == 0
 
     # First event sets baseline (no cost)
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.grid_import", new_state=_state("800"))
     )
     assert sensor._last_energy_reading == pytest.approx(800.0)
     assert sensor.state == 0  # baseline only
 
     # Second event produces cost
-    await sensor._async_update_energy_event(
+    _energy_engine(sensor)._async_handle_energy_event(
         _event(entity_id="sensor.grid_import", new_state=_state("802"))
     )
     assert sensor._cumulative_cost == pytest.approx(0.30)  # 2 kWh * €0.15
@@ -1660,3 +1723,35 @@ def test_sensor_module_does_not_import_is_number_from_helpers_template():
     )
     source = sensor_path.read_text()
     assert "from homeassistant.helpers.template import is_number" not in source
+
+
+def test_power_sensor_integrates_over_event_timestamps(hass):
+    """Queued power events are integrated over their own state timestamps."""
+    from datetime import timedelta
+
+    hass.states.async_set("sensor.electricity_price", "1")
+    sensor = _power_sensor(hass)
+    engine = sensor._engine
+    start = dt_util.utcnow() - timedelta(hours=2)
+    engine.rate_micros = 1_000_000
+    engine.accumulator.last_update = start
+
+    def _stamped(value, when):
+        return _event(
+            entity_id="sensor.heat_pump_power",
+            new_state=Mock(
+                state=value,
+                attributes={"unit_of_measurement": "W"},
+                last_updated=when,
+            ),
+        )
+
+    # Processed in one burst, but written one hour apart
+    engine._async_handle_power_event(_stamped("2000", start + timedelta(hours=1)))
+    engine._async_handle_power_event(_stamped("0", start + timedelta(hours=2)))
+    # A stale event cannot move integration backwards
+    engine._async_handle_power_event(_stamped("5000", start + timedelta(hours=1)))
+
+    assert sensor.state == 3.0
+    assert engine.accumulator.last_update == start + timedelta(hours=2)
+    assert engine.rate_micros == 5_000_000
@@ -0,0 +1,233 @@
+"""Tests for imported long-term cost statistics."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.components.recorder import get_instance, models as recorder_models
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.dynamic_energy_cost.engine import (
+    EnergyCostEngine,
+    PowerCostEngine,
+)
+from custom_components.dynamic_energy_cost.statistics import (
+    STATISTICS_SLOT,
+    CostStatistics,
+)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Set up the recorder before hass, which the autouse fixture requests."""
+    yield
+
+
+async def _imported(hass, statistics, start):
+    await async_wait_recording_done(hass)
+    result = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        start,
+        None,
+        {statistics.statistic_id},
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+    return [
+        (row["state"], row["sum"]) for row in result.get(statistics.statistic_id, [])
+    ]
+
+
+async def test_closed_hours_are_imported_in_one_batch(hass):
+    """Buffered hours are imported together with a running sum."""
+    statistics = CostStatistics(hass, "ENTRY123", "Heat Pump")
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=3
+    )
+
+    statistics.async_add_hour(start, 1.5)
+    statistics.async_add_hour(start + timedelta(hours=1), 2.0)
+    assert await _imported(hass, statistics, start) == []
+
+    await statistics.async_flush()
+
+    assert statistics.statistic_id == "dynamic_energy_cost:entry123_cost"
+    assert await _imported(hass, statistics, start) == [
+        (pytest.approx(1.5), pytest.approx(1.5)),
+        (pytest.approx(2.0), pytest.approx(3.5)),
+    ]
+
+
+async def test_engine_closes_statistics_hour_on_boundary(hass, freezer):
+    """The statistics slot is closed and reset at every UTC hour."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set("sensor.electricity_price", "2")
+    engine = EnergyCostEngine(
+        hass, "sensor.heat_pump_energy", "sensor.electricity_price"
+    )
+    statistics = CostStatistics(hass, "entry", "Heat Pump")
+    stop = engine.async_enable_statistics(statistics)
+    slot = engine.buckets.slot(STATISTICS_SLOT)
+    engine.buckets.baseline[slot] = 10.0
+    engine.buckets.cost[slot] = 3.0
+
+    boundary = dt_util.parse_datetime("2026-02-15 11:00:00+00:00")
+    freezer.move_to(boundary)
+    async_fire_time_changed(hass, boundary)
+    await hass.async_block_till_done()
+
+    assert statistics._pending == [(boundary - timedelta(hours=1), 3.0)]
+    assert engine.buckets.cost[slot] == 0.0
+    assert engine.buckets.baseline[slot] == 10.0
+    stop()
+
+
+async def test_rebuild_recomputes_hours_from_history(hass, freezer):
+    """A rebuild re-imports every full hour from recorded power and price."""
+    hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = hour - timedelta(hours=2)
+    freezer.move_to(start - timedelta(minutes=1))
+    hass.states.async_set("sensor.electricity_price", "1")
+    hass.states.async_set("sensor.heat_pump_power", "1000")
+    freezer.move_to(start + timedelta(minutes=30))
+    hass.states.async_set("sensor.electricity_price", "3")
+    freezer.move_to(hour + timedelta(minutes=5))
+    await async_wait_recording_done(hass)
+
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    statistics = CostStatistics(hass, "entry", "Heat Pump")
+    stop = engine.async_enable_statistics(statistics)
+    statistics.async_add_hour(start, 99.0)
+
+    await engine.async_rebuild_statistics(start + timedelta(minutes=10))
+
+    assert statistics._pending == []
+    assert await _imported(hass, statistics, start) == [
+        (pytest.approx(2.0), pytest.approx(2.0)),
+        (pytest.approx(3.0), pytest.approx(5.0)),
+    ]
+    stop()
+
+
+async def _record_heat_pump_history(hass, freezer):
+    """Record 1 kW with the price going from 1 to 3; return the first hour."""
+    hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = hour - timedelta(hours=2)
+    freezer.move_to(start - timedelta(minutes=1))
+    hass.states.async_set("sensor.electricity_price", "1")
+    hass.states.async_set("sensor.heat_pump_power", "1000")
+    freezer.move_to(start + timedelta(minutes=30))
+    hass.states.async_set("sensor.electricity_price", "3")
+    freezer.move_to(hour + timedelta(minutes=5))
+    await async_wait_recording_done(hass)
+    return start
+
+
+async def test_rebuild_continues_from_an_older_sum(hass, freezer):
+    """A rebuild continues from the last sum imported days before it."""
+    start = await _record_heat_pump_history(hass, freezer)
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    statistics = CostStatistics(hass, "entry", "Heat Pump")
+    stop = engine.async_enable_statistics(statistics)
+    statistics.async_add_hour(start - timedelta(days=3), 10.0)
+    await statistics.async_flush()
+    await async_wait_recording_done(hass)
+
+    await engine.async_rebuild_statistics(start)
+
+    assert await _imported(hass, statistics, start) == [
+        (pytest.approx(2.0), pytest.approx(12.0)),
+        (pytest.approx(3.0), pytest.approx(15.0)),
+    ]
+    assert statistics._last_sum == pytest.approx(15.0)
+    stop()
+
+
+async def test_flush_waiting_for_the_recorder_keeps_the_rebuilt_sum(hass, freezer):
+    """A flush suspended in its sum lookup cannot undo a rebuild's sum."""
+    start = await _record_heat_pump_history(hass, freezer)
+    engine = PowerCostEngine(hass, "sensor.heat_pump_power", "sensor.electricity_price")
+    statistics = CostStatistics(hass, "entry", "Heat Pump")
+    stop = engine.async_enable_statistics(statistics)
+    statistics.async_add_hour(start, 99.0)
+    last_sum = CostStatistics._async_last_sum
+    recorder_read = asyncio.Event()
+    flush_waited_for = asyncio.Event()
+
+    class _Lock(asyncio.Lock):
+        async def acquire(self):
+            if self.locked():
+                flush_waited_for.set()
+            return await super().acquire()
+
+    statistics._flush_lock = _Lock()
+
+    async def _slow_last_sum(self, before=None):
+        result = await last_sum(self, before)
+        if before is None:
+            await recorder_read.wait()
+        return result
+
+    with patch.object(CostStatistics, "_async_last_sum", _slow_last_sum):
+        flush = hass.async_create_task(statistics.async_flush())
+        rebuild = hass.async_create_task(engine.async_rebuild_statistics(start))
+        # Let the rebuild run as far as it can while the flush is suspended
+        waited = hass.async_create_task(flush_waited_for.wait())
+        await asyncio.wait([rebuild, waited], return_when=asyncio.FIRST_COMPLETED)
+        waited.cancel()
+        recorder_read.set()
+        await flush
+        await rebuild
+
+    assert await _imported(hass, statistics, start) == [
+        (pytest.approx(2.0), pytest.approx(2.0)),
+        (pytest.approx(3.0), pytest.approx(5.0)),
+    ]
+    assert statistics._last_sum == pytest.approx(5.0)
+    stop()
+
+
+async def test_failed_flush_keeps_the_buffered_hours(hass):
+    """Hours and the running sum survive an import that fails."""
+    statistics = CostStatistics(hass, "entry", "Heat Pump")
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=2
+    )
+    statistics.async_add_hour(start, 1.5)
+
+    with (
+        patch.object(CostStatistics, "_metadata", side_effect=ImportError),
+        pytest.raises(ImportError),
+    ):
+        await statistics.async_flush()
+
+    assert statistics._pending == [(start, 1.5)]
+    assert statistics._last_sum is None
+
+    await statistics.async_flush()
+
+    assert await _imported(hass, statistics, start) == [
+        (pytest.approx(1.5), pytest.approx(1.5))
+    ]
+
+
+def test_metadata_without_mean_types(hass, monkeypatch):
+    """Cores without mean types get metadata without a mean type."""
+    monkeypatch.delattr(recorder_models, "StatisticMeanType")
+
+    metadata = CostStatistics(hass, "entry", "Heat Pump")._metadata()
+
+    assert "mean_type" not in metadata
+    assert metadata["has_mean"] is False
+    assert metadata["has_sum"] is True
@@ -0,0 +1,245 @@
+"""Tests for the per-entry accumulator store."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import json
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.dynamic_energy_cost.const import DOMAIN, MIN_PUBLISH_INTERVAL
+from custom_components.dynamic_energy_cost.storage import (
+    JOURNAL_INTERVAL,
+    SAVE_DELAY,
+    EntryStore,
+)
+
+PRICE_ID = "sensor.electricity_price"
+ENERGY_ID = "sensor.meter_energy"
+COST_ID = "sensor.meter_hourly_energy_cost"
+POWER_ID = "sensor.heater_power"
+POWER_COST_ID = "sensor.heater_hourly_energy_cost"
+
+
+def _journal_records(journal) -> list[dict]:
+    return [json.loads(line) for line in journal.read_text().splitlines()]
+
+
+async def _tick_journal(hass, freezer) -> None:
+    freezer.tick(timedelta(seconds=JOURNAL_INTERVAL))
+    async_fire_time_changed(hass)
+    # The journal appends in a background task
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def _setup_entry(hass, **options) -> MockConfigEntry:
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(ENERGY_ID, "10", {"unit_of_measurement": "kWh"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "integration_description": "Meter",
+            "electricity_price_sensor": PRICE_ID,
+            "energy_sensor": ENERGY_ID,
+            "power_sensor": None,
+        },
+        options={"selected_sensors": ["hourly"], **options},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_accumulators_are_saved_coalesced_and_restored(
+    hass, hass_storage, freezer
+):
+    """Changes are written once per save delay and restored on reload."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    entry = await _setup_entry(hass)
+    key = f"{DOMAIN}.{entry.entry_id}"
+
+    hass.states.async_set(ENERGY_ID, "11", {"unit_of_measurement": "kWh"})
+    hass.states.async_set(ENERGY_ID, "12", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+    assert key not in hass_storage
+
+    freezer.tick(timedelta(seconds=SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    stored = hass_storage[key]["data"]["energy"]
+    assert stored["intervals"] == ["hourly"]
+    # The first reading after setup only sets the baseline
+    assert stored["cost"] == [pytest.approx(0.5)]
+    assert stored["energy"] == [pytest.approx(1.0)]
+    assert stored["baseline"] == [12.0]
+    assert stored["updated"] == dt_util.utcnow().isoformat()
+
+    hass.states.async_set(ENERGY_ID, "14", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+    # Unloading writes the pending change without waiting for the delay
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert hass_storage[key]["data"]["energy"]["cost"] == [pytest.approx(1.5)]
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(COST_ID)
+    assert float(state.state) == pytest.approx(1.5)
+    assert state.attributes["cumulative_energy"] == pytest.approx(3.0)
+    assert "last_energy_reading" not in state.attributes
+
+    hass.states.async_set(ENERGY_ID, "16", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+    # The restored baseline prices the first reading after the reload
+    assert float(hass.states.get(COST_ID).state) == pytest.approx(2.5)
+
+
+async def test_power_totals_are_restored_up_to_the_unload(hass, hass_storage, freezer):
+    """Power totals include the time up to the unload and keep their reset."""
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(POWER_ID, "1000", {"unit_of_measurement": "W"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "integration_description": "Heater",
+            "electricity_price_sensor": PRICE_ID,
+            "power_sensor": POWER_ID,
+        },
+        options={"selected_sensors": ["hourly"]},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    last_reset = hass.states.get(POWER_COST_ID).attributes["last_reset"]
+
+    # No power event in 30 minutes at 0.5/h
+    freezer.move_to("2026-02-15 10:50:00+00:00")
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    stored = hass_storage[f"{DOMAIN}.{entry.entry_id}"]["data"]["power"]
+    assert stored["cost"] == [250_000]
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(POWER_COST_ID)
+    assert float(state.state) == pytest.approx(0.25)
+    assert state.attributes["last_reset"] == last_reset
+
+
+async def test_removing_the_entry_deletes_its_store(hass, hass_storage):
+    """The storage file goes away with the entry."""
+    entry = await _setup_entry(hass)
+    key = f"{DOMAIN}.{entry.entry_id}"
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert key in hass_storage
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert key not in hass_storage
+
+
+async def test_journal_replays_changes_lost_in_a_crash(
+    hass, hass_storage, freezer, tmp_path
+):
+    """Journal records newer than the saved snapshot are replayed on load."""
+    hass.config.config_dir = str(tmp_path)
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    entry = await _setup_entry(hass, crash_journal=True)
+    journal = tmp_path / ".storage" / f"{DOMAIN}.{entry.entry_id}.journal"
+
+    hass.states.async_set(ENERGY_ID, "11", {"unit_of_measurement": "kWh"})
+    hass.states.async_set(ENERGY_ID, "12", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=JOURNAL_INTERVAL))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    # The delayed save has not run yet; a torn record after a power cut
+    # is skipped
+    assert f"{DOMAIN}.{entry.entry_id}" not in hass_storage
+    with journal.open("a", encoding="utf-8") as file:
+        file.write('{"sequence": 9, "energy": {"cost"')
+
+    store = EntryStore(hass, entry.entry_id, journal=True)
+    await store.async_load()
+
+    assert store.restored("energy")["cost"] == [pytest.approx(0.5)]
+    assert store.restored("energy")["baseline"] == [12.0]
+
+    # A clean save contains every record, so the journal is dropped
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert not journal.exists()
+
+
+async def test_journal_records_held_state_writes(hass, freezer, tmp_path):
+    """A reading is journaled even while its state write is held back."""
+    hass.config.config_dir = str(tmp_path)
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    entry = await _setup_entry(hass, crash_journal=True, **{MIN_PUBLISH_INTERVAL: 60})
+    journal = tmp_path / ".storage" / f"{DOMAIN}.{entry.entry_id}.journal"
+
+    hass.states.async_set(ENERGY_ID, "11", {"unit_of_measurement": "kWh"})
+    hass.states.async_set(ENERGY_ID, "12", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+    await _tick_journal(hass, freezer)
+    assert _journal_records(journal)[-1]["energy"]["cost"] == [pytest.approx(0.5)]
+
+    # The next write is held for the minimum interval
+    hass.states.async_set(ENERGY_ID, "13", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+    await _tick_journal(hass, freezer)
+
+    assert float(hass.states.get(COST_ID).state) == pytest.approx(0.5)
+    assert _journal_records(journal)[-1]["energy"]["cost"] == [pytest.approx(1.0)]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_journal_records_a_steady_power_rate(hass, freezer, tmp_path):
+    """A constant rate is journaled on every tick without any power event."""
+    hass.config.config_dir = str(tmp_path)
+    freezer.move_to("2026-02-15 10:20:00+00:00")
+    hass.states.async_set(PRICE_ID, "0.5")
+    hass.states.async_set(POWER_ID, "1000", {"unit_of_measurement": "W"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "integration_description": "Heater",
+            "electricity_price_sensor": PRICE_ID,
+            "power_sensor": POWER_ID,
+        },
+        options={"selected_sensors": ["hourly"], "crash_journal": True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    journal = tmp_path / ".storage" / f"{DOMAIN}.{entry.entry_id}.journal"
+
+    await _tick_journal(hass, freezer)
+    await _tick_journal(hass, freezer)
+
+    records = _journal_records(journal)
+    assert len(records) == 2
+    # 0.5/h over 10 seconds
+    assert records[-1]["power"]["cost"] == [1388]
+    assert records[-1]["power"]["updated"] == dt_util.utcnow().isoformat()
+
+    # A zero rate accrues nothing, so there is nothing more to journal
+    hass.states.async_set(POWER_ID, "0", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    await _tick_journal(hass, freezer)
+    await _tick_journal(hass, freezer)
+
+    assert len(_journal_records(journal)) == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)